@@ -0,0 +1,9 @@
+"""Benchmarks for the devinstaller pipeline
+
+Run all of them using::
+
+    python -m benchmarks
+
+The results are saved into `.benchmarks/` using the current commit as the name
+and can be compared with the results of another commit using `--compare`.
+"""
@@ -0,0 +1,47 @@
+import argparse
+
+from benchmarks import generator as g
+from benchmarks import runner as r
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--modules", type=int, nargs="*", help="Module counts")
+    parser.add_argument("--depth", type=int, default=5)
+    parser.add_argument("--fan-out", type=int, default=3)
+    parser.add_argument("--constants-depth", type=int, default=3)
+    parser.add_argument("--platforms", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--compare", help="Commit to compare the results with")
+    parser.add_argument("--no-save", action="store_true", help="Don't save the results")
+    args = parser.parse_args()
+    shapes = None
+    if args.modules:
+        shapes = [
+            g.Shape(
+                modules=i,
+                depth=args.depth,
+                fan_out=args.fan_out,
+                constants_depth=args.constants_depth,
+                platforms=args.platforms,
+            )
+            for i in args.modules
+        ]
+    results = r.run(shapes, repeat=args.repeat)
+    for shape, phases in results["results"].items():
+        print(shape)
+        for phase, timing in phases.items():
+            print(f"  {phase:<16} {timing['min'] * 1000:10.2f} ms")
+    if not args.no_save:
+        print(f"Saved to {r.save(results)}")
+    if args.compare:
+        ratios = r.compare(r.load(args.compare), results)
+        print(f"Compared with {args.compare}")
+        for shape, phases in ratios.items():
+            print(shape)
+            for phase, ratio in phases.items():
+                print(f"  {phase:<16} {ratio:10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
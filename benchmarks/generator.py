@@ -0,0 +1,87 @@
+"""Generates synthetic spec files for the benchmarks
+"""
+import random
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+
+@dataclass
+class Shape:
+    """The size and shape of the generated spec file
+
+    parameters:
+        modules: Number of modules
+        depth: Number of layers in the dependency graph
+        fan_out: Number of modules each module requires from the layer below it
+        constants_depth: Length of the `inherits` chain of the global constants
+        platforms: Number of platforms
+        seed: Seed for picking the dependencies
+    """
+
+    modules: int = 100
+    depth: int = 5
+    fan_out: int = 3
+    constants_depth: int = 3
+    platforms: int = 2
+    seed: int = 0
+
+    @property
+    def name(self) -> str:
+        """Name used for the results of the shape"""
+        return (
+            f"m{self.modules}-d{self.depth}-f{self.fan_out}"
+            f"-c{self.constants_depth}-p{self.platforms}"
+        )
+
+
+def generate(shape: Shape) -> Dict[str, Any]:
+    """Generate a spec object of the given shape.
+
+    All the modules are `group` modules, so installing them doesn't run
+    anything. Every module binds the last global constant, which inherits all
+    the others, and uses it in its description.
+
+    Args:
+        shape: The shape of the spec
+
+    Returns:
+        The spec object
+    """
+    rng = random.Random(shape.seed)
+    platforms = [
+        {"name": f"platform{i}", "platform_info": {"system": f"system{i}"}}
+        for i in range(shape.platforms)
+    ]
+    constants = []
+    for i in range(shape.constants_depth):
+        constant: Dict[str, Any] = {
+            "name": f"constants{i}",
+            "data": [{"key": f"key{i}", "value": f"value{i}"}],
+        }
+        if i > 0:
+            constant["inherits"] = [f"constants{i - 1}"]
+        constants.append(constant)
+    layers: List[List[str]] = [[] for _ in range(max(shape.depth, 1))]
+    for i in range(shape.modules):
+        layers[i * len(layers) // shape.modules].append(f"module{i}")
+    modules = []
+    for index, layer in enumerate(layers):
+        for name in layer:
+            module: Dict[str, Any] = {
+                "name": name,
+                "module_type": "group",
+                "supported_platforms": [i["name"] for i in platforms],
+            }
+            if index > 0:
+                below = layers[index - 1]
+                module["requires"] = rng.sample(below, min(shape.fan_out, len(below)))
+            if constants:
+                module["binds"] = [constants[-1]["name"]]
+                module["constants"] = [{"key": "module", "value": name}]
+            modules.append(module)
+    return {
+        "version": "0.1",
+        "platforms": platforms,
+        "constants": constants,
+        "modules": modules,
+    }
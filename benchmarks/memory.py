@@ -0,0 +1,122 @@
+"""Measures the peak memory used for reading and hashing a large spec file
+
+Each method runs in a fresh interpreter, so the peak resident set size of one
+method doesn't hide the peak of another.
+
+Memory mapping lowers the peak only on a cache hit, where the file is hashed
+but never decoded. On a cache miss the whole file is decoded into a string,
+so the peak is about the same as reading the file in text mode.
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+from typing import Callable, Dict
+
+from devinstaller_core import digest as dg
+from devinstaller_core import file_manager as f
+
+DEFAULT_SIZE = 100
+"""Size of the generated spec file in MB
+"""
+
+
+def read_text(path: str) -> None:
+    """Read the file in text mode and hash the string, which copies it"""
+    f.FileManager.hash_data(f.FileManager.read(path))
+
+
+def read_mapped(path: str) -> None:
+    """Hash the mapped file and decode it once, as on a cache miss. The
+    decoded string and the mapped pages are resident at the same time.
+    """
+    f.FileManager.read_digest(path)
+
+
+def hash_mapped(path: str) -> None:
+    """Only hash the mapped file, as on a cache hit"""
+    with f.FileManager.open_buffer(path) as buffer:
+        dg.hash_buffer(buffer)
+
+
+METHODS: Dict[str, Callable[[str], None]] = {
+    "read": read_text,
+    "mmap": read_mapped,
+    "mmap_cached": hash_mapped,
+}
+"""The ways of reading the file which are compared
+"""
+
+
+def get_peak() -> int:
+    """Returns the peak resident set size of the process in bytes"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def generate(path: str, size: int) -> None:
+    """Write a spec file of about `size` MB with a single file module whose
+    content makes up most of the file
+    """
+    line = "export PATH=$HOME/.local/bin:$PATH  # " + "x" * 60 + "\n"
+    count = size * 1024 * 1024 // len(line)
+    with open(path, "w") as _f:
+        _f.write('version = "0.1.0"\n\n[[modules]]\n')
+        _f.write('name = "profile"\nmodule_type = "file"\ncontent = """\n')
+        for _ in range(count):
+            _f.write(line)
+        _f.write('"""\n')
+
+
+def measure(method: str, path: str) -> int:
+    """Run the method in a new interpreter
+
+    Returns:
+        The increase of the peak resident set size in bytes
+    """
+    res = subprocess.run(
+        [sys.executable, "-m", "benchmarks.memory", "--child", method, path],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return int(res.stdout.strip())
+
+
+def run(size: int = DEFAULT_SIZE) -> Dict[str, int]:
+    """Measure every method on a generated spec file of `size` MB
+
+    Returns:
+        The increase of the peak resident set size in bytes for each method
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "devfile.toml")
+        generate(path, size)
+        return {method: measure(method, path) for method in METHODS}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.memory")
+    parser.add_argument("--size", type=int, default=DEFAULT_SIZE, help="Size in MB")
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        method, path = args.child
+        start = get_peak()
+        METHODS[method](path)
+        print(get_peak() - start)
+        return None
+    results = run(args.size)
+    print(f"{args.size} MB spec file")
+    for method, peak in results.items():
+        reduction = 1 - peak / results["read"]
+        print(
+            f"  {method:<12} peak {peak / 1024 / 1024:8.1f} MB"
+            f"  reduction {reduction:6.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Times each phase of the pipeline on the generated spec files
+"""
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import anymarkup
+
+from benchmarks import generator as g
+from devinstaller_core import block_platform as bp
+from devinstaller_core import dependency_graph as dg
+from devinstaller_core import file_manager as f
+from devinstaller_core import schema as s
+
+RESULTS_DIR = ".benchmarks"
+"""Directory where the results are saved
+"""
+
+DEFAULT_SHAPES = [
+    g.Shape(modules=100),
+    g.Shape(modules=1000, depth=10),
+    g.Shape(modules=1000, depth=10, fan_out=8, constants_depth=10),
+]
+"""Shapes benchmarked by default
+"""
+
+
+def measure(func: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Run the function `repeat` times and returns the best and median time in
+    seconds
+    """
+    timings: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {"min": min(timings), "median": statistics.median(timings)}
+
+
+def benchmark_shape(shape: g.Shape, repeat: int = 5) -> Dict[str, Dict[str, float]]:
+    """Time every phase for a single shape
+
+    Phases:
+        - `parse`: Parsing the TOML file
+        - `validate`: Validating the spec object
+        - `graph`: Creating the dependency graph
+        - `patch_constants`: Patching the constants of every module
+        - `traverse`: Installing all the modules, which does nothing
+
+    Returns:
+        The timings of each phase
+    """
+    spec = g.generate(shape)
+    contents = anymarkup.serialize(spec, "toml").decode("utf-8")
+    document = s.get_validated_document(f.DevFileManager.parse(contents, "toml"))
+    platform_object = bp.BlockPlatform(
+        platform_list=document["platforms"], platform_codename="platform0"
+    )
+    graph = dg.DependencyGraph(schema_object=document, platform_object=platform_object)
+    modules = document["modules"]
+
+    def patch_constants() -> None:
+        graph.generate_global_constants_graph(document["constants"])
+        for module in modules:
+            graph.patch_constants(
+                bind_constants=module.get("binds"),
+                local_constants=module.get("constants"),
+            )
+
+    def traverse() -> None:
+        graph.reset()
+        with contextlib.redirect_stdout(io.StringIO()):
+            graph.install(list(graph.graph.keys()))
+
+    phases: Dict[str, Callable[[], Any]] = {
+        "parse": lambda: f.DevFileManager.parse(contents, "toml"),
+        "validate": lambda: s.get_validated_document(spec),
+        "graph": lambda: dg.DependencyGraph(
+            schema_object=document, platform_object=platform_object
+        ),
+        "patch_constants": patch_constants,
+        "traverse": traverse,
+    }
+    return {name: measure(func, repeat) for name, func in phases.items()}
+
+
+def get_commit() -> str:
+    """Returns the current commit, or `unknown` outside of a git repo"""
+    try:
+        res = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+        return res.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(shapes: Optional[List[g.Shape]] = None, repeat: int = 5) -> Dict[str, Any]:
+    """Run the benchmarks for all the shapes
+
+    Returns:
+        The results along with the commit and the environment
+    """
+    shapes = DEFAULT_SHAPES if shapes is None else shapes
+    return {
+        "commit": get_commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "created": time.time(),
+        "repeat": repeat,
+        "results": {shape.name: benchmark_shape(shape, repeat) for shape in shapes},
+    }
+
+
+def save(results: Dict[str, Any], results_dir: str = RESULTS_DIR) -> str:
+    """Save the results using the commit as the file name
+
+    Returns:
+        The path of the results file
+    """
+    os.makedirs(results_dir, exist_ok=True)
+    path = os.path.join(results_dir, f"{results['commit']}.json")
+    with open(path, "w") as _f:
+        json.dump(results, _f, indent=2, sort_keys=True)
+    return path
+
+
+def load(commit: str, results_dir: str = RESULTS_DIR) -> Dict[str, Any]:
+    """Load the saved results of the commit"""
+    with open(os.path.join(results_dir, f"{commit}.json")) as _f:
+        return json.load(_f)
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    """Compare the best timings of two results.
+
+    Returns:
+        The ratio of the new time to the old time for every shape and phase
+        present in both. A ratio above 1 means the new commit is slower.
+    """
+    ratios: Dict[str, Dict[str, float]] = {}
+    for shape, phases in new["results"].items():
+        old_phases = old["results"].get(shape, {})
+        for phase, timing in phases.items():
+            if phase in old_phases and old_phases[phase]["min"] > 0:
+                ratio = timing["min"] / old_phases[phase]["min"]
+                ratios.setdefault(shape, {})[phase] = ratio
+    return ratios
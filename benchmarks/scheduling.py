@@ -0,0 +1,126 @@
+"""Simulates the parallel installation of the generated spec files and compares
+the makespan of the scheduling priorities
+"""
+import argparse
+import heapq
+import random
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks import generator as g
+from devinstaller_core import block_platform as bp
+from devinstaller_core import dependency_graph as dg
+from devinstaller_core import history as hi
+from devinstaller_core import scheduler as sc
+
+DEFAULT_SHAPES = [
+    g.Shape(modules=100, depth=5, fan_out=2),
+    g.Shape(modules=500, depth=10, fan_out=2),
+    g.Shape(modules=1000, depth=20, fan_out=3),
+]
+"""Shapes benchmarked by default
+"""
+
+LONG_MODULES = 0.1
+"""Fraction of the modules which are slow to install, like compilers and
+language runtimes
+"""
+
+
+def get_durations(names: List[str], seed: int = 0) -> Dict[str, float]:
+    """Returns a made up install duration in seconds for every module"""
+    rng = random.Random(seed)
+    return {
+        name: rng.uniform(60, 600)
+        if rng.random() < LONG_MODULES
+        else rng.uniform(1, 20)
+        for name in names
+    }
+
+
+def simulate(
+    graph: dg.DependencyGraph,
+    requirement_list: List[str],
+    durations: Dict[str, float],
+    priority: Callable[[str], object],
+    workers: int,
+) -> float:
+    """Simulate the installation where every module takes its duration
+
+    Returns:
+        The time taken to install all the modules
+    """
+    order = graph.install_order(requirement_list)
+    waiting = {name: set(graph.dependencies(name)) for name in order}
+    dependents: Dict[str, List[str]] = {}
+    for name in order:
+        for child_name in waiting[name]:
+            dependents.setdefault(child_name, []).append(name)
+    ready = [name for name in order if not waiting[name]]
+    running: List[Tuple[float, str]] = []
+    clock = 0.0
+    while ready or running:
+        ready.sort(key=priority)
+        while ready and len(running) < workers:
+            name = ready.pop(0)
+            heapq.heappush(running, (clock + durations[name], name))
+        clock, name = heapq.heappop(running)
+        for parent_name in dependents.get(name, []):
+            waiting[parent_name].discard(name)
+            if not waiting[parent_name]:
+                ready.append(parent_name)
+    return clock
+
+
+def benchmark_shape(shape: g.Shape, workers: int = 4) -> Dict[str, float]:
+    """Simulate a single shape using both priorities
+
+    Results:
+        - `fifo`: Makespan when the ready modules start in install order
+        - `critical_path`: Makespan when the ready modules on the longest
+          chains start first
+        - `lower_bound`: The longest chain or the total work split evenly,
+          whichever is longer. No schedule can be faster.
+    """
+    spec = g.generate(shape)
+    platform_object = bp.BlockPlatform(
+        platform_list=spec["platforms"], platform_codename="platform0"
+    )
+    graph = dg.DependencyGraph(schema_object=spec, platform_object=platform_object)
+    requirement_list = list(graph.graph.keys())
+    durations = get_durations(requirement_list, shape.seed)
+    history = hi.DurationHistory("")
+    history.durations = durations
+    scheduler = sc.Scheduler(graph, workers, history=history)
+    scheduler.prioritize(graph.install_order(requirement_list))
+    return {
+        "fifo": simulate(
+            graph, requirement_list, durations, lambda i: scheduler.order[i], workers
+        ),
+        "critical_path": simulate(
+            graph, requirement_list, durations, scheduler.priority, workers
+        ),
+        "lower_bound": max(
+            max(scheduler.paths.values()), sum(durations.values()) / workers
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.scheduling")
+    parser.add_argument("--workers", type=int, nargs="*", default=[2, 4, 8])
+    args = parser.parse_args()
+    for shape in DEFAULT_SHAPES:
+        print(shape.name)
+        for workers in args.workers:
+            result = benchmark_shape(shape, workers)
+            reduction = 1 - result["critical_path"] / result["fifo"]
+            print(
+                f"  workers={workers:<3} fifo {result['fifo']:9.1f} s"
+                f"  critical path {result['critical_path']:9.1f} s"
+                f"  lower bound {result['lower_bound']:9.1f} s"
+                f"  reduction {reduction:6.1%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ from typeguard import typechecked
 
 from devinstaller_core import common_models as c
 from devinstaller_core import exception as e
+from devinstaller_core import policy as p
 from devinstaller_core import utilities as u
 
 
@@ -64,9 +65,16 @@ def get_interface(
 
 
 def select_interface(interface_list: List[c.TypeInterface]) -> str:
-    """Ask user to select one interface"""
-    title = "Can you select one interface for me?"
+    """Ask user to select one interface
+
+    The selection is made using the selection policy if it has a rule for the
+    `interface` kind, in which case the user is not asked.
+    """
     choices = [i["name"] for i in interface_list]
+    index = p.get_policy().select("interface", choices)
+    if index is not None:
+        return choices[index]
+    title = "Can you select one interface for me?"
     ui = u.UserInteraction()
     selection = ui.select(title, choices)
     return selection
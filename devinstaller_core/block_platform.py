@@ -6,7 +6,9 @@ from typing import List, Optional
 from typeguard import typechecked
 
 from devinstaller_core import common_models as cm
+from devinstaller_core import events as ev
 from devinstaller_core import exception as e
+from devinstaller_core import policy as p
 from devinstaller_core import utilities as u
 from devinstaller_core.utilities import ui
 
@@ -103,17 +105,19 @@ class BlockPlatform:
                 elif u.Compare.version(_p_info["version"], self.info["version"]):
                     platforms_supported.append(_p)
         if len(platforms_supported) == 1:
-            ui.print(f"I see you are using {platforms_supported[0]['name']}")
+            ev.publish(ev.PlatformDetected(platform=platforms_supported[0]["name"]))
             self.codename = platforms_supported[0]["name"]
             return None
         if len(platforms_supported) > 1:
-            ui.print(
-                'Hey.. your current platform supports multiple "platform" declared in the spec file'
+            ev.publish(
+                ev.PlatformAmbiguous(
+                    platforms=[_p["name"] for _p in platforms_supported]
+                )
             )
             self.resolve(platforms_supported)
         else:
-            ui.print(
-                "Hey.. I couldn't find the platform you are looking for. Can you do this manually?"
+            ev.publish(
+                ev.PlatformNotFound(platforms=[_p["name"] for _p in platform_list])
             )
             self.resolve(platform_list)
 
@@ -130,11 +134,18 @@ class BlockPlatform:
         Args:
             platforms_supported: List of platform objects which satisfies the condition
 
+        The selection is made using the selection policy if it has a rule for
+        the `platform` kind, in which case the user is not asked.
+
         Returns:
             The required platform object
         """
+        choices = [_p["name"] for _p in platforms_supported]
+        index = p.get_policy().select("platform", choices)
+        if index is not None:
+            self.codename = choices[index]
+            return None
         title = "Can you select one platform for me?"
-        choices = [p["name"] for p in platforms_supported]
         selection = ui.select(title=title, choices=choices)
         self.codename = selection
 
@@ -0,0 +1,166 @@
+"""Write-ahead journal used for resuming interrupted installations
+"""
+import json
+import os
+import threading
+from typing import Any, Dict, Optional, Set, TextIO
+
+from typeguard import typechecked
+
+from devinstaller_core import settings as s
+from devinstaller_core import utilities as u
+
+
+class Checkpoint:
+    """Journal of the progress of an installation run.
+
+    Every module and every instruction is recorded in the journal as soon as it
+    completes. Each entry is a single JSON line which is flushed and synced to
+    the disk before the installation moves on, so if the run is interrupted the
+    journal tells exactly how far it got.
+
+    When the journal is loaded again the entries are replayed to restore the
+    `status` of each module, the number of instructions already completed for
+    the module which was in progress and the "list" of orphan modules.
+
+    Args:
+        file_path: The path to the journal file
+
+    Attributes:
+        statuses: The last recorded status of each module
+        steps: The number of completed instructions of each module
+        orphan_modules: The "list" of modules not used by any other modules
+    """
+
+    @typechecked
+    def __init__(self, file_path: str) -> None:
+        self.file_path = u.resolve_path(file_path)
+        self.statuses: Dict[str, str] = {}
+        self.steps: Dict[str, int] = {}
+        self.orphan_modules: Set[str] = set()
+        self._file: Optional[TextIO] = None
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        """Replay the journal file and restore the state of the previous run.
+
+        An incomplete last line is ignored as it means that the previous run
+        was interrupted while writing it.
+        """
+        if not os.path.isfile(self.file_path):
+            return None
+        with open(self.file_path, "r") as _f:
+            for line in _f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                self.replay(entry)
+
+    @typechecked
+    def replay(self, entry: Dict[str, Any]) -> None:
+        """Apply a single journal entry to the state
+
+        Args:
+            entry: The journal entry
+        """
+        event = entry["event"]
+        alias = entry["module"]
+        if event == "module_started":
+            self.statuses[alias] = "in progress"
+            self.steps[alias] = 0
+        elif event == "instruction_finished":
+            self.steps[alias] = entry["step"] + 1
+        elif event == "module_finished":
+            self.statuses[alias] = entry["status"]
+            self.steps.pop(alias, None)
+            self.orphan_modules = set(entry["orphan_modules"])
+
+    def open(self) -> None:
+        """Open the journal file for appending new entries"""
+        os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+        self._file = open(self.file_path, "a")
+
+    def close(self) -> None:
+        """Close the journal file"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def clear(self) -> None:
+        """Close and remove the journal file along with the restored state"""
+        self.close()
+        if os.path.isfile(self.file_path):
+            os.remove(self.file_path)
+        self.statuses = {}
+        self.steps = {}
+        self.orphan_modules = set()
+
+    def record(self, **entry: Any) -> None:
+        """Write the entry to the journal and make sure it reaches the disk
+
+        Args:
+            entry: The data to be recorded
+        """
+        with self._lock:
+            if self._file is None:
+                self.open()
+            assert self._file is not None
+            self._file.write(json.dumps(entry) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.replay(entry)
+
+    @typechecked
+    def module_started(self, alias: str) -> None:
+        """Record that the installation of the module has started"""
+        if self.statuses.get(alias) == "in progress":
+            return None
+        self.record(event="module_started", module=alias)
+
+    @typechecked
+    def instruction_finished(self, alias: str, step: int) -> None:
+        """Record that the instruction at `step` of the module has completed"""
+        self.record(event="instruction_finished", module=alias, step=step)
+
+    @typechecked
+    def module_finished(
+        self, alias: str, status: str, orphan_modules: Set[str]
+    ) -> None:
+        """Record the final status of the module along with the current orphan
+        modules
+        """
+        self.record(
+            event="module_finished",
+            module=alias,
+            status=status,
+            orphan_modules=sorted(orphan_modules),
+        )
+
+    @typechecked
+    def completed_steps(self, alias: str) -> int:
+        """The number of instructions of the module which have already completed"""
+        return self.steps.get(alias, 0)
+
+
+@typechecked
+def get_checkpoint(digest: str, resume: bool = False) -> Checkpoint:
+    """Get the checkpoint for the spec with the given digest.
+
+    The journal is stored in the `DDOT_STATE_DIR` directory.
+
+    Args:
+        digest: The digest of the spec file
+        resume: If True then the state of the previous run is restored, else
+            the previous journal is discarded
+
+    Returns:
+        The checkpoint object
+    """
+    file_path = os.path.join(s.settings.DDOT_STATE_DIR, "runs", f"{digest}.journal")
+    checkpoint = Checkpoint(file_path)
+    if resume:
+        checkpoint.load()
+    else:
+        checkpoint.clear()
+    return checkpoint
@@ -35,9 +35,12 @@
 
 """Handles everything related to running shell commands"""
 import re
+import threading
+import time
+import types
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Dict, Generic, List, TypeVar, cast
+from typing import Callable, Dict, Generic, List, Optional, TypeVar, cast
 
 from devinstaller_core import constants as c
 from devinstaller_core import exception as e
@@ -106,18 +109,68 @@ class SessionSpec(ex.BaseExtension[ex.ExtSpec]):
 
 
 class SessionProg(ex.BaseExtension[ex.ExtProg]):
-    """Create a session for executing prog files"""
+    """Create a session for executing prog files
 
-    def __init__(self) -> None:
+    The prog module is loaded on the first launch and every launch after it
+    reuses the same module, so a session is created only once per run.
+
+    Args:
+        load_prog: Returns the prog module. Called only on the first launch.
+    """
+
+    def __init__(
+        self, load_prog: Optional[Callable[[], types.ModuleType]] = None
+    ) -> None:
         ext_class = c.SessionProg.EXTENSION_CLASS
         builtin_extensions = c.SessionProg.BUILTIN_EXTENSIONS
         self.prog: Dict[str, ex.ExtProg] = {}
+        self.load_prog = load_prog
+        self.prog_module: Optional[types.ModuleType] = None
+        self.lock = threading.Lock()
         super().__init__(builtin_extensions=builtin_extensions, ext_class=ext_class)
 
-    def launch(
-        self, function_name: str, prog_file_path: str, language_code: str = "py"
-    ) -> None:
-        pass
+    def get_prog_module(self, function_name: str) -> types.ModuleType:
+        """Returns the prog module, loading it on the first call
+
+        Raises:
+            SpecificationError
+                with error code :ref:`error-code-S104` if there is no prog file
+        """
+        with self.lock:
+            if self.prog_module is None:
+                if self.load_prog is None:
+                    raise e.SpecificationError(
+                        error=function_name,
+                        error_code="S104",
+                        message="The spec file doesn't have a `prog_file`.",
+                    )
+                self.prog_module = self.load_prog()
+            return self.prog_module
+
+    def check(self, function_name: str, language_code: str = "py") -> None:
+        """Check if the function is defined in the prog file, without calling it
+
+        Raises:
+            SpecificationError
+                with error code :ref:`error-code-S104`
+        """
+        prog_module = self.get_prog_module(function_name)
+        self.prog[language_code].get_function(prog_module, function_name)
+
+    def launch(self, function_name: str, language_code: str = "py") -> float:
+        """Call the function of the prog module
+
+        Args:
+            function_name: The name of the function in the prog file
+            language_code: The language of the prog file
+
+        Returns:
+            The time taken by the function in seconds
+        """
+        prog_module = self.get_prog_module(function_name)
+        start = time.perf_counter()
+        self.prog[language_code].launch(function_name, prog_module)
+        return time.perf_counter() - start
 
     def load_extension(self, extension: ex.ExtProg):
         """Loading extension"""
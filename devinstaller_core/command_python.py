@@ -1,3 +1,8 @@
+import types
+import weakref
+from typing import Any, Callable
+
+from devinstaller_core import exception as e
 from devinstaller_core import extension as ex
 from devinstaller_core import settings as s
 from devinstaller_core import utilities as u
@@ -33,5 +38,44 @@ class ExtProg(ex.ExtProg):
     LANGUAGE_CODE = CODE
     LANGUAGE_NAME = NAME
 
-    def launch(self, python_fun_name: str):
-        pass
+    def __init__(self) -> None:
+        self.functions: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        """The functions looked up with the prog module as the key
+        """
+
+    def get_function(
+        self, prog_module: types.ModuleType, python_fun_name: str
+    ) -> Callable[[], Any]:
+        """Returns the function of the prog module, looking it up only once
+
+        Raises:
+            SpecificationError
+                with error code :ref:`error-code-S104`
+        """
+        functions = self.functions.setdefault(prog_module, {})
+        function = functions.get(python_fun_name)
+        if function is None:
+            function = getattr(prog_module, python_fun_name, None)
+            if not callable(function):
+                raise e.SpecificationError(
+                    error=python_fun_name,
+                    error_code="S104",
+                    message="Define the function in the prog file.",
+                )
+            functions[python_fun_name] = function
+        return function
+
+    def launch(self, python_fun_name: str, prog_module: types.ModuleType) -> None:
+        """Call the function of the prog module
+
+        Raises:
+            ModuleInstallationFailed
+                with error code :ref:`error-code-D108` if the function raises
+        """
+        function = self.get_function(prog_module, python_fun_name)
+        try:
+            function()
+        except Exception as err:
+            raise e.ModuleInstallationFailed(
+                error=python_fun_name, error_code="D108", message=repr(err)
+            )
@@ -67,6 +67,7 @@ class TypeCommonModule(TypedDict, total=False):
     alias: str
     commands: List[Union[TypeModuleInstallInstruction, str]]
     install_inst: List[TypeModuleInstallInstruction]
+    uninstall_inst: List[str]
     configs: List[Union[TypeModuleInstallInstruction, str]]
     content: str
     create: bool
@@ -74,6 +75,7 @@ class TypeCommonModule(TypedDict, total=False):
     display: str
     executable: str
     inits: List[Union[TypeModuleInstallInstruction, str]]
+    locks: List[str]
     module_type: str
     name: str
     optionals: List[str]
@@ -84,6 +86,7 @@ class TypeCommonModule(TypedDict, total=False):
     permission: str
     requires: List[str]
     rollback: bool
+    slots: Dict[str, int]
     source: str
     supported_platforms: List[str]
     symbolic: bool
@@ -322,6 +325,15 @@ def module() -> Dict[str, Any]:
                 "source": {"type": "string"},
                 "dest": {"type": "string"},
                 "symbolic": {"type": "boolean"},
+                # Resources held by the module while it is installed by the
+                # scheduler. `locks` are exclusive and `slots` are counted
+                # against the capacity set in `DDOT_SLOTS`.
+                "locks": {"type": "list", "schema": {"type": "string"}},
+                "slots": {
+                    "type": "dict",
+                    "keysrules": {"type": "string"},
+                    "valuesrules": {"type": "integer", "min": 1},
+                },
             },
         },
     }
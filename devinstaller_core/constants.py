@@ -27,3 +27,4 @@ class UserInteraction:
 
     EXTENSION_CLASS = "ExtUserInteraction"
     BUILTIN_EXTENSIONS = ["devinstaller_core.user_interaction"]
+    HEADLESS_EXTENSIONS = ["devinstaller_core.user_interaction_json"]
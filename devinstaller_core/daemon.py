@@ -0,0 +1,202 @@
+"""Long running daemon which keeps the specs, graphs and extensions warm
+"""
+import json
+import os
+import socket
+import socketserver
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from typeguard import typechecked
+
+from devinstaller_core import dependency_graph as dg
+from devinstaller_core import include as inc
+from devinstaller_core import lib
+from devinstaller_core import planner as p
+from devinstaller_core import settings as s
+from devinstaller_core import utilities as u
+
+OPERATIONS = ["ping", "plan", "install", "status"]
+"""Operations supported by the daemon
+
+Values allowed:
+    1. `ping`: Check if the daemon is running
+    2. `plan`: Returns the execution plan
+    3. `install`: Install the modules and return their status
+    4. `status`: Returns the status of the modules from the last install
+"""
+
+MAX_GRAPHS = 16
+"""The maximum number of dependency graphs kept by the daemon
+"""
+
+
+class Daemon:
+    """The state kept warm by the daemon between the requests.
+
+    Parsed and validated specs are cached using the digest of the spec file and
+    the dependency graphs are cached using the spec, platform and interface
+    along with the digest they were created from. A graph is replaced once its
+    spec file changes and only the most recently used :data:`MAX_GRAPHS`
+    graphs are kept. The extensions are loaded only once per process so they
+    stay warm as well.
+
+    Attributes:
+        graphs: The digest and the dependency graph for each spec, platform
+            and interface
+    """
+
+    def __init__(self) -> None:
+        self.graphs = u.LRUCache(MAX_GRAPHS)
+        self.install_lock = threading.Lock()
+
+    @typechecked
+    def get_graph(
+        self, spec: str, platform: Optional[str] = None, interface: Optional[str] = None
+    ) -> dg.DependencyGraph:
+        """Returns the dependency graph for the spec file, creating it only if
+        the spec file has changed.
+
+        Args:
+            spec: The path to the spec file. Follows the spec format.
+            platform: The codename of the platform
+            interface: The name of the interface
+        """
+        digest = inc.resolve_file(spec).digest
+        key = (spec, platform, interface)
+        cached: Optional[Tuple[str, dg.DependencyGraph]] = self.graphs.get(key)
+        if cached is not None and cached[0] == digest:
+            return cached[1]
+        schema_object = lib.core(file_path=spec)
+        graph = lib.create_dependency_graph(
+            schema_object=schema_object,
+            platform_codename=platform,
+            interface_name=interface,
+        )
+        self.graphs[key] = (digest, graph)
+        return graph
+
+    @typechecked
+    def handle(self, request: Dict[str, Any]) -> Any:
+        """Handle a single request
+
+        Args:
+            request: The request with the `op` and its arguments
+
+        Returns:
+            The result of the operation
+        """
+        op = request.get("op")
+        if op == "ping":
+            return "pong"
+        if op not in OPERATIONS:
+            raise ValueError(f"Unknown operation: {op}")
+        graph = self.get_graph(
+            request["spec"], request.get("platform"), request.get("interface")
+        )
+        requirements: Optional[List[str]] = request.get("requirements")
+        if op == "plan":
+            return p.create_plan(graph, requirement_list=requirements)
+        if op == "install":
+            with self.install_lock:
+                graph.reset()
+                graph.install(requirements or list(graph.graph.keys()))
+        return {
+            "modules": {name: module.status for name, module in graph.graph.items()},
+            "orphan_modules": sorted(graph.orphan_modules),
+        }
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """Handles the connections to the daemon.
+
+    Every line received is a JSON request and every response is a single JSON
+    line with `ok` and either the `result` or the `error`.
+
+    An install exiting because a rollback failed is sent back as an error, so
+    the connection is not dropped without a response.
+    """
+
+    def handle(self) -> None:
+        daemon: Daemon = getattr(self.server, "daemon")
+        for line in self.rfile:
+            try:
+                result = daemon.handle(json.loads(line))
+                response = {"ok": True, "result": result}
+            except Exception as err:
+                response = {"ok": False, "error": str(err)}
+            except SystemExit as err:
+                response = {"ok": False, "error": f"Exited with status {err.code}"}
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server for the daemon
+
+    Args:
+        socket_path: The path to the Unix socket
+    """
+
+    daemon_threads = True
+
+    @typechecked
+    def __init__(self, socket_path: Optional[str] = None) -> None:
+        self.socket_path = get_socket_path(socket_path)
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        os.makedirs(os.path.dirname(self.socket_path), exist_ok=True)
+        self.daemon = Daemon()
+        super().__init__(self.socket_path, RequestHandler)
+
+    def server_close(self) -> None:
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+@typechecked
+def get_socket_path(socket_path: Optional[str] = None) -> str:
+    """Returns the full path of the socket. Defaults to `DDOT_SOCKET`."""
+    if socket_path is None:
+        socket_path = s.settings.DDOT_SOCKET
+    return u.resolve_path(socket_path)
+
+
+@typechecked
+def serve(socket_path: Optional[str] = None) -> None:
+    """Start the daemon and serve the requests until interrupted
+
+    Args:
+        socket_path: The path to the Unix socket. Defaults to `DDOT_SOCKET`.
+    """
+    with DaemonServer(socket_path) as server:
+        server.serve_forever()
+
+
+@typechecked
+def request(socket_path: Optional[str] = None, **payload: Any) -> Any:
+    """Send a request to the daemon and wait for the response
+
+    Examples:
+        - request(op="plan", spec="file: devfile.toml")
+
+    Args:
+        socket_path: The path to the Unix socket. Defaults to `DDOT_SOCKET`.
+        payload: The request
+
+    Returns:
+        The result of the request
+
+    Raises:
+        RuntimeError
+            if the daemon couldn't handle the request
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(get_socket_path(socket_path))
+        sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as _f:
+            response = json.loads(_f.readline())
+    if not response["ok"]:
+        raise RuntimeError(response["error"])
+    return response["result"]
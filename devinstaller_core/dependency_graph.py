@@ -1,11 +1,25 @@
 """Module dependency graph and other stuffs
 """
-from typing import Any, Dict, List, Optional, Set
+import sys
+import time
+import types
+from typing import Any, Callable, Dict, List, Optional, Set, cast
 
 from typeguard import typechecked
 
+from devinstaller_core import checkpoint as cp
 from devinstaller_core import command as c
+from devinstaller_core import events as ev
 from devinstaller_core import exception as e
+from devinstaller_core import history as hi
+from devinstaller_core import metrics as mt
+from devinstaller_core import module_index as mi
+from devinstaller_core import policy as p
+from devinstaller_core import profiling as pr
+from devinstaller_core import scheduler as sc
+from devinstaller_core import settings as s
+from devinstaller_core import template as tp
+from devinstaller_core import transaction as t
 from devinstaller_core import utilities as u
 from devinstaller_core.block_platform import BlockPlatform
 from devinstaller_core.common_models import (
@@ -15,7 +29,6 @@ from devinstaller_core.common_models import (
     TypeConstantData,
     TypeFullDocument,
 )
-from devinstaller_core.messages import WARNING_COLOR_HEX, error_message, warning_message
 from devinstaller_core.module_app import ModuleApp
 from devinstaller_core.module_file import ModuleFile
 from devinstaller_core.module_folder import ModuleFolder
@@ -24,6 +37,26 @@ from devinstaller_core.module_link import ModuleLink
 from devinstaller_core.module_phony import ModulePhony
 from devinstaller_core.utilities import ui
 
+MODULE_CLASSES: Dict[str, Any] = {
+    "app": ModuleApp,
+    "file": ModuleFile,
+    "folder": ModuleFolder,
+    "link": ModuleLink,
+    "group": ModuleGroup,
+    "phony": ModulePhony,
+}
+"""The class used for each `module_type`
+"""
+
+
+@typechecked
+def get_module_type(module: TypeAnyModule) -> str:
+    """Returns the `module_type` of the given module object"""
+    for module_type, module_class in MODULE_CLASSES.items():
+        if type(module) is module_class:
+            return module_type
+    raise e.DevinstallerError(str(module), "D104")
+
 
 class DependencyGraph:
     """Module dependency class
@@ -40,21 +73,40 @@ class DependencyGraph:
         platform_object: BlockPlatform,
         before_each: Optional[str] = None,
         after_each: Optional[str] = None,
+        module_index: Optional[mi.ModuleIndex] = None,
+        load_prog: Optional[Callable[[], types.ModuleType]] = None,
     ) -> None:
-        """Create dependency graph"""
+        """Create dependency graph
+
+        If the `module_index` of the spec is given then only the modules
+        indexed for the platform are used, without checking every module.
+
+        The `before` and `after` hooks of the modules are run in a single
+        :class:`~devinstaller_core.command.SessionProg`, which loads the prog
+        module using `load_prog` the first time a hook is run.
+
+        Raises:
+            SpecificationError
+                with error code :ref:`error-code-S103` listing every constant
+                missing in the instructions of all the modules at once
+        """
         module_list: List[TypeCommonModule] = schema_object["modules"]
+        indexed: Optional[List[TypeCommonModule]] = None
+        if module_index is not None:
+            indexed = module_index.get_modules(schema_object, platform_object.codename)
         self.graph: Dict[str, TypeAnyModule] = {}
         self.orphan_modules: Set[str] = set()
-        module_classes: Dict[str, Any] = {
-            "app": ModuleApp,
-            "file": ModuleFile,
-            "folder": ModuleFolder,
-            "link": ModuleLink,
-            "group": ModuleGroup,
-            "phony": ModulePhony,
-        }
-        for module_object in module_list:
-            if self.check_platform_compatibility(platform_object, module_object):
+        self.checkpoint: Optional[cp.Checkpoint] = None
+        self.transaction: Optional[t.FileTransaction] = None
+        self.prog_session = c.SessionProg(load_prog)
+        self.platform_codename: str = platform_object.codename
+        missing_constants: Dict[str, Set[str]] = {}
+        for module_object in module_list if indexed is None else indexed:
+            if indexed is not None or self.check_platform_compatibility(
+                platform_object, module_object
+            ):
+                # Copying so the schema object can be reused for other graphs
+                module_object = cast(TypeCommonModule, dict(module_object))
                 module_type = module_object["module_type"]
                 module_object["before"] = before_each
                 module_object["after"] = after_each
@@ -72,8 +124,14 @@ class DependencyGraph:
                 cleaned_object: Dict[str, Any] = u.Dictionary.remove_key(
                     module_object, "binds"
                 )
+                missing = tp.find_missing(
+                    cleaned_object, {i["key"]: i["value"] for i in patched_constants}
+                )
+                if missing:
+                    missing_constants[module_object["name"]] = missing
+                    continue
                 try:
-                    new_module = module_classes[module_type](**cleaned_object)
+                    new_module = MODULE_CLASSES[module_type](**cleaned_object)
                 except TypeError as err:
                     error = str(err).split(" ")[-1]
                     raise e.SpecificationError(
@@ -89,6 +147,29 @@ class DependencyGraph:
                     )
                 else:
                     self.graph[codename] = new_module
+        if missing_constants:
+            raise tp.missing_constants_error(missing_constants)
+
+    @classmethod
+    @typechecked
+    def from_modules(
+        cls, modules: Dict[str, TypeAnyModule], platform_codename: str = "MOCK"
+    ) -> "DependencyGraph":
+        """Create the dependency graph from already resolved module objects
+
+        Args:
+            modules: The module objects with their codename as the key
+            platform_codename: The codename of the platform the modules are resolved for
+
+        Returns:
+            The dependency graph
+        """
+        dependency_graph = cls(
+            schema_object={"modules": []}, platform_object=BlockPlatform()
+        )
+        dependency_graph.graph = modules
+        dependency_graph.platform_codename = platform_codename
+        return dependency_graph
 
     def generate_global_constants_graph(self, constants: List[TypeConstant]) -> None:
         """Generate the graph for global constants
@@ -204,19 +285,167 @@ class DependencyGraph:
         e = deserialize(d)
         return e
 
-    def uninstall_orphan_modules(self) -> None:
+    def uninstall_orphan_modules(self, max_workers: Optional[int] = None) -> None:
         """Uninstall orphan modules
 
         Modules which are not used by any other modules
+
+        An orphan module is uninstalled only after all the orphan modules
+        depending on it are uninstalled. If `max_workers` is more than 1 then
+        the modules which don't depend on each other are uninstalled in
+        parallel by the :class:`~devinstaller_core.scheduler.Scheduler`.
+
+        Args:
+            max_workers: Maximum number of modules uninstalled at the same
+                time. Defaults to `DDOT_MAX_WORKERS`.
+        """
+        levels = self.uninstall_levels(sorted(self.orphan_modules))
+        if max_workers is None:
+            max_workers = s.settings.DDOT_MAX_WORKERS
+        if max_workers > 1:
+            sc.Scheduler(self, max_workers).uninstall(levels)
+            return None
+        for level in levels:
+            for module_name in level:
+                self.graph[module_name].uninstall()
+
+    @typechecked
+    def uninstall_levels(self, module_names: List[str]) -> List[List[str]]:
+        """Group the modules to be uninstalled into levels.
+
+        Every module is only depended upon by the modules in the levels before
+        it, so all the modules in a level can be uninstalled in parallel. Only
+        the dependencies among the given modules are considered.
+
+        Args:
+            module_names: The modules to be uninstalled
+
+        Returns:
+            List of levels, each level is a list of module names in reverse
+            install order
+        """
+        selected = set(module_names)
+        order = [i for i in self.install_order(module_names) if i in selected]
+        dependents: Dict[str, List[str]] = {}
+        for module_name in order:
+            for child_name in self.dependencies(module_name):
+                dependents.setdefault(child_name, []).append(module_name)
+        level: Dict[str, int] = {}
+        for module_name in reversed(order):
+            parents = [level[i] for i in dependents.get(module_name, [])]
+            level[module_name] = max(parents) + 1 if parents else 0
+        levels: List[List[str]] = [
+            [] for _ in range(max(level.values(), default=-1) + 1)
+        ]
+        for module_name in reversed(order):
+            levels[level[module_name]].append(module_name)
+        return levels
+
+    def rollback(self) -> None:
+        """Rollback the filesystem changes made in the current run by the
+        modules in the graph, in the reverse order in which they were made.
+
+        The changes of the modules released at the end of a successful run and
+        the changes made in the earlier runs are not rolled back.
+        """
+        if self.transaction is None:
+            return None
+        aliases = [
+            i
+            for i in self.transaction.run_aliases
+            if i in self.graph and i in self.transaction.entries
+        ]
+        self.transaction.rollback_all(aliases)
+        self.transaction.close()
+
+    @typechecked
+    def reset(self) -> None:
+        """Reset the `status` of all the modules and the orphan modules, so
+        the graph can be installed again.
         """
-        for module_name in self.orphan_modules:
-            self.graph[module_name].uninstall()
+        for module in self.graph.values():
+            module.status = None
+        self.orphan_modules = set()
+
+    @typechecked
+    def dependencies(self, module_name: str) -> List[str]:
+        """Returns the `requires` followed by the `optionals` of the module"""
+        module = self.graph[module_name]
+        requires: Optional[List[str]] = getattr(module, "requires", None)
+        optionals: Optional[List[str]] = getattr(module, "optionals", None)
+        return (requires or []) + (optionals or [])
+
+    @typechecked
+    def install_order(self, requirement_list: List[str]) -> List[str]:
+        """Returns the order in which the modules will be installed, without
+        installing anything.
+
+        Follows the same reverse DFS logic as :meth:`traverse`.
+
+        Args:
+            requirement_list: The list of modules to be installed
+
+        Raises:
+            SpecificationError
+                if one of your module requires but the required module itself is not present
+        """
+        order: List[str] = []
+        visited: Set[str] = set()
+
+        def visit(module_name: str) -> None:
+            if module_name not in self.graph:
+                raise e.SpecificationError(
+                    error=module_name,
+                    error_code="S100",
+                    message="The name of the module given by you didn't match with the codenames of the modules",
+                )
+            if module_name in visited:
+                return None
+            visited.add(module_name)
+            for child_name in self.dependencies(module_name):
+                visit(child_name)
+            order.append(module_name)
+
+        for module_name in requirement_list:
+            visit(module_name)
+        return order
+
+    @typechecked
+    def install_levels(self, requirement_list: List[str]) -> List[List[str]]:
+        """Group the modules to be installed into levels.
+
+        Every module only depends on the modules in the levels before it, so all
+        the modules in a level can be installed in parallel.
+
+        Args:
+            requirement_list: The list of modules to be installed
+
+        Returns:
+            List of levels, each level is a list of module names in install order
+        """
+        order = self.install_order(requirement_list)
+        level: Dict[str, int] = {}
+        for module_name in order:
+            parents = [level[i] for i in self.dependencies(module_name) if i in level]
+            level[module_name] = max(parents) + 1 if parents else 0
+        levels: List[List[str]] = [
+            [] for _ in range(max(level.values(), default=-1) + 1)
+        ]
+        for module_name in order:
+            levels[level[module_name]].append(module_name)
+        return levels
 
     def module_list(self) -> List[TypeAnyModule]:
         """Returns the list of all the modules that have been initialized by the Module dependency"""
         return list(self.graph.values())
 
-    def install(self, requirement_list: List[str]) -> None:
+    def install(
+        self,
+        requirement_list: List[str],
+        checkpoint: Optional[cp.Checkpoint] = None,
+        transaction: Optional[t.FileTransaction] = None,
+        max_workers: Optional[int] = None,
+    ) -> None:
         """Install all the modules you want
 
         The `traverse` function can install only one module and its dependencies, but
@@ -225,9 +454,131 @@ class DependencyGraph:
         It is a wrapper around the `traverse` method.
 
         This method takes in a list as an argument and installs it.
+
+        If a `checkpoint` is given then the progress is recorded in it and the
+        state restored from it is used to skip the work which is already done.
+        Once all the modules are traversed the checkpoint is cleared.
+
+        If a `transaction` is given then every filesystem change made by the
+        modules is journaled in it, and the changes made by a module are
+        rolled back if its installation fails. Once all the modules are
+        traversed the snapshots of the modules installed successfully are
+        released, except for the orphan modules.
+
+        The hook functions of the modules are checked before any module is
+        installed, see :meth:`check_hooks`.
+
+        If `DDOT_METRICS_FILE` is set then the metrics of the run are written
+        into it once all the modules are traversed.
+
+        If `max_workers` is more than 1 then the modules are installed in
+        parallel by the :class:`~devinstaller_core.scheduler.Scheduler`, which
+        respects the `locks` and the `slots` of the modules. The durations of
+        the modules are recorded in the `DDOT_STATE_DIR` so the next runs can
+        start the longest chains first.
+
+        Args:
+            requirement_list: The list of modules to be installed
+            checkpoint: The checkpoint for the current run
+            transaction: The filesystem transaction for the current run
+            max_workers: Maximum number of modules installed at the same time.
+                Defaults to `DDOT_MAX_WORKERS`.
         """
-        for module_name in requirement_list:
-            self.traverse(module_name)
+        self.check_hooks(requirement_list)
+        self.checkpoint = checkpoint
+        self.transaction = transaction
+        if checkpoint is not None:
+            self.restore(checkpoint)
+        try:
+            with mt.collect(self):
+                if max_workers is None:
+                    max_workers = s.settings.DDOT_MAX_WORKERS
+                if max_workers > 1:
+                    with hi.record(hi.get_history()) as history:
+                        scheduler = sc.Scheduler(self, max_workers, history=history)
+                        scheduler.run(requirement_list)
+                else:
+                    for module_name in requirement_list:
+                        self.traverse(module_name)
+                    self.prune_orphans(requirement_list)
+            if transaction is not None:
+                self.release()
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+            if transaction is not None:
+                transaction.close()
+        if checkpoint is not None:
+            checkpoint.clear()
+
+    @typechecked
+    def check_hooks(self, requirement_list: List[str]) -> None:
+        """Check if the hook functions of all the modules to be installed are
+        defined in the prog file, so a missing hook doesn't stop the
+        installation after some of the modules were already installed.
+
+        Args:
+            requirement_list: The list of modules to be installed
+
+        Raises:
+            SpecificationError
+                with error code :ref:`error-code-S104`
+        """
+        hooks: Set[str] = set()
+        for module_name in self.install_order(requirement_list):
+            module = self.graph[module_name]
+            hooks.update(i for i in [module.before, module.after] if i is not None)
+        for function_name in sorted(hooks):
+            self.prog_session.check(function_name)
+
+    @typechecked
+    def prune_orphans(self, requirement_list: List[str]) -> None:
+        """Remove the modules which are still needed from the orphan modules
+
+        A module is still needed if it was not failed and it is either in the
+        requirement list or a dependency of a module installed successfully.
+
+        Args:
+            requirement_list: The list of modules which were installed
+        """
+        needed = set(requirement_list)
+        for module_name, module in self.graph.items():
+            if module.status == "success":
+                needed.update(self.dependencies(module_name))
+        self.orphan_modules.difference_update(
+            i for i in needed if i in self.graph and self.graph[i].status != "failed"
+        )
+
+    def release(self) -> None:
+        """Release the snapshots of the modules which were installed
+        successfully and are not orphans, since they won't be rolled back
+        """
+        assert self.transaction is not None
+        for alias in list(self.transaction.run_aliases):
+            module = self.graph.get(alias)
+            if (
+                module is not None
+                and module.status == "success"
+                and alias not in self.orphan_modules
+                and alias in self.transaction.entries
+            ):
+                self.transaction.release(alias)
+
+    @typechecked
+    def restore(self, checkpoint: cp.Checkpoint) -> None:
+        """Restore the `status` of the modules and the orphan modules from
+        the checkpoint of the previous run.
+
+        Modules which were still in progress are not restored, so they are
+        installed again but the instructions which were completed are skipped.
+
+        Args:
+            checkpoint: The checkpoint of the previous run
+        """
+        for module_name, status in checkpoint.statuses.items():
+            if module_name in self.graph and status != "in progress":
+                self.graph[module_name].status = status
+        self.orphan_modules = set(checkpoint.orphan_modules)
 
     @typechecked
     def traverse(self, module_name: str) -> None:
@@ -282,11 +633,8 @@ class DependencyGraph:
             self.traverse(child_name)
             if self.graph[child_name].status != "failed":
                 continue
-            ui.print(
-                error_message(
-                    f"The module [red]{child_name}[/red] in the requires of [red]{module.alias}[/red] has failed."
-                )
-            )
+            assert module.alias is not None
+            ev.publish(ev.RequiredModuleFailed(module=module.alias, child=child_name))
             module.status = "failed"
             self.orphan_modules.update(module.requires[:index])
             return None
@@ -311,11 +659,9 @@ class DependencyGraph:
         for child_name in module.optionals:
             self.traverse(child_name)
             if self.graph[child_name].status == "failed":
-                ui.print(
-                    warning_message(
-                        f"The module [{WARNING_COLOR_HEX}]{child_name}[/{WARNING_COLOR_HEX}] in the optionals of [{WARNING_COLOR_HEX}]{module.alias}[/{WARNING_COLOR_HEX}] has failed, \n"
-                        "but the installation for remaining modules will continue."
-                    )
+                assert module.alias is not None
+                ev.publish(
+                    ev.OptionalModuleFailed(module=module.alias, child=child_name)
                 )
 
     @typechecked
@@ -323,33 +669,113 @@ class DependencyGraph:
         """The main function which handles the installation as well as its final installation
         status
         """
-
-        def check_function_name(function_name: Optional[str]) -> None:
-            if function_name is not None:
-                session = c.SessionProg()
-                session.launch(function_name, prog_file_path="", language_code="py")
-
         module: TypeAnyModule = self.graph[module_name]
+        if self.checkpoint is not None:
+            self.checkpoint.module_started(module_name)
+        ev.publish(ev.ModuleStarted(module=module_name))
+        start = time.monotonic()
+        module.attach_checkpoint(self.checkpoint)
+        module.attach_transaction(self.transaction)
         try:
-            check_function_name(module.before)
-            module.install()
-            check_function_name(module.after)
+            with pr.phase(f"install-{module_name}"):
+                self.install_module(module_name)
             module.status = "success"
             return None
         except e.ModuleInstallationFailed:
-            ui.print(
-                error_message(
-                    f"The installation for the module: [red]{module.alias}[/red] failed. \n"
-                    "And all the instructions has been rolled back."
+            self.fail_module(module_name)
+        finally:
+            ev.publish(
+                ev.ModuleFinished(
+                    module=module_name,
+                    status=module.status,
+                    duration=round(time.monotonic() - start, 6),
                 )
             )
-            module.status = "failed"
-            if isinstance(module, ModulePhony):
-                return None
-            if module.requires is not None:
-                self.orphan_modules.update(module.requires)
-            if module.optionals is not None:
-                self.orphan_modules.update(module.optionals)
+            if self.checkpoint is not None and module.status != "in progress":
+                self.checkpoint.module_finished(
+                    module_name, module.status, self.orphan_modules
+                )
+
+    @typechecked
+    def install_module(self, module_name: str) -> None:
+        """Install the module along with its `before` and `after` hooks
+
+        If the `after` hook of the module fails, or the module fails to change
+        the filesystem, then the instructions completed by the module are
+        rolled back using their `rollback` commands. Its filesystem changes
+        are rolled back by :meth:`fail_module`.
+
+        Raises:
+            ModuleInstallationFailed
+                if the module or one of its hooks failed
+        """
+        module: TypeAnyModule = self.graph[module_name]
+        self.launch_hook(module_name, "before", module.before)
+        try:
+            module.install()
+        except OSError as err:
+            self.rollback_completed(module_name)
+            raise e.ModuleInstallationFailed(
+                error=module_name, error_code="D109", message=str(err)
+            )
+        try:
+            self.launch_hook(module_name, "after", module.after)
+        except e.ModuleInstallationFailed:
+            self.rollback_completed(module_name)
+            raise
+
+    @typechecked
+    def launch_hook(
+        self, module_name: str, hook: str, function_name: Optional[str]
+    ) -> None:
+        """Run the hook function of the module, if it has one
+
+        Args:
+            module_name: The name of the module
+            hook: Either `before` or `after`
+            function_name: The name of the function in the prog file
+        """
+        if function_name is None:
+            return None
+        duration = self.prog_session.launch(function_name)
+        ev.publish(
+            ev.HookFinished(
+                module=module_name,
+                hook=hook,
+                function=function_name,
+                duration=round(duration, 6),
+            )
+        )
+
+    @typechecked
+    def rollback_completed(self, module_name: str) -> None:
+        """Rollback the instructions completed by the module, quitting the
+        program if the rollback fails
+        """
+        module: TypeAnyModule = self.graph[module_name]
+        try:
+            module.rollback_completed()
+        except e.ModuleRollbackFailed:
+            ev.publish(
+                ev.RollbackFailed(module=module_name, display=str(module.display))
+            )
+            sys.exit(1)
+
+    @typechecked
+    def fail_module(self, module_name: str) -> None:
+        """Mark the module as failed, restore its filesystem changes and add
+        its dependencies to the orphan modules
+        """
+        module: TypeAnyModule = self.graph[module_name]
+        ev.publish(ev.ModuleFailed(module=module_name))
+        module.status = "failed"
+        module.restore()
+        if isinstance(module, ModulePhony):
+            return None
+        if module.requires is not None:
+            self.orphan_modules.update(module.requires)
+        if module.optionals is not None:
+            self.orphan_modules.update(module.optionals)
 
     @typechecked
     def check_platform_compatibility(
@@ -424,15 +850,25 @@ class DependencyGraph:
             new_module: The new module which happens to share the same
                codename of the `old_module`
 
+        The selection is made using the selection policy if it has a rule for
+        the `module` kind, in which case the user is not asked.
+
         Returns:
             The selected module
         """
-        ui.print("Oops, looks like your spec has two modules with the same codename.")
-        ui.print("But for the current session I can use only one.")
-        ui.print("This is the first module")
-        ui.print(old_module)
-        ui.print("And this is the second module")
-        ui.print(new_module)
+        index = p.get_policy().select(
+            "module",
+            [old_module.name, new_module.name],
+            platform_codename=self.platform_codename,
+        )
+        if index is not None:
+            return [old_module, new_module][index]
+        assert new_module.alias is not None
+        ev.publish(
+            ev.DuplicateModule(
+                module=new_module.alias, first=str(old_module), second=str(new_module)
+            )
+        )
         title = "Do you mind selecting one?"
         choices = ["First one", "Second one"]
         selection = ui.select(title, choices)
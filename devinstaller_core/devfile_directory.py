@@ -0,0 +1,142 @@
+"""Spec split into a directory of files
+
+Instead of a single spec file, the `file:` path can point to a directory. Every
+TOML, YAML or JSON file inside it, usually one per module or group, is a spec
+fragment and the fragments are merged in the order of their paths, just like
+included spec files.
+
+Each fragment is hashed, parsed and validated on its own, and the validated
+fragments are cached by their digest. So after an edit only the changed files
+are read in full, parsed and validated again.
+"""
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from typeguard import typechecked
+
+from devinstaller_core import digest as dg
+from devinstaller_core import exception as e
+from devinstaller_core import file_manager as f
+from devinstaller_core import metrics as mt
+from devinstaller_core import schema as s
+from devinstaller_core import utilities as u
+
+FRAGMENT_FORMATS = {"toml": "toml", "yaml": "yaml", "yml": "yaml", "json": "json"}
+"""The file format of the fragments for each file extension
+
+Files with any other extension are ignored.
+"""
+
+MAX_FRAGMENTS = 1024
+"""The maximum number of validated fragments kept in `validated_fragments`
+"""
+
+validated_fragments = u.LRUCache(MAX_FRAGMENTS)
+"""The validated fragments with the file format and the digest as the key
+"""
+
+_lock = threading.Lock()
+
+
+@dataclass
+class Fragment:
+    """A single file of the spec directory
+
+    parameters:
+        path: The path of the file relative to the directory
+        digest: The digest of the contents of the file
+        document: The validated spec object of the file
+    """
+
+    path: str
+    digest: str
+    document: Dict[Any, Any]
+
+
+@typechecked
+def get_directory(file_path: str) -> Optional[str]:
+    """Returns the full path of the directory if the spec path points to a
+    directory, else None
+
+    Args:
+        file_path: The path to the spec. Follows the spec format.
+    """
+    res = f.DevFileManager.check_path(file_path)
+    if res.method != "file":
+        return None
+    full_path = u.resolve_path(res.path)
+    return full_path if os.path.isdir(full_path) else None
+
+
+@typechecked
+def list_files(directory: str) -> List[str]:
+    """Returns the paths of the fragments relative to the directory, sorted.
+
+    Hidden files and directories are skipped.
+    """
+    paths: List[str] = []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = [i for i in dirs if not i.startswith(".")]
+        for name in files:
+            if name.startswith(".") or name.split(".")[-1] not in FRAGMENT_FORMATS:
+                continue
+            paths.append(os.path.relpath(os.path.join(root, name), directory))
+    return sorted(paths)
+
+
+@typechecked
+def load_fragment(directory: str, path: str) -> Fragment:
+    """Read the fragment, parsing and validating it only if its contents
+    changed since it was last loaded
+
+    Args:
+        directory: The full path of the spec directory
+        path: The path of the fragment relative to the directory
+
+    Raises:
+        SpecificationError
+            with error code :ref:`error-code-S100`, along with the path of
+            the fragment
+    """
+    file_format = FRAGMENT_FORMATS[path.split(".")[-1]]
+    with f.FileManager.open_buffer(os.path.join(directory, path)) as buffer:
+        digest = dg.hash_buffer(buffer)
+        key = f"{file_format}:{digest}"
+        with _lock:
+            document = validated_fragments.get(key)
+        mt.record_cache("fragment_validate", document is not None)
+        if document is None:
+            try:
+                parsed = f.DevFileManager.parse(
+                    str(buffer, "utf-8"), file_format=file_format
+                )
+                document = dict(s.get_validated_document(parsed or {}))
+            except e.SpecificationError as err:
+                raise e.SpecificationError(
+                    error=f"{path}: {err.error}",
+                    error_code=err.error_code,
+                    message=err.message,
+                )
+            with _lock:
+                validated_fragments[key] = document
+    return Fragment(path=path, digest=digest, document=document)
+
+
+@typechecked
+def load(directory: str) -> List[Fragment]:
+    """Load all the fragments of the spec directory in the order they are merged
+
+    Args:
+        directory: The full path of the spec directory
+    """
+    return [load_fragment(directory, i) for i in list_files(directory)]
+
+
+@typechecked
+def get_digest(fragments: List[Fragment]) -> str:
+    """Returns the digest of the spec directory, which changes if any file is
+    added, removed, renamed or edited
+    """
+    return f.FileManager.hash_data("\n".join(f"{i.path}:{i.digest}" for i in fragments))
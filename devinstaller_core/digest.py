@@ -0,0 +1,112 @@
+"""Digests of the spec files, prog files and file module contents
+
+The digests are used only as cache keys, never for security, so the algorithm
+can be switched to the faster `blake2b` using `DDOT_DIGEST_ALGORITHM`. The data
+is hashed a chunk at a time, so a large file is never held twice in memory.
+Memory mapped files are hashed straight from the mapping.
+"""
+import codecs
+import hashlib
+import mmap
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from typeguard import typechecked
+
+from devinstaller_core import exception as e
+from devinstaller_core import settings as s
+
+CHUNK_SIZE = 1024 * 1024
+"""Number of bytes read, downloaded or hashed at a time
+"""
+
+DIGEST_ALGORITHMS: Dict[str, Callable[[], Any]] = {
+    "sha256": hashlib.sha256,
+    "blake2b": hashlib.blake2b,
+}
+"""Algorithms which can be set in `DDOT_DIGEST_ALGORITHM`
+"""
+
+
+@typechecked
+def get_hasher(algorithm: Optional[str] = None) -> Any:
+    """Returns a new hash object of the algorithm, which defaults to
+    `DDOT_DIGEST_ALGORITHM`
+
+    Raises:
+        DevinstallerError
+            with error code :ref:`error-code-D107`
+    """
+    if algorithm is None:
+        algorithm = s.settings.DDOT_DIGEST_ALGORITHM
+    try:
+        return DIGEST_ALGORITHMS[algorithm]()
+    except KeyError:
+        raise e.DevinstallerError(algorithm, "D107")
+
+
+@typechecked
+def hash_data(input_data: str, algorithm: Optional[str] = None) -> str:
+    """Hashes the input string and returns its digest
+
+    The string is encoded a chunk at a time, so a large string is not copied
+    as a whole.
+
+    Args:
+        input_data: The string to be hashed
+        algorithm: One of :data:`DIGEST_ALGORITHMS`. Defaults to
+            `DDOT_DIGEST_ALGORITHM`.
+    """
+    hasher = get_hasher(algorithm)
+    for index in range(0, len(input_data), CHUNK_SIZE):
+        hasher.update(input_data[index : index + CHUNK_SIZE].encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def consume(
+    chunks: Iterable[bytes], algorithm: Optional[str] = None
+) -> Tuple[str, str]:
+    """Hash and decode the chunks of bytes as they arrive
+
+    Args:
+        chunks: The raw bytes of the file
+        algorithm: One of :data:`DIGEST_ALGORITHMS`
+
+    Returns:
+        The decoded string and the digest of the raw bytes
+    """
+    hasher = get_hasher(algorithm)
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    parts = []
+    for chunk in chunks:
+        hasher.update(chunk)
+        parts.append(decoder.decode(chunk))
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts), hasher.hexdigest()
+
+
+def hash_buffer(buffer: Any, algorithm: Optional[str] = None) -> str:
+    """Hashes the raw bytes of the buffer a window at a time, without copying
+    them
+
+    The pages of a memory mapped file are released once they are hashed, so
+    only a single window of the file is resident at a time. Decoding the
+    buffer afterwards, as on a cache miss, maps all of its pages in again.
+
+    Args:
+        buffer: Any object supporting the buffer protocol, like `bytes` or
+            `mmap.mmap`
+        algorithm: One of :data:`DIGEST_ALGORITHMS`
+    """
+    hasher = get_hasher(algorithm)
+    release = getattr(buffer, "madvise", None)
+    if not hasattr(mmap, "MADV_DONTNEED"):
+        release = None
+    with memoryview(buffer) as view:
+        size = len(view)
+        for index in range(0, size, CHUNK_SIZE):
+            end = min(index + CHUNK_SIZE, size)
+            hasher.update(view[index:end])
+            if release is not None:
+                start = index - index % mmap.PAGESIZE
+                release(mmap.MADV_DONTNEED, start, end - start)
+    return hasher.hexdigest()
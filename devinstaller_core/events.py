@@ -0,0 +1,396 @@
+"""Typed events published by the core and the bus delivering them
+
+The core publishes an event for everything worth reporting, like the start of a
+module or the failure of an instruction, instead of printing it. The user
+interaction, the logging, the metrics and the tracing subscribe to the events
+they need.
+
+Events carry only the data. The text shown to the user is created by
+:meth:`Event.text` only when a subscriber asks for it.
+"""
+import dataclasses
+from dataclasses import dataclass
+from typing import Any, Callable, ClassVar, Dict, List, Optional
+
+from devinstaller_core.messages import WARNING_COLOR_HEX, error_message, warning_message
+
+LEVELS = ["debug", "info", "warning", "error"]
+"""Levels of the events
+
+Values allowed:
+    1. `debug`: Shown only in the verbose mode
+    2. `info`: Progress of the run
+    3. `warning`: Something failed but the run continues
+    4. `error`: Something failed
+"""
+
+
+@dataclass
+class Event:
+    """Base class for all the events"""
+
+    name: ClassVar[str] = "event"
+    level: ClassVar[str] = "info"
+
+    def text(self) -> Optional[str]:
+        """Returns the message for the user in rich-text, or None if the event
+        is not shown to the user
+        """
+        return None
+
+    def fields(self) -> Dict[str, Any]:
+        """Returns the data of the event"""
+        return dataclasses.asdict(self)
+
+
+@dataclass
+class PlatformDetected(Event):
+    """The current platform matched a single platform in the spec"""
+
+    name: ClassVar[str] = "platform_detected"
+    platform: str
+
+    def text(self) -> Optional[str]:
+        return f"I see you are using {self.platform}"
+
+
+@dataclass
+class PlatformAmbiguous(Event):
+    """The current platform matched more than one platform in the spec"""
+
+    name: ClassVar[str] = "platform_ambiguous"
+    level: ClassVar[str] = "warning"
+    platforms: List[str]
+
+    def text(self) -> Optional[str]:
+        return 'Hey.. your current platform supports multiple "platform" declared in the spec file'
+
+
+@dataclass
+class PlatformNotFound(Event):
+    """The current platform didn't match any platform in the spec"""
+
+    name: ClassVar[str] = "platform_not_found"
+    level: ClassVar[str] = "warning"
+    platforms: List[str]
+
+    def text(self) -> Optional[str]:
+        return "Hey.. I couldn't find the platform you are looking for. Can you do this manually?"
+
+
+@dataclass
+class DuplicateModule(Event):
+    """Two modules share the same codename and the user has to select one"""
+
+    name: ClassVar[str] = "duplicate_module"
+    level: ClassVar[str] = "warning"
+    module: str
+    first: str
+    second: str
+
+    def text(self) -> Optional[str]:
+        return (
+            "Oops, looks like your spec has two modules with the same codename.\n"
+            "But for the current session I can use only one.\n"
+            f"This is the first module\n{self.first}\n"
+            f"And this is the second module\n{self.second}"
+        )
+
+
+@dataclass
+class ModuleStarted(Event):
+    """The graph started installing the module"""
+
+    name: ClassVar[str] = "module_started"
+    module: str
+
+
+@dataclass
+class ModuleFinished(Event):
+    """The graph finished installing the module"""
+
+    name: ClassVar[str] = "module_finished"
+    module: str
+    status: Optional[str]
+    duration: float
+
+
+@dataclass
+class HookFinished(Event):
+    """The `before` or the `after` hook of the module finished"""
+
+    name: ClassVar[str] = "hook_finished"
+    level: ClassVar[str] = "debug"
+    module: str
+    hook: str
+    function: str
+    duration: float
+
+
+@dataclass
+class ModuleFailed(Event):
+    """The installation of the module failed and it was rolled back"""
+
+    name: ClassVar[str] = "module_failed"
+    level: ClassVar[str] = "error"
+    module: str
+
+    def text(self) -> Optional[str]:
+        return error_message(
+            f"The installation for the module: [red]{self.module}[/red] failed. \n"
+            "And all the instructions has been rolled back."
+        )
+
+
+@dataclass
+class RequiredModuleFailed(Event):
+    """A module in the `requires` of the module failed"""
+
+    name: ClassVar[str] = "required_module_failed"
+    level: ClassVar[str] = "error"
+    module: str
+    child: str
+
+    def text(self) -> Optional[str]:
+        return error_message(
+            f"The module [red]{self.child}[/red] in the requires of [red]{self.module}[/red] has failed."
+        )
+
+
+@dataclass
+class OptionalModuleFailed(Event):
+    """A module in the `optionals` of the module failed"""
+
+    name: ClassVar[str] = "optional_module_failed"
+    level: ClassVar[str] = "warning"
+    module: str
+    child: str
+
+    def text(self) -> Optional[str]:
+        color = WARNING_COLOR_HEX
+        return warning_message(
+            f"The module [{color}]{self.child}[/{color}] in the optionals of [{color}]{self.module}[/{color}] has failed, \n"
+            "but the installation for remaining modules will continue."
+        )
+
+
+@dataclass
+class InstallStarted(Event):
+    """The module started running its own installation"""
+
+    name: ClassVar[str] = "install_started"
+    module: str
+    display: str
+
+    def text(self) -> Optional[str]:
+        return f"Installing module: {self.display}..."
+
+
+@dataclass
+class CommandsStarted(Event):
+    """The phony module started running its commands"""
+
+    name: ClassVar[str] = "commands_started"
+    module: str
+    display: str
+
+    def text(self) -> Optional[str]:
+        return f"Running commands in: {self.display}..."
+
+
+@dataclass
+class InstructionStarted(Event):
+    """The module started running an instruction"""
+
+    name: ClassVar[str] = "instruction_started"
+    level: ClassVar[str] = "debug"
+    module: str
+    step: int
+    cmd: str
+
+
+@dataclass
+class InstructionFinished(Event):
+    """The instruction finished successfully"""
+
+    name: ClassVar[str] = "instruction_finished"
+    level: ClassVar[str] = "debug"
+    module: str
+    step: int
+    duration: float
+
+
+@dataclass
+class InstructionFailed(Event):
+    """The instruction failed"""
+
+    name: ClassVar[str] = "instruction_failed"
+    level: ClassVar[str] = "error"
+    module: str
+    step: int
+    returncode: int
+    duration: float
+
+
+@dataclass
+class RollbackStarted(Event):
+    """The module started rolling back its instructions"""
+
+    name: ClassVar[str] = "rollback_started"
+    level: ClassVar[str] = "error"
+    module: str
+    steps: int
+
+    def text(self) -> Optional[str]:
+        return (
+            "\n"
+            + error_message(
+                f"There was some error in installing module: [red]{self.module}[/red],\n"
+                "because of that I am rolling back all the changes so far."
+            )
+            + "\n"
+        )
+
+
+@dataclass
+class InstructionRolledBack(Event):
+    """An instruction was rolled back using its `rollback` command"""
+
+    name: ClassVar[str] = "instruction_rolled_back"
+    level: ClassVar[str] = "debug"
+    module: str
+    cmd: str
+    rollback: str
+
+    def text(self) -> Optional[str]:
+        return warning_message(f"Rolling back `{self.cmd}` using `{self.rollback}`")
+
+
+@dataclass
+class RollbackFailed(Event):
+    """A rollback instruction failed"""
+
+    name: ClassVar[str] = "rollback_failed"
+    level: ClassVar[str] = "error"
+    module: str
+    display: str
+
+    def text(self) -> Optional[str]:
+        return f"Rollback instructions for {self.display} failed. Quitting program."
+
+
+@dataclass
+class RestoreFailed(Event):
+    """A target touched by the module couldn't be restored while rolling it
+    back, like a created folder which is no longer empty
+    """
+
+    name: ClassVar[str] = "restore_failed"
+    level: ClassVar[str] = "warning"
+    module: str
+    target: str
+    error: str
+
+    def text(self) -> Optional[str]:
+        return warning_message(
+            f"Couldn't restore {self.target} while rolling back {self.module}: "
+            f"{self.error}"
+        )
+
+
+@dataclass
+class UninstallStarted(Event):
+    """The module started uninstalling"""
+
+    name: ClassVar[str] = "uninstall_started"
+    module: str
+    display: str
+
+    def text(self) -> Optional[str]:
+        return f"Uninstalling module: {self.display}..."
+
+
+@dataclass
+class UninstallSkipped(Event):
+    """The module has no uninstallation instructions"""
+
+    name: ClassVar[str] = "uninstall_skipped"
+    level: ClassVar[str] = "warning"
+    module: str
+    display: str
+
+    def text(self) -> Optional[str]:
+        return f"No un-installation instructions found for {self.display}."
+
+
+@dataclass
+class UninstallFailed(Event):
+    """The uninstallation of the module failed"""
+
+    name: ClassVar[str] = "uninstall_failed"
+    level: ClassVar[str] = "error"
+    module: str
+    display: str
+
+    def text(self) -> Optional[str]:
+        return f"Un-installation of {self.display} failed. Quitting program."
+
+
+@dataclass
+class WatchFailed(Event):
+    """The spec couldn't be loaded again after a change in the watch mode"""
+
+    name: ClassVar[str] = "watch_failed"
+    level: ClassVar[str] = "error"
+    error: str
+
+    def text(self) -> Optional[str]:
+        return error_message(f"Couldn't re-apply the changes: {self.error}")
+
+
+@dataclass
+class WatchApplied(Event):
+    """The modules affected by a change were re-applied in the watch mode"""
+
+    name: ClassVar[str] = "watch_applied"
+    modules: List[str]
+    seconds: float
+
+    def text(self) -> Optional[str]:
+        return f"Re-applied {len(self.modules)} modules in {self.seconds:.2f}s"
+
+
+Subscriber = Callable[[Event], None]
+
+
+class EventBus:
+    """Delivers the published events to all the subscribers, in the order
+    they subscribed
+    """
+
+    def __init__(self) -> None:
+        self.subscribers: List[Subscriber] = []
+
+    def subscribe(self, subscriber: Subscriber) -> Subscriber:
+        """Add the subscriber. Can be used as a decorator."""
+        self.subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """Remove the subscriber"""
+        self.subscribers.remove(subscriber)
+
+    def publish(self, event: Event) -> None:
+        """Deliver the event to all the subscribers"""
+        for subscriber in self.subscribers:
+            subscriber(event)
+
+
+bus = EventBus()
+"""The bus used by the core
+"""
+
+
+def publish(event: Event) -> None:
+    """Publish the event on the bus"""
+    bus.publish(event)
@@ -40,6 +40,10 @@ import subprocess
 spec_errors = {
     "S100": "Your devfile is not a valid.",
     "S101": "There was an error parsing the `file_path` statement",
+    "S102": "The spec files include each other in a cycle",
+    "S103": "The instructions use constants which are not declared",
+    "S104": "The hook function is not defined in the prog file",
+    "S105": "The same name is declared in more than one spec file",
 }
 
 dev_errors = {
@@ -47,6 +51,13 @@ dev_errors = {
     "D101": "Invalid error code",
     "D102": "The Extension is not inherited from the required Base class",
     "D103": "Error in executing instructions",
+    "D104": "The module object is not of any known module type",
+    "D105": "The lockfile is not valid",
+    "D106": "The selection policy couldn't make the selection",
+    "D107": "The digest algorithm is not supported",
+    "D108": "Error in executing the hook function",
+    "D109": "Error in changing the filesystem",
+    "D110": "The plan can't be applied on the targets",
 }
 
 
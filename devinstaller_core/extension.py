@@ -3,9 +3,10 @@
 import importlib
 import pkgutil
 from abc import ABC, abstractmethod
-from typing import Any, Generic, List, TypeVar, cast
+from typing import Any, Dict, Generic, List, Optional, Tuple, TypeVar, cast
 
 from devinstaller_core import exception as e
+from devinstaller_core import settings as s
 
 
 class BaseExt(ABC):
@@ -69,7 +70,7 @@ class ExtProg(BaseExtLang):
     """
 
     @abstractmethod
-    def launch(self, launch: str) -> None:
+    def launch(self, launch: str, prog_module: Any) -> None:
         """Execute the given `launch` attribute using the prog module
         """
 
@@ -107,9 +108,39 @@ class ExtUserInteraction(BaseExtApplication):
     def track(self, *args, **kwargs) -> Any:
         """Track the progress of list of tasks"""
 
+    def event(self, event: Any) -> None:
+        """Report an event from :mod:`devinstaller_core.events`.
+
+        Prints the text of the event by default. The `debug` events are
+        printed only in the verbose mode.
+        """
+        if event.level == "debug" and not s.settings.DDOT_VERBOSE:
+            return None
+        text = event.text()
+        if text is not None:
+            self.print(text)
+
 
 ExtensionModule = TypeVar("ExtensionModule", bound=BaseExt)
 
+_discovered_extensions: Optional[List[str]] = None
+_loaded_extensions: Dict[Tuple[str, str], Any] = {}
+
+
+def discover_extensions() -> List[str]:
+    """Returns the names of all the installed `devinstaller_ext_` packages.
+
+    Searching the installed packages is slow so it is done only once per process.
+    """
+    global _discovered_extensions
+    if _discovered_extensions is None:
+        _discovered_extensions = [
+            name
+            for finder, name, ispkg in pkgutil.iter_modules()
+            if name.startswith("devinstaller_ext_")
+        ]
+    return _discovered_extensions
+
 
 class BaseExtension(Generic[ExtensionModule], ABC):
     """Base class for importing extensions"""
@@ -122,11 +153,8 @@ class BaseExtension(Generic[ExtensionModule], ABC):
             ext_class: The name of the class which will be imported and
                 used
         """
-        self.extensions = builtin_extensions
+        self.extensions = builtin_extensions + discover_extensions()
         self.ext_class = ext_class
-        for finder, name, ispkg in pkgutil.iter_modules():
-            if name.startswith("devinstaller_ext_"):
-                self.extensions.append(name)
         for ext_path in self.extensions:
             ext = self.import_ext(ext_path, self.ext_class)
             self.load_extension(ext)
@@ -144,9 +172,19 @@ class BaseExtension(Generic[ExtensionModule], ABC):
     def import_ext(cls, module_path: str, ext_class_name: str) -> ExtensionModule:
         """Import Extension using the name of the module and the class where it is defined
 
+        The instances are cached so every session shares the same extension object.
+
         Returns:
             Instance of the class
         """
+        key = (module_path, ext_class_name)
+        if key not in _loaded_extensions:
+            _loaded_extensions[key] = cls.create_ext(module_path, ext_class_name)
+        return _loaded_extensions[key]
+
+    @classmethod
+    def create_ext(cls, module_path: str, ext_class_name: str) -> ExtensionModule:
+        """Import the Extension and create a new instance of it"""
         module = importlib.import_module(module_path)
         ext_class = getattr(module, ext_class_name)
         try:
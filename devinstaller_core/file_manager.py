@@ -35,23 +35,35 @@
 
 """Includes "manager" for handling the `devfile` and your system files
 """
-import hashlib
+import contextlib
+import mmap
 import os
 import re
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Callable, Dict, cast
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, cast
 
 import anymarkup
 import requests
 from typeguard import typechecked
 
 from devinstaller_core import common_models as m
+from devinstaller_core import digest as dg
 from devinstaller_core import exception as e
+from devinstaller_core import metrics as mt
+from devinstaller_core import profiling as pr
 from devinstaller_core import utilities
 
 file_format_ext = {"yml": "yaml"}
 
+MAX_PARSED_FILES = 64
+"""The maximum number of parsed files kept in :attr:`DevFileManager.cache`
+"""
+
+MMAP_THRESHOLD = 16 * 1024 * 1024
+"""Files of at least this many bytes are memory mapped instead of read
+"""
+
 
 class FileManager:
     """The "manager" for handling your system files."""
@@ -68,7 +80,7 @@ class FileManager:
         """
         full_path = utilities.resolve_path(file_path)
         try:
-            with open(str(full_path), "r") as _f:
+            with pr.phase("read"), open(str(full_path), "r") as _f:
                 return _f.read()
         except FileNotFoundError:
             raise e.FileNotFound
@@ -83,8 +95,9 @@ class FileManager:
         Returns:
             String representation of file
         """
-        response = requests.get(url)
-        return response.content.decode("utf-8")
+        with pr.phase("download"):
+            response = requests.get(url)
+            return response.content.decode("utf-8")
 
     @classmethod
     def save(cls, file_content: str, file_path: str) -> None:
@@ -93,9 +106,82 @@ class FileManager:
             f.write(file_content)
 
     @classmethod
-    def hash_data(cls, input_data: str) -> str:
-        """Hashes the input string and returns its digest"""
-        return hashlib.sha256(input_data.encode("utf-8")).hexdigest()
+    def hash_data(cls, input_data: str, algorithm: Optional[str] = None) -> str:
+        """Hashes the input string and returns its digest
+
+        Args:
+            input_data: The string to be hashed
+            algorithm: One of :data:`~devinstaller_core.digest.DIGEST_ALGORITHMS`.
+                Defaults to `DDOT_DIGEST_ALGORITHM`.
+        """
+        return dg.hash_data(input_data, algorithm)
+
+    @classmethod
+    @contextlib.contextmanager
+    def open_buffer(cls, file_path: str) -> Iterator[Any]:
+        """Opens the file as a read only buffer of its raw bytes
+
+        Large files are memory mapped, so their contents are hashed straight
+        from the page cache instead of being read into memory first. This
+        saves memory only when the contents are not needed after hashing,
+        like on a cache hit. Decoding the whole buffer still needs as much
+        memory as reading the file. The buffer is valid only inside the
+        `with` block.
+
+        Args:
+            file_path: The path to the file
+
+        Yields:
+            `bytes` or `mmap.mmap` with the contents of the file
+        """
+        full_path = utilities.resolve_path(file_path)
+        try:
+            _f = open(str(full_path), "rb")
+        except FileNotFoundError:
+            raise e.FileNotFound
+        with _f:
+            size = os.fstat(_f.fileno()).st_size
+            if size == 0 or size < MMAP_THRESHOLD:
+                with pr.phase("read"):
+                    data = _f.read()
+                yield data
+                return
+            with mmap.mmap(_f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                yield buffer
+
+    @classmethod
+    def read_digest(
+        cls, file_path: str, algorithm: Optional[str] = None
+    ) -> Tuple[str, str]:
+        """Reads the file and hashes its raw bytes
+
+        Args:
+            file_path: The path to the file
+            algorithm: One of :data:`~devinstaller_core.digest.DIGEST_ALGORITHMS`
+
+        Returns:
+            The string representation of the file and its digest
+        """
+        with cls.open_buffer(file_path) as buffer:
+            digest = dg.hash_buffer(buffer, algorithm)
+            return str(buffer, "utf-8"), digest
+
+    @classmethod
+    def download_digest(
+        cls, url: str, algorithm: Optional[str] = None
+    ) -> Tuple[str, str]:
+        """Downloads the file and hashes its raw bytes as they are received
+
+        Args:
+            url: Url of the file
+            algorithm: One of :data:`~devinstaller_core.digest.DIGEST_ALGORITHMS`
+
+        Returns:
+            The string representation of the file and its digest
+        """
+        with pr.phase("download"):
+            response = requests.get(url, stream=True)
+            return dg.consume(response.iter_content(dg.CHUNK_SIZE), algorithm)
 
 
 class DevFileManager:
@@ -122,8 +208,10 @@ class DevFileManager:
             with error code :ref:`error-code-S101`. This is bubbled up by the `parse` method.
 
     Attributes:
-        digest: Contains the SHA-256 hash of the contents
-        contents: The Spec file Python object
+        digest: Contains the hash of the contents, using the algorithm set in
+            `DDOT_DIGEST_ALGORITHM`
+        contents: The Spec file Python object. Files with the same contents are
+            parsed only once and share the same object.
     """
 
     pattern = r"^(url|file|data): (.*)"
@@ -146,20 +234,55 @@ class DevFileManager:
     """This is a dict with all the methods that is used to extract the data
     """
 
+    extract_digest: Dict[str, Callable[[str], Tuple[str, str]]] = {
+        "url": fm.download_digest,
+        "data": lambda x: (x, FileManager.hash_data(x)),
+    }
+    """The methods used to extract the data along with its digest, hashing
+    the data while it is read
+
+    Local files are hashed from :meth:`FileManager.open_buffer` and decoded
+    only if their contents are not in the `cache`.
+    """
+
+    cache = utilities.LRUCache(MAX_PARSED_FILES)
+    """The parsed contents of the files with the file format and the digest as the key
+    """
+
     @typechecked
     def __init__(self, file_path: str) -> None:
         res = self.check_path(file_path)
-        file_contents = self.extract[res.method](res.path)
-        f = self.fm.hash_data
-        if not callable(f):
-            raise AttributeError(
-                "I was expecting `hash_method` to be a function, but it is not."
-            )
-        self.digest = f(str(file_contents))
         file_ext = file_path.split(".")[-1]
-        self.contents = self.parse(
-            file_contents, file_format=file_format_ext.get(file_ext, file_ext)
-        )
+        file_format = file_format_ext.get(file_ext, file_ext)
+        if res.method == "file":
+            with self.fm.open_buffer(res.path) as buffer:
+                self.digest = dg.hash_buffer(buffer)
+                self.contents = self.load(
+                    self.digest, file_format, lambda: str(buffer, "utf-8")
+                )
+            return None
+        file_contents, self.digest = self.extract_digest[res.method](res.path)
+        self.contents = self.load(self.digest, file_format, lambda: file_contents)
+
+    @classmethod
+    def load(
+        cls, digest: str, file_format: str, get_contents: Callable[[], str]
+    ) -> Dict[Any, Any]:
+        """Returns the parsed contents from the `cache`, parsing them only on
+        a miss
+
+        Args:
+            digest: The digest of the contents
+            file_format: The format used for parsing
+            get_contents: Returns the contents, called only on a miss
+        """
+        key = f"{file_format}:{digest}"
+        contents = cls.cache.get(key)
+        mt.record_cache("spec_parse", contents is not None)
+        if contents is None:
+            contents = cls.parse(get_contents(), file_format=file_format)
+            cls.cache[key] = contents
+        return contents
 
     @classmethod
     @typechecked
@@ -209,7 +332,8 @@ class DevFileManager:
                 with code :ref:`error-code-S100`
         """
         try:
-            return anymarkup.parse(file_contents, format=file_format)
+            with pr.phase("parse"):
+                return anymarkup.parse(file_contents, format=file_format)
         except Exception:
             raise e.SpecificationError(
                 error=file_contents,
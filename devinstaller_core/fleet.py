@@ -0,0 +1,318 @@
+"""Fleet mode for applying one plan to many targets concurrently
+"""
+import os
+import subprocess
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import oschmod
+from typeguard import typechecked
+
+from devinstaller_core import command as c
+from devinstaller_core import exception as e
+from devinstaller_core import identity as ident
+
+SHELL_PROG = "sh"
+"""The only prog whose commands can be run on the targets
+"""
+
+
+class Transport(ABC):
+    """Base class for applying the actions of a plan on a target.
+
+    The paths in the plan are absolute paths, and the transport maps them into
+    the target using :meth:`target_path`.
+
+    Args:
+        root: The root of the target
+    """
+
+    @typechecked
+    def __init__(self, root: str) -> None:
+        self.root = root
+
+    @typechecked
+    def target_path(self, path: str) -> str:
+        """Map the path in the plan to the path inside the target"""
+        return os.path.join(self.root, path.lstrip(os.sep))
+
+    @abstractmethod
+    def run(self, command: str) -> None:
+        """Run the spec based command string on the target
+
+        Raises:
+            CommandFailed
+            DevinstallerError
+                with error code :ref:`error-code-D110` if the command is not a
+                shell command
+        """
+
+    @abstractmethod
+    def write_file(self, path: str, content: str, append: bool = False) -> None:
+        """Write the content into the file on the target"""
+
+    @abstractmethod
+    def make_dir(self, path: str) -> None:
+        """Create the folder on the target"""
+
+    @abstractmethod
+    def link(self, source: str, dest: str, symbolic: bool = True) -> None:
+        """Create the link on the target"""
+
+    @abstractmethod
+    def set_owner(self, path: str, owner: str, group: str) -> None:
+        """Change the owner and the group of the path on the target"""
+
+    @abstractmethod
+    def set_permission(self, path: str, permission: str) -> None:
+        """Change the permission of the path on the target"""
+
+
+class LocalTransport(Transport):
+    """Transport for a target which is a directory on the local machine, like
+    a container image or a path prefix.
+
+    Shell commands are run using `sh -c` with the target root as the working
+    directory and in the `DDOT_TARGET_ROOT` environment variable. Commands of
+    the other progs can't be run on the target.
+    """
+
+    def shell_command(self, command: str) -> List[str]:
+        """Returns the arguments for running the shell command on the target"""
+        return ["sh", "-c", command]
+
+    def run(self, command: str) -> None:
+        res = c.SessionSpec.parse(command)
+        if res.prog != SHELL_PROG:
+            raise e.DevinstallerError(
+                command, "D110", "Only the shell commands can be run on the targets"
+            )
+        env = dict(os.environ, DDOT_TARGET_ROOT=self.root)
+        try:
+            subprocess.run(
+                self.shell_command(res.cmd),
+                cwd=self.root,
+                env=env,
+                capture_output=True,
+                check=True,
+            )
+        except subprocess.CalledProcessError as err:
+            raise e.CommandFailed(returncode=err.returncode, cmd=err.cmd)
+        except OSError:
+            raise e.CommandFailed(returncode=1, cmd=command)
+
+    def write_file(self, path: str, content: str, append: bool = False) -> None:
+        target = self.target_path(path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "a" if append else "w") as _f:
+            _f.write(content)
+
+    def make_dir(self, path: str) -> None:
+        os.makedirs(self.target_path(path), exist_ok=True)
+
+    def link(self, source: str, dest: str, symbolic: bool = True) -> None:
+        target = self.target_path(dest)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if os.path.lexists(target):
+            os.unlink(target)
+        if symbolic:
+            os.symlink(source, target)
+        else:
+            os.link(self.target_path(source), target)
+
+    def set_owner(self, path: str, owner: str, group: str) -> None:
+        uid = ident.get_uid(owner)
+        gid = ident.get_gid(group)
+        os.chown(self.target_path(path), uid, gid, follow_symlinks=False)
+
+    def set_permission(self, path: str, permission: str) -> None:
+        oschmod.set_mode(self.target_path(path), permission)
+
+
+class ChrootTransport(LocalTransport):
+    """Transport for a chroot directory.
+
+    Same as :class:`LocalTransport` but the shell commands are run inside the
+    chroot.
+    """
+
+    def shell_command(self, command: str) -> List[str]:
+        return ["chroot", self.root, "sh", "-c", command]
+
+
+@dataclass
+class TargetReport:
+    """The result of applying the plan on a single target
+
+    parameters:
+        root: The root of the target
+        status: `success` if all the modules succeeded else `failed`
+        modules: The status of each module
+        duration: Time taken in seconds
+        error: The error which stopped the target, if any
+    """
+
+    root: str
+    status: str = "in progress"
+    modules: Dict[str, str] = field(default_factory=dict)
+    duration: float = 0.0
+    error: Optional[str] = None
+
+
+class Fleet:
+    """Apply a plan created by :func:`~devinstaller_core.planner.create_plan`
+    on many targets concurrently.
+
+    The spec is resolved only once while creating the plan. Every target gets
+    the modules in the plan order. If a module fails, its instructions are
+    rolled back and every module which requires it fails too, while the
+    failure of an optional module is ignored, same as the normal installation.
+
+    The plan is checked using :func:`check_plan` before any target is touched.
+
+    Args:
+        plan: The execution plan
+        transports: The transport for each target
+        max_workers: The number of targets provisioned at the same time
+    """
+
+    @typechecked
+    def __init__(
+        self, plan: Dict[str, Any], transports: List[Transport], max_workers: int = 4
+    ) -> None:
+        check_plan(plan)
+        self.plan = plan
+        self.transports = transports
+        self.max_workers = max_workers
+
+    def run(self) -> Dict[str, Any]:
+        """Apply the plan on all the targets
+
+        Returns:
+            The aggregated report of all the targets
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            reports = list(executor.map(self.apply, self.transports))
+        summary: Dict[str, int] = {}
+        for report in reports:
+            summary[report.status] = summary.get(report.status, 0) + 1
+        return {"summary": summary, "targets": [report.__dict__ for report in reports]}
+
+    @typechecked
+    def apply(self, transport: Transport) -> TargetReport:
+        """Apply the plan on a single target
+
+        Args:
+            transport: The transport of the target
+
+        Returns:
+            The report for the target
+        """
+        report = TargetReport(root=transport.root)
+        start = time.monotonic()
+        try:
+            for module in self.plan["modules"]:
+                alias = module["alias"]
+                failed = [
+                    i for i in module["requires"] if report.modules.get(i) == "failed"
+                ]
+                if failed:
+                    report.modules[alias] = "failed"
+                    continue
+                report.modules[alias] = self.apply_module(transport, module)
+        except Exception as err:
+            report.error = str(err)
+        report.duration = time.monotonic() - start
+        failed_modules = "failed" in report.modules.values()
+        report.status = "failed" if report.error or failed_modules else "success"
+        return report
+
+    @typechecked
+    def apply_module(self, transport: Transport, module: Dict[str, Any]) -> str:
+        """Apply all the actions of a module on the target
+
+        Returns:
+            The status of the module
+        """
+        completed: List[Dict[str, Any]] = []
+        for action in module["actions"]:
+            try:
+                apply_action(transport, action)
+            except e.CommandFailed:
+                for inst in reversed(completed):
+                    if inst.get("rollback") is not None:
+                        transport.run(inst["rollback"])
+                return "failed"
+            if action["action"] == "run":
+                completed.append(action)
+        return "success"
+
+
+@typechecked
+def check_plan(plan: Dict[str, Any]) -> None:
+    """Check if the plan can be applied on the targets.
+
+    The `before` and `after` hooks call the functions of the prog file, and
+    the commands of the progs other than `sh` are run by the extensions, so
+    both of them can run only on the local machine.
+
+    Args:
+        plan: The execution plan
+
+    Raises:
+        DevinstallerError
+            with error code :ref:`error-code-D110` if the plan has hooks or
+            commands which can't be run on the targets
+    """
+    for module in plan["modules"]:
+        for hook in ["before", "after"]:
+            if module.get(hook) is not None:
+                raise e.DevinstallerError(
+                    module["alias"],
+                    "D110",
+                    f"The `{hook}` hook can't be run on the targets",
+                )
+        for action in module["actions"]:
+            if action["action"] != "run":
+                continue
+            for command in [action["cmd"], action.get("rollback")]:
+                if command is None:
+                    continue
+                if c.SessionSpec.parse(command).prog != SHELL_PROG:
+                    raise e.DevinstallerError(
+                        command,
+                        "D110",
+                        "Only the shell commands can be run on the targets",
+                    )
+
+
+@typechecked
+def apply_action(transport: Transport, action: Dict[str, Any]) -> None:
+    """Apply a single action of the plan on the target
+
+    Args:
+        transport: The transport of the target
+        action: The action from the plan
+    """
+    name = action["action"]
+    if name == "run":
+        transport.run(action["cmd"])
+        return None
+    if name == "write_file":
+        path = action["path"]
+        transport.write_file(path, action["content"], append=action["append"])
+    elif name == "make_dir":
+        path = action["path"]
+        transport.make_dir(path)
+    elif name == "link":
+        path = action["source"]
+        transport.link(action["source"], action["dest"], symbolic=action["symbolic"])
+    else:
+        return None
+    if action.get("owner") and action.get("group"):
+        transport.set_owner(path, action["owner"], action["group"])
+    if action.get("permission"):
+        transport.set_permission(path, action["permission"])
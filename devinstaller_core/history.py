@@ -0,0 +1,107 @@
+"""Install durations of the modules recorded across the runs
+
+The scheduler uses them to start the modules on the longest chains first.
+"""
+import contextlib
+import json
+import os
+import tempfile
+import threading
+from typing import Dict, Iterator, Optional
+
+from typeguard import typechecked
+
+from devinstaller_core import events as ev
+from devinstaller_core import settings as s
+from devinstaller_core import utilities as u
+
+SMOOTHING = 0.5
+"""Weight of the latest duration in the moving average of each module
+"""
+
+
+class DurationHistory:
+    """The average install duration of each module in seconds
+
+    Only the successful installations are recorded, since a failed module
+    stops at the instruction which failed.
+
+    Args:
+        file_path: Path to the JSON file where the durations are saved
+    """
+
+    @typechecked
+    def __init__(self, file_path: str) -> None:
+        self.file_path = file_path
+        self.durations: Dict[str, float] = {}
+        self.lock = threading.Lock()
+
+    def load(self) -> None:
+        """Load the durations of the previous runs, ignoring an unreadable file"""
+        try:
+            with open(u.resolve_path(self.file_path)) as _f:
+                data = json.load(_f)
+        except (OSError, ValueError):
+            return None
+        if isinstance(data, dict):
+            self.durations = {
+                str(k): float(v) for k, v in data.items() if isinstance(v, (int, float))
+            }
+
+    def save(self) -> None:
+        """Write the durations atomically"""
+        full_path = u.resolve_path(self.file_path)
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(
+            dir=directory, prefix=".durations-", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w") as _f:
+                with self.lock:
+                    json.dump(self.durations, _f, indent=2, sort_keys=True)
+            os.replace(temp_path, full_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    @typechecked
+    def get(self, module_name: str) -> Optional[float]:
+        """Returns the average duration of the module or None if it was never
+        installed
+        """
+        return self.durations.get(module_name)
+
+    @typechecked
+    def record(self, module_name: str, duration: float) -> None:
+        """Add the latest duration of the module to its average"""
+        with self.lock:
+            previous = self.durations.get(module_name)
+            if previous is not None:
+                duration = SMOOTHING * duration + (1 - SMOOTHING) * previous
+            self.durations[module_name] = round(duration, 6)
+
+    def __call__(self, event: ev.Event) -> None:
+        if isinstance(event, ev.ModuleFinished) and event.status == "success":
+            self.record(event.module, event.duration)
+
+
+@typechecked
+def get_history() -> DurationHistory:
+    """Get the durations stored in the `DDOT_STATE_DIR` directory"""
+    history = DurationHistory(os.path.join(s.settings.DDOT_STATE_DIR, "durations.json"))
+    history.load()
+    return history
+
+
+@contextlib.contextmanager
+def record(history: DurationHistory) -> Iterator[DurationHistory]:
+    """Record the durations of the modules installed inside the context and
+    save them when it ends, even if the run fails.
+    """
+    ev.bus.subscribe(history)
+    try:
+        yield history
+    finally:
+        ev.bus.unsubscribe(history)
+        history.save()
@@ -0,0 +1,127 @@
+"""Owner, group and permission of the files created by the modules
+
+The user and the group names are resolved only once per process, since every
+lookup can go to the directory service (NSS, LDAP). The ownership and the
+permission are applied on the open file descriptor, so the path is not resolved
+again for each change.
+"""
+import grp
+import os
+import pwd
+import stat
+import threading
+from typing import Dict, Optional
+
+import oschmod
+from typeguard import typechecked
+
+uids: Dict[str, int] = {}
+"""The uid of each user name looked up
+"""
+
+gids: Dict[str, int] = {}
+"""The gid of each group name looked up
+"""
+
+_lock = threading.Lock()
+
+
+@typechecked
+def get_uid(owner: str) -> int:
+    """Returns the uid of the user. Numeric ids are used as is.
+
+    Raises:
+        KeyError
+            if there is no such user
+    """
+    if owner.isdigit():
+        return int(owner)
+    with _lock:
+        if owner not in uids:
+            uids[owner] = pwd.getpwnam(owner).pw_uid
+        return uids[owner]
+
+
+@typechecked
+def get_gid(group: str) -> int:
+    """Returns the gid of the group. Numeric ids are used as is.
+
+    Raises:
+        KeyError
+            if there is no such group
+    """
+    if group.isdigit():
+        return int(group)
+    with _lock:
+        if group not in gids:
+            gids[group] = grp.getgrnam(group).gr_gid
+        return gids[group]
+
+
+@typechecked
+def get_mode(current_mode: int, permission: str) -> int:
+    """Returns the new permission bits
+
+    Args:
+        current_mode: The current mode of the file
+        permission: Octal like `755` or symbolic like `u+x`
+    """
+    if "+" in permission or "-" in permission or "=" in permission:
+        return stat.S_IMODE(oschmod.get_effective_mode(current_mode, permission))
+    return int(permission, 8)
+
+
+@typechecked
+def apply(
+    fd: int,
+    owner: Optional[str] = None,
+    group: Optional[str] = None,
+    permission: Optional[str] = None,
+) -> None:
+    """Apply the ownership and the permission on the open file
+
+    The ownership is changed only if both the `owner` and the `group` are
+    given.
+
+    Args:
+        fd: The file descriptor
+        owner: The user name or the uid
+        group: The group name or the gid
+        permission: The permission in the format used by `chmod`
+    """
+    if owner and group:
+        os.fchown(fd, get_uid(owner), get_gid(group))
+    if permission:
+        os.fchmod(fd, get_mode(os.fstat(fd).st_mode, permission))
+
+
+@typechecked
+def apply_path(
+    path: str,
+    owner: Optional[str] = None,
+    group: Optional[str] = None,
+    permission: Optional[str] = None,
+) -> None:
+    """Open the file or the directory and apply the ownership and the
+    permission on it.
+
+    Falls back to the path based calls where the file can't be opened, like
+    a file without the read permission or on Windows.
+    """
+    if not (owner and group) and not permission:
+        return None
+    if hasattr(os, "fchown"):
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except PermissionError:
+            pass
+        else:
+            try:
+                apply(fd, owner, group, permission)
+            finally:
+                os.close(fd)
+            return None
+    if owner and group:
+        os.chown(path, get_uid(owner), get_gid(group))
+    if permission:
+        oschmod.set_mode(path, permission)
@@ -0,0 +1,260 @@
+"""Resolves the `include` block of the spec files
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+from typeguard import typechecked
+
+from devinstaller_core import devfile_directory as dd
+from devinstaller_core import exception as e
+from devinstaller_core import file_manager as f
+
+MERGED_BLOCKS = ["constants", "platforms", "interfaces"]
+"""Blocks which are merged from the included spec files.
+
+Items are merged using their `name`. Included files are merged in the order
+they are listed and the including file is merged last. An item whose name is
+already used by an item of another file is an error.
+"""
+
+CONCATENATED_BLOCKS = ["modules"]
+"""Blocks whose items are concatenated in the order the files are merged.
+
+Modules with the same name are kept, since they can be for different
+platforms. The :class:`~devinstaller_core.dependency_graph.DependencyGraph`
+selects between the modules with the same alias.
+"""
+
+MAX_WORKERS = 8
+"""Maximum number of included files fetched at the same time
+"""
+
+
+@dataclass
+class ResolvedSpec:
+    """The spec with all of its includes merged into it
+
+    parameters:
+        document: The merged spec object. It doesn't have the `include` block.
+        digests: The digest of every file used, in the order they were merged
+        paths: The paths of the local files which were included
+        prog_files: The `prog_file` of every file used, in the order they
+            were merged
+        validated: True if every file used was already validated, which is
+            the case for the spec directories
+    """
+
+    document: Dict[Any, Any]
+    digests: List[str] = field(default_factory=list)
+    paths: List[str] = field(default_factory=list)
+    prog_files: List[str] = field(default_factory=list)
+    validated: bool = False
+
+    @property
+    def digest(self) -> str:
+        """The digest of the spec along with all of its includes"""
+        if len(self.digests) == 1:
+            return self.digests[0]
+        return f.FileManager.hash_data(":".join(self.digests))
+
+
+@dataclass
+class Source:
+    """A spec file or a spec directory fetched for resolving
+
+    parameters:
+        digest: The digest of the file or the directory
+        contents: The spec object
+        paths: The local files read
+        validated: True if the spec object is already validated
+    """
+
+    digest: str
+    contents: Dict[Any, Any]
+    paths: List[str] = field(default_factory=list)
+    validated: bool = False
+
+
+@typechecked
+def fetch(spec_file: str) -> Source:
+    """Read the spec file, or all the files of the spec directory merged
+
+    Args:
+        spec_file: The path to the spec. Follows the spec format.
+    """
+    directory = dd.get_directory(spec_file)
+    if directory is None:
+        dfm = f.DevFileManager(spec_file)
+        res = f.DevFileManager.check_path(spec_file)
+        paths = [res.path] if res.method == "file" else []
+        return Source(digest=dfm.digest, contents=dfm.contents, paths=paths)
+    fragments = dd.load(directory)
+    documents = [i.document for i in fragments]
+    contents = merge(documents)
+    includes = [j for i in documents for j in i.get("include", [])]
+    if includes:
+        contents["include"] = includes
+    return Source(
+        digest=dd.get_digest(fragments),
+        contents=contents,
+        paths=[os.path.join(directory, i.path) for i in fragments],
+        validated=True,
+    )
+
+
+@typechecked
+def merge_items(
+    key: str, items: List[Dict[Any, Any]], new_items: List[Dict[Any, Any]]
+) -> List[Dict[Any, Any]]:
+    """Merge the new items into the items using their `name`.
+
+    Items without a name are always appended.
+
+    Args:
+        key: The name of the block
+        items: The items merged so far
+        new_items: The items of the next spec file
+
+    Raises:
+        SpecificationError
+            with error code :ref:`error-code-S105`
+    """
+    names = {i["name"] for i in items if "name" in i}
+    for item in new_items:
+        if "name" not in item:
+            continue
+        if item["name"] in names:
+            raise e.SpecificationError(
+                error=f"{key}: {item['name']}",
+                error_code="S105",
+                message="Rename one of them or remove it from the spec files.",
+            )
+        names.add(item["name"])
+    return items + new_items
+
+
+@typechecked
+def merge(documents: List[Dict[Any, Any]]) -> Dict[Any, Any]:
+    """Merge the spec objects in the given order
+
+    Args:
+        documents: The spec objects. The later ones take precedence.
+
+    Returns:
+        The merged spec object
+    """
+    merged: Dict[Any, Any] = {}
+    for document in documents:
+        for key, value in document.items():
+            if key == "include":
+                continue
+            if key in MERGED_BLOCKS:
+                merged[key] = merge_items(key, merged.get(key, []), value)
+            elif key in CONCATENATED_BLOCKS:
+                merged[key] = merged.get(key, []) + value
+            else:
+                merged[key] = value
+    return merged
+
+
+@typechecked
+def resolve(
+    document: Dict[Any, Any],
+    digest: str,
+    executor: Optional[ThreadPoolExecutor] = None,
+    validated: bool = False,
+) -> ResolvedSpec:
+    """Resolve all the includes of the spec object, recursively.
+
+    All the includes of a file are fetched concurrently. The same file, going
+    by its digest, is merged only once even if it is included many times. The
+    parsed contents of every file is cached by the
+    :class:`~devinstaller_core.file_manager.DevFileManager`. A spec object
+    without includes is used as is.
+
+    The `prog_file` of every file is kept. The `prog_file` given in the
+    `include` block is used for the included file if it doesn't have one.
+
+    Args:
+        document: The parsed spec object
+        digest: The digest of the spec file
+        validated: True if the spec object is already validated
+
+    Returns:
+        The resolved spec
+
+    Raises:
+        SpecificationError
+            with error code :ref:`error-code-S102`, or
+            :ref:`error-code-S105` if the files declare the same name
+    """
+    if executor is None:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            return resolve(document, digest, executor, validated)
+    result = ResolvedSpec(document={}, validated=validated)
+    documents: List[Dict[Any, Any]] = []
+    seen: Set[str] = set()
+
+    def visit(
+        document: Dict[Any, Any],
+        digest: str,
+        ancestors: List[str],
+        prog_file: Optional[str] = None,
+    ) -> None:
+        includes = document.get("include", [])
+        spec_files = [i["spec_file"] for i in includes]
+        assert executor is not None
+        for include, source in zip(includes, executor.map(fetch, spec_files)):
+            if source.digest in ancestors or source.digest == digest:
+                raise e.SpecificationError(
+                    error=include["spec_file"],
+                    error_code="S102",
+                    message="The spec file includes itself.",
+                )
+            if source.digest in seen:
+                continue
+            result.paths += source.paths
+            result.validated = result.validated and source.validated
+            visit(
+                source.contents,
+                source.digest,
+                ancestors + [digest],
+                include.get("prog_file"),
+            )
+        seen.add(digest)
+        result.digests.append(digest)
+        documents.append(document)
+        prog_file = document.get("prog_file", prog_file)
+        if prog_file is not None and prog_file not in result.prog_files:
+            result.prog_files.append(prog_file)
+
+    visit(document, digest, [])
+    if len(documents) == 1:
+        result.document = {k: v for k, v in document.items() if k != "include"}
+    else:
+        result.document = merge(documents)
+        if result.prog_files:
+            result.document["prog_file"] = result.prog_files[-1]
+    return result
+
+
+@typechecked
+def resolve_file(file_path: str) -> ResolvedSpec:
+    """Read the spec file and resolve all of its includes
+
+    The path can also point to a spec directory, see
+    :mod:`~devinstaller_core.devfile_directory`.
+
+    Args:
+        file_path: The path to the spec file. Follows the spec format.
+
+    Returns:
+        The resolved spec
+    """
+    source = fetch(file_path)
+    result = resolve(source.contents, source.digest, validated=source.validated)
+    if source.validated:
+        result.paths = source.paths + result.paths
+    return result
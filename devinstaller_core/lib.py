@@ -1,25 +1,64 @@
 """The main module which is used by CLI and Library
 """
-import importlib.util
-import os
-import tempfile
 import types
-from importlib.abc import Loader
-from typing import Any, Callable, Dict, List, Optional, Set
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 from typeguard import typechecked
 
+from devinstaller_core import block_interface as bi
 from devinstaller_core import block_platform as bp
 from devinstaller_core import common_models as m
 from devinstaller_core import dependency_graph as dg
 from devinstaller_core import exception as e
 from devinstaller_core import file_manager as f
+from devinstaller_core import fleet as fl
+from devinstaller_core import include as inc
+from devinstaller_core import lockfile as lf
+from devinstaller_core import metrics as mt
+from devinstaller_core import module_index as mi
+from devinstaller_core import planner as p
+from devinstaller_core import policy as pl
+from devinstaller_core import profiling as pr
+from devinstaller_core import prog_loader as pg
 from devinstaller_core import schema as s
+from devinstaller_core import utilities as u
 from devinstaller_core.utilities import ui
 
 # dfm = f.DevFileManager()
 fm = f.FileManager()
 
+MAX_DOCUMENTS = 16
+"""The maximum number of validated schema objects kept in `validated_documents`
+"""
+
+module_indexes: Dict[int, mi.ModuleIndex] = {}
+"""Module indexes of the validated schema objects in `validated_documents`
+with the `id` of the schema object as the key
+
+The module index is removed along with its schema object by
+:func:`forget_document`, so the `id` of a cached schema object stays unique.
+"""
+
+prog_files: Dict[int, List[str]] = {}
+"""The prog files of the validated schema objects in `validated_documents`
+which were merged from more than one prog file, with the `id` of the schema
+object as the key
+"""
+
+
+def forget_document(digest: str, schema_object: m.TypeFullDocument) -> None:
+    """Remove the module index and the prog files of the evicted schema object
+    """
+    module_indexes.pop(id(schema_object), None)
+    prog_files.pop(id(schema_object), None)
+
+
+validated_documents = u.LRUCache(MAX_DOCUMENTS, on_evict=forget_document)
+"""Validated schema objects with the digest of the spec file as the key
+
+Only the most recently used :data:`MAX_DOCUMENTS` schema objects are kept.
+"""
+
 SELECTION_TITLE = """Hey... You haven't selected which module to be installed
 Do you mind selected a few for me?"""
 
@@ -30,6 +69,9 @@ def load_devfile(
 ) -> types.ModuleType:
     """Loads the file and returns the module
 
+    The file is executed from memory, see
+    :mod:`~devinstaller_core.prog_loader`.
+
     Args:
         schema_object: The full schema object
         prog_file_path: The path to the `prog_file`
@@ -40,60 +82,149 @@ def load_devfile(
     if prog_file_path is None:
         prog_file_path = schema_object["prog_file"]
     res: m.TypeCheckPathResponse = f.DevFileManager.check_path(prog_file_path)
-    file_functions: Dict[str, Callable[[str], str]] = {
-        "file": lambda path: path,
-        "url": download_devfile,
-        "data": download_devfile,
+    file_functions: Dict[str, Callable[[str], Tuple[str, str]]] = {
+        "file": fm.read_digest,
+        "url": fm.download_digest,
+        "data": lambda data: (data, fm.hash_data(data)),
     }
-    module_path = file_functions[res.method](res.path)
-    dev_module = load_python_module(module_path)
-    if res.method == "url" or res.method == "data":
-        os.remove(module_path)
-    return dev_module
+    source, digest = file_functions[res.method](res.path)
+    origin = res.path
+    if res.method == "file":
+        origin = u.resolve_path(res.path)
+    elif res.method == "data":
+        origin = "<prog_file>"
+    return pg.load(source, digest, origin)
 
 
 @typechecked
-def download_devfile(file_path: str) -> str:
-    """Downloads the devfile so that it can be loaded
+def load_devfiles(
+    schema_object: m.TypeFullDocument, prog_file_paths: List[str]
+) -> types.ModuleType:
+    """Loads all the prog files and returns a module with the functions of
+    all of them
+
+    The prog files are loaded in the order the spec files were merged, so a
+    function in a later prog file replaces the one with the same name.
 
     Args:
-        file_path: The path to the file
+        schema_object: The full schema object
+        prog_file_paths: The paths to the prog files
 
     Returns:
-        The path where the file is saved
-    """
-    temp = fm.read(file_path=file_path)
-    temp_file_path = tempfile.mkstemp()[1]
-    fm.save(temp, file_path=temp_file_path)
-    return temp_file_path
-
-
-@typechecked
-def load_python_module(
-    file_path: str, module_name: str = "devfile"
-) -> types.ModuleType:
-    """Loads the module
+        The module
     """
-    spec = importlib.util.spec_from_file_location(module_name, file_path)
-    module = importlib.util.module_from_spec(spec)
-    assert isinstance(spec.loader, Loader)
-    spec.loader.exec_module(module)
-    return module
+    merged = types.ModuleType(pg.MODULE_PREFIX + "merged")
+    for prog_file_path in prog_file_paths:
+        module = load_devfile(schema_object, prog_file_path)
+        merged.__dict__.update(
+            (key, value)
+            for key, value in vars(module).items()
+            if not key.startswith("__")
+        )
+    return merged
 
 
 @typechecked
 def create_dependency_graph(
-    schema_object: m.TypeFullDocument, platform_codename: Optional[str] = None
+    schema_object: Optional[m.TypeFullDocument] = None,
+    platform_codename: Optional[str] = None,
+    interface_name: Optional[str] = None,
+    lock_file_path: Optional[str] = None,
 ) -> dg.DependencyGraph:
+    """Create the dependency graph for the platform
+
+    If the `lock_file_path` is given then the graph is loaded directly from the
+    lockfile and the `schema_object` is not needed.
+
+    If the `schema_object` was returned by :func:`core` then its cached module
+    index is used, so only the modules of the platform are touched.
+
+    Args:
+        schema_object: The validated schema object
+        platform_codename: The codename of the platform
+        interface_name: The name of the interface whose `before_each` and
+            `after_each` are used for every module
+        lock_file_path: The path to the lockfile
+
+    Returns:
+        The dependency graph
+    """
+    if lock_file_path is not None:
+        lock = lf.read(lock_file_path)
+        return lf.load_dependency_graph(lock, platform_codename=platform_codename)
+    if schema_object is None:
+        raise e.DevinstallerError("Schema object not found", "D100")
     platform_object = get_platform_object(
         full_document=schema_object, platform_codename=platform_codename
     )
-    dependency_graph = dg.DependencyGraph(
-        schema_object=schema_object, platform_object=platform_object
-    )
+    before_each: Optional[str] = None
+    after_each: Optional[str] = None
+    if interface_name is not None:
+        interface = bi.get_interface(
+            interface_list=schema_object.get("interfaces", []),
+            interface_name=interface_name,
+        )
+        before_each = interface.before_each
+        after_each = interface.after_each
+    with pr.phase("graph"):
+        dependency_graph = dg.DependencyGraph(
+            schema_object=schema_object,
+            platform_object=platform_object,
+            before_each=before_each,
+            after_each=after_each,
+            module_index=module_indexes.get(id(schema_object)),
+            load_prog=get_prog_loader(schema_object),
+        )
     return dependency_graph
 
 
+@typechecked
+def get_prog_loader(
+    schema_object: m.TypeFullDocument,
+) -> Optional[Callable[[], types.ModuleType]]:
+    """Returns the function loading the `prog_file` of the spec, or None if
+    the spec doesn't have one
+
+    If the spec was merged from the spec files with their own `prog_file`
+    then all of them are loaded.
+    """
+    prog_file_paths = prog_files.get(id(schema_object))
+    if prog_file_paths is not None:
+        return lambda: load_devfiles(schema_object, prog_file_paths)
+    if "prog_file" not in schema_object:
+        return None
+    return lambda: load_devfile(schema_object)
+
+
+@typechecked
+def get_plan(
+    schema_object: m.TypeFullDocument,
+    platform_codename: Optional[str] = None,
+    interface_name: Optional[str] = None,
+    requirement_list: Optional[List[str]] = None,
+) -> str:
+    """Resolve everything needed for installing the modules and return the
+    execution plan as JSON, without installing anything.
+
+    Args:
+        schema_object: The validated schema object
+        platform_codename: The codename of the platform
+        interface_name: The name of the interface
+        requirement_list: The list of modules to be installed. Defaults to all
+            the modules.
+
+    Returns:
+        The plan as JSON string
+    """
+    dependency_graph = create_dependency_graph(
+        schema_object=schema_object,
+        platform_codename=platform_codename,
+        interface_name=interface_name,
+    )
+    plan = p.create_plan(dependency_graph, requirement_list=requirement_list)
+    return p.dump(plan)
+
+
 @typechecked
 def core(
     file_path: Optional[str] = None, spec_object: Optional[Dict[Any, Any]] = None
@@ -101,16 +232,102 @@ def core(
     """The core function.
 
     Validates and returns the schema object.
+
+    The `include` block of the spec file is resolved and the included spec
+    files are merged into it. The validated schema objects are cached using the
+    digest of the spec file and all of its includes, so the same spec is
+    validated only once while it is cached. The module index of the schema
+    object is built and cached along with it, as are the prog files of the
+    spec files if there are more than one.
+
+    Spec directories are validated one file at a time as they are loaded, so
+    they are not validated again here.
     """
     if file_path is not None:
-        dfm = f.DevFileManager(file_path)
-        schema_object: Dict[Any, Any] = dfm.contents
-    elif spec_object is not None:
-        schema_object = spec_object
-    else:
-        raise e.DevinstallerError("Schema object not found", "D100")
-    res = s.get_validated_document(schema_object)
-    return res
+        resolved = inc.resolve_file(file_path)
+        mt.record_cache("spec_validate", resolved.digest in validated_documents)
+        if resolved.digest in validated_documents:
+            return validated_documents[resolved.digest]
+        if resolved.validated:
+            res = m.TypeFullDocument(resolved.document)
+        else:
+            res = s.get_validated_document(resolved.document)
+        module_indexes[id(res)] = mi.build(res)
+        if len(resolved.prog_files) > 1:
+            prog_files[id(res)] = resolved.prog_files
+        validated_documents[resolved.digest] = res
+        return res
+    if spec_object is not None:
+        return s.get_validated_document(spec_object)
+    raise e.DevinstallerError("Schema object not found", "D100")
+
+
+@typechecked
+def provision_fleet(
+    schema_object: m.TypeFullDocument,
+    roots: List[str],
+    platform_codename: Optional[str] = None,
+    interface_name: Optional[str] = None,
+    requirement_list: Optional[List[str]] = None,
+    max_workers: int = 4,
+    chroot: bool = False,
+) -> Dict[str, Any]:
+    """Resolve the spec once and install the modules on all the target roots
+
+    Args:
+        schema_object: The validated schema object
+        roots: The root directories of the targets
+        platform_codename: The codename of the platform of the targets
+        interface_name: The name of the interface
+        requirement_list: The list of modules to be installed. Defaults to all
+            the modules.
+        max_workers: The number of targets provisioned at the same time
+        chroot: If True then the commands are run inside the chroot of each target
+
+    Returns:
+        The aggregated report of all the targets
+    """
+    dependency_graph = create_dependency_graph(
+        schema_object=schema_object,
+        platform_codename=platform_codename,
+        interface_name=interface_name,
+    )
+    plan = p.create_plan(dependency_graph, requirement_list=requirement_list)
+    transport_class = fl.ChrootTransport if chroot else fl.LocalTransport
+    transports: List[fl.Transport] = [transport_class(root) for root in roots]
+    fleet = fl.Fleet(plan, transports, max_workers=max_workers)
+    return fleet.run()
+
+
+@typechecked
+def create_lock_file(
+    schema_object: m.TypeFullDocument,
+    lock_file_path: str,
+    platform_codename: Optional[str] = None,
+    interface_name: Optional[str] = None,
+    requirement_list: Optional[List[str]] = None,
+    digest: Optional[str] = None,
+) -> None:
+    """Resolve the spec for the platform and save it as a lockfile
+
+    Args:
+        schema_object: The validated schema object
+        lock_file_path: The path where the lockfile is saved
+        platform_codename: The codename of the platform
+        interface_name: The name of the interface
+        requirement_list: The list of modules to be installed. Defaults to all
+            the modules.
+        digest: The digest of the spec file
+    """
+    dependency_graph = create_dependency_graph(
+        schema_object=schema_object,
+        platform_codename=platform_codename,
+        interface_name=interface_name,
+    )
+    lock = lf.create_lock(
+        dependency_graph, requirement_list=requirement_list, digest=digest
+    )
+    lf.save(lock, file_path=lock_file_path)
 
 
 @typechecked
@@ -120,9 +337,10 @@ def get_platform_object(
     """Create the platform object and return it
     """
     platform_list = full_document.get("platforms", None)
-    platform_object = bp.BlockPlatform(
-        platform_list=platform_list, platform_codename=platform_codename
-    )
+    with pr.phase("platform"):
+        platform_object = bp.BlockPlatform(
+            platform_list=platform_list, platform_codename=platform_codename
+        )
     return platform_object
 
 
@@ -151,9 +369,15 @@ def get_requirement_list(module_objects: List[m.TypeAnyModule],) -> List[str]:
 def get_user_confirmation(orphan_list: Set[str]) -> bool:
     """Asks user for confirmation for the uninstallation of the orphan modules.
 
+    The response is given by the selection policy if it has a rule for
+    `confirm`, in which case the user is not asked.
+
     Args:
         orphan_list: The "list" of modules which are not used by any other modules
     """
+    response = pl.get_policy().confirm()
+    if response is not None:
+        return response
     ui.print(
         "Because of failed installation of some modules, there are some"
         "modules which are installed but not required by any other modules"
@@ -0,0 +1,171 @@
+"""Lockfile of the fully resolved spec
+"""
+import dataclasses
+import json
+from typing import Any, Dict, List, Optional
+
+from typeguard import typechecked
+
+from devinstaller_core import dependency_graph as dg
+from devinstaller_core import exception as e
+from devinstaller_core import file_manager as f
+from devinstaller_core import module_base as mb
+from devinstaller_core.common_models import TypeAnyModule
+
+LOCKFILE_VERSION = 1
+"""The version of the lockfile format
+"""
+
+INSTRUCTION_FIELDS = ["install_inst", "inits", "configs", "commands"]
+"""Fields of the modules containing the instructions with constants substituted
+"""
+
+EXCLUDED_FIELDS = ["status"]
+"""Fields of the modules which are not part of the lockfile
+"""
+
+
+@typechecked
+def create_lock(
+    dependency_graph: dg.DependencyGraph,
+    requirement_list: Optional[List[str]] = None,
+    digest: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Create the lockfile for the dependency graph.
+
+    The lockfile contains every module of the graph, which means the platform
+    and the duplicate modules are already resolved, with the constants
+    substituted in their instructions, along with the install order.
+
+    Args:
+        dependency_graph: The dependency graph of the current platform
+        requirement_list: The list of modules to be installed. Defaults to all
+            the modules in the graph.
+        digest: The digest of the spec file the graph is created from
+
+    Returns:
+        The lockfile as a JSON serializable dict
+    """
+    if requirement_list is None:
+        requirement_list = list(dependency_graph.graph.keys())
+    modules: List[Dict[str, Any]] = []
+    for module in dependency_graph.module_list():
+        fields = dataclasses.asdict(module)
+        for key in EXCLUDED_FIELDS:
+            fields.pop(key, None)
+        modules.append({"module_type": dg.get_module_type(module), "fields": fields})
+    return {
+        "lockfile_version": LOCKFILE_VERSION,
+        "digest": digest,
+        "platform": dependency_graph.platform_codename,
+        "requirements": requirement_list,
+        "order": dependency_graph.install_order(requirement_list),
+        "modules": modules,
+    }
+
+
+@typechecked
+def load_module(module_type: str, fields: Dict[str, Any]) -> TypeAnyModule:
+    """Create the module object from the locked fields.
+
+    The instructions are already substituted, so they are set after the module
+    is created to skip the constants substitution done by the validators.
+
+    Args:
+        module_type: The type of the module
+        fields: The locked fields of the module
+
+    Returns:
+        The module object
+    """
+    fields = dict(fields)
+    instructions: Dict[str, Any] = {}
+    for key in INSTRUCTION_FIELDS:
+        if fields.get(key) is not None:
+            instructions[key] = [
+                mb.ModuleInstallInstruction(**i) for i in fields.pop(key)
+            ]
+    uninstall_inst = fields.pop("uninstall_inst", None)
+    constants = fields.pop("constants", None) or {}
+    module = dg.MODULE_CLASSES[module_type](**fields)
+    for key, value in instructions.items():
+        setattr(module, key, value)
+    if uninstall_inst is not None:
+        module.uninstall_inst = uninstall_inst
+    module.constants = constants
+    return module
+
+
+@typechecked
+def load_dependency_graph(
+    lock: Dict[str, Any], platform_codename: Optional[str] = None
+) -> dg.DependencyGraph:
+    """Create the dependency graph directly from the lockfile, without parsing,
+    validating or resolving the spec again.
+
+    Args:
+        lock: The lockfile
+        platform_codename: If given then it has to match the platform of the lockfile
+
+    Returns:
+        The dependency graph
+
+    Raises:
+        DevinstallerError
+            with error code :ref:`error-code-D105`
+    """
+    if lock.get("lockfile_version") != LOCKFILE_VERSION:
+        raise e.DevinstallerError(
+            str(lock.get("lockfile_version")),
+            "D105",
+            f"Only the lockfile version {LOCKFILE_VERSION} is supported.",
+        )
+    if platform_codename is not None and platform_codename != lock["platform"]:
+        raise e.DevinstallerError(
+            platform_codename,
+            "D105",
+            f"The lockfile was created for the platform {lock['platform']}.",
+        )
+    modules: Dict[str, TypeAnyModule] = {}
+    for item in lock["modules"]:
+        module = load_module(item["module_type"], item["fields"])
+        assert module.alias is not None
+        modules[module.alias] = module
+    return dg.DependencyGraph.from_modules(modules, platform_codename=lock["platform"])
+
+
+@typechecked
+def dump(lock: Dict[str, Any]) -> str:
+    """Serialize the lockfile into JSON with the keys sorted"""
+    return json.dumps(lock, indent=2, sort_keys=True)
+
+
+@typechecked
+def save(lock: Dict[str, Any], file_path: str) -> None:
+    """Save the lockfile
+
+    Args:
+        lock: The lockfile
+        file_path: Path where the lockfile is saved
+    """
+    f.FileManager.save(dump(lock), file_path=file_path)
+
+
+@typechecked
+def read(file_path: str) -> Dict[str, Any]:
+    """Read the lockfile
+
+    Args:
+        file_path: Path to the lockfile
+
+    Returns:
+        The lockfile
+
+    Raises:
+        DevinstallerError
+            with error code :ref:`error-code-D105`
+    """
+    try:
+        return json.loads(f.FileManager.read(file_path))
+    except ValueError:
+        raise e.DevinstallerError(file_path, "D105", "The lockfile is not valid JSON.")
@@ -0,0 +1,268 @@
+"""Metrics of the runs in the Prometheus text format
+
+If `DDOT_METRICS_FILE` is set, the metrics of every run are written into it
+when the run ends, which can be picked up by the textfile collector of the
+node_exporter.
+"""
+import contextlib
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from typeguard import typechecked
+
+from devinstaller_core import events as ev
+from devinstaller_core import settings as s
+from devinstaller_core import utilities as u
+
+DURATION_BUCKETS = [0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 600.0, 1800.0]
+"""Upper bounds of the buckets of the module duration histograms in seconds
+"""
+
+cache_stats: Dict[str, Dict[str, int]] = {}
+"""Number of hits and misses of each cache in the current process
+"""
+
+_cache_lock = threading.Lock()
+
+
+@typechecked
+def record_cache(cache: str, hit: bool) -> None:
+    """Record a lookup in the cache
+
+    Args:
+        cache: The name of the cache
+        hit: True if the value was found in the cache
+    """
+    with _cache_lock:
+        stats = cache_stats.setdefault(cache, {"hit": 0, "miss": 0})
+        stats["hit" if hit else "miss"] += 1
+
+
+def format_labels(labels: Dict[str, Any]) -> str:
+    """Returns the labels in the Prometheus format"""
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in sorted(labels.items()):
+        value = (
+            str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        )
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def format_value(value: float) -> str:
+    """Returns the value in the Prometheus format"""
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class RunMetrics:
+    """Collects the metrics of a single run from the events
+
+    Attributes:
+        durations: The install duration of each module
+        hooks: The duration of the `before` and the `after` hook of each
+            module
+        instructions: Number of instructions by their result
+        rollbacks: Number of modules which were rolled back
+        rolled_back_instructions: Number of instructions rolled back
+    """
+
+    def __init__(self) -> None:
+        self.start = time.monotonic()
+        self.end: Optional[float] = None
+        self.durations: Dict[str, float] = {}
+        self.hooks: Dict[Tuple[str, str], float] = {}
+        self.instructions = {"success": 0, "failed": 0}
+        self.rollbacks = 0
+        self.rolled_back_instructions = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, event: ev.Event) -> None:
+        with self.lock:
+            if isinstance(event, ev.ModuleFinished):
+                self.durations[event.module] = event.duration
+            elif isinstance(event, ev.HookFinished):
+                self.hooks[(event.module, event.hook)] = event.duration
+            elif isinstance(event, ev.InstructionFinished):
+                self.instructions["success"] += 1
+            elif isinstance(event, ev.InstructionFailed):
+                self.instructions["failed"] += 1
+            elif isinstance(event, ev.RollbackStarted):
+                self.rollbacks += 1
+            elif isinstance(event, ev.InstructionRolledBack):
+                self.rolled_back_instructions += 1
+
+    def finish(self) -> None:
+        """Mark the end of the run"""
+        self.end = time.monotonic()
+
+    @property
+    def wall_time(self) -> float:
+        """Total time taken by the run in seconds"""
+        end = time.monotonic() if self.end is None else self.end
+        return end - self.start
+
+    def render(self, statuses: Dict[str, Optional[str]]) -> str:
+        """Returns the metrics in the Prometheus text format
+
+        Args:
+            statuses: The status of each module at the end of the run
+        """
+        lines: List[str] = []
+
+        def metric(
+            name: str,
+            kind: str,
+            help_text: str,
+            samples: List[Tuple[str, Dict[str, Any], float]],
+        ) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for suffix, labels, value in samples:
+                lines.append(
+                    f"{name}{suffix}{format_labels(labels)} {format_value(value)}"
+                )
+
+        status_counts: Dict[str, int] = {
+            "success": 0,
+            "failed": 0,
+            "in progress": 0,
+            "none": 0,
+        }
+        for status in statuses.values():
+            key = "none" if status is None else status
+            status_counts[key] = status_counts.get(key, 0) + 1
+        metric(
+            "devinstaller_modules",
+            "gauge",
+            "Number of modules by their status at the end of the run.",
+            [("", {"status": k}, v) for k, v in sorted(status_counts.items())],
+        )
+        histogram: List[Tuple[str, Dict[str, Any], float]] = []
+        for module, duration in sorted(self.durations.items()):
+            for bound in DURATION_BUCKETS + [float("inf")]:
+                labels = {"module": module, "le": format_value(bound)}
+                histogram.append(("_bucket", labels, int(duration <= bound)))
+            histogram.append(("_sum", {"module": module}, duration))
+            histogram.append(("_count", {"module": module}, 1))
+        metric(
+            "devinstaller_module_duration_seconds",
+            "histogram",
+            "Time taken for installing the module.",
+            histogram,
+        )
+        metric(
+            "devinstaller_hook_duration_seconds",
+            "gauge",
+            "Time taken by the before or the after hook of the module.",
+            [
+                ("", {"module": module, "hook": hook}, duration)
+                for (module, hook), duration in sorted(self.hooks.items())
+            ],
+        )
+        metric(
+            "devinstaller_instructions_total",
+            "counter",
+            "Number of instructions run by their result.",
+            [("", {"result": k}, v) for k, v in sorted(self.instructions.items())],
+        )
+        metric(
+            "devinstaller_rollbacks_total",
+            "counter",
+            "Number of modules whose instructions were rolled back.",
+            [("", {}, self.rollbacks)],
+        )
+        metric(
+            "devinstaller_rolled_back_instructions_total",
+            "counter",
+            "Number of instructions rolled back.",
+            [("", {}, self.rolled_back_instructions)],
+        )
+        with _cache_lock:
+            caches = {k: dict(v) for k, v in cache_stats.items()}
+        metric(
+            "devinstaller_cache_requests_total",
+            "counter",
+            "Number of cache lookups in the process by their result.",
+            [
+                ("", {"cache": cache, "result": result}, count)
+                for cache, stats in sorted(caches.items())
+                for result, count in sorted(stats.items())
+            ],
+        )
+        metric(
+            "devinstaller_cache_hit_ratio",
+            "gauge",
+            "Ratio of the cache lookups in the process which were hits.",
+            [
+                ("", {"cache": cache}, stats["hit"] / (stats["hit"] + stats["miss"]))
+                for cache, stats in sorted(caches.items())
+                if stats["hit"] + stats["miss"] > 0
+            ],
+        )
+        metric(
+            "devinstaller_run_duration_seconds",
+            "gauge",
+            "Wall time of the run.",
+            [("", {}, self.wall_time)],
+        )
+        metric(
+            "devinstaller_run_timestamp_seconds",
+            "gauge",
+            "Time when the run finished.",
+            [("", {}, time.time())],
+        )
+        return "\n".join(lines) + "\n"
+
+
+@typechecked
+def write(file_path: str, content: str) -> None:
+    """Write the metrics file atomically, so the collector never reads a
+    partial file
+    """
+    full_path = u.resolve_path(file_path)
+    directory = os.path.dirname(full_path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".metrics-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as _f:
+            _f.write(content)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, full_path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+@contextlib.contextmanager
+def collect(
+    graph: Any, file_path: Optional[str] = None
+) -> Iterator[Optional[RunMetrics]]:
+    """Collect the metrics of the run inside the context and write them when
+    it ends, even if the run fails.
+
+    Does nothing if neither the `file_path` nor `DDOT_METRICS_FILE` is set.
+
+    Args:
+        graph: The dependency graph being installed
+        file_path: The path to the metrics file. Defaults to `DDOT_METRICS_FILE`.
+    """
+    file_path = s.settings.DDOT_METRICS_FILE if file_path is None else file_path
+    if file_path is None:
+        yield None
+        return None
+    run = RunMetrics()
+    ev.bus.subscribe(run)
+    try:
+        yield run
+    finally:
+        ev.bus.unsubscribe(run)
+        run.finish()
+        statuses = {name: module.status for name, module in graph.graph.items()}
+        write(file_path, run.render(statuses))
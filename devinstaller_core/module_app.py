@@ -1,18 +1,17 @@
 """App module
 """
 import sys
-from typing import List, Optional, Union
+from typing import Any, Dict, List, Optional, Union
 
 from pydantic import validator
 from pydantic.dataclasses import dataclass
 from typeguard import typechecked
 
 from devinstaller_core import command as c
+from devinstaller_core import events as ev
 from devinstaller_core import exception as e
 from devinstaller_core import module_base as mb
-from devinstaller_core import utilities as u
-
-ui = u.UserInteraction()
+from devinstaller_core import template as tp
 
 
 @dataclass
@@ -41,9 +40,9 @@ class ModuleApp(mb.ModuleBase):
         if install_inst is None:
             return None
         for i in install_inst:
-            i.cmd = i.cmd.format(**constants)
+            i.cmd = tp.render(i.cmd, constants)
             i.rollback = (
-                i.rollback.format(**constants) if i.rollback is not None else None
+                tp.render(i.rollback, constants) if i.rollback is not None else None
             )
         return install_inst
 
@@ -58,9 +57,7 @@ class ModuleApp(mb.ModuleBase):
         constants = values["constants"]
         if uninstall_inst is None:
             return None
-        for i in uninstall_inst:
-            i = i.format(**constants)
-        return uninstall_inst
+        return [tp.render(i, constants) for i in uninstall_inst]
 
     def install(self) -> None:
         """The function which installs app modules
@@ -71,30 +68,40 @@ class ModuleApp(mb.ModuleBase):
         Returns:
             The response object of the module
         """
-        ui.print(f"Installing module: {self.display}...")
+        ev.publish(ev.InstallStarted(module=str(self.alias), display=str(self.display)))
         # installation_steps = create_instruction_list(self.install_inst)
         try:
             self.execute_instructions(self.install_inst)
         except e.ModuleRollbackFailed:
-            ui.print(
-                f"Rollback instructions for {self.display} failed. Quitting program."
+            ev.publish(
+                ev.RollbackFailed(module=str(self.alias), display=str(self.display))
             )
             sys.exit(1)
 
+    def plan(self) -> List[Dict[str, Any]]:
+        """Returns the installation instructions as `run` actions"""
+        return self.plan_instructions(self.install_inst)
+
     def uninstall(self) -> None:
         """Uninstall the module using its rollback instructions.
 
         Args:
             module: The module which you want to uninstall
         """
-        ui.print(f"Uninstalling module: {self.display}...")
+        ev.publish(
+            ev.UninstallStarted(module=str(self.alias), display=str(self.display))
+        )
         if self.uninstall_inst is None:
-            ui.print(f"No un-installation instructions found for {self.display}.")
+            ev.publish(
+                ev.UninstallSkipped(module=str(self.alias), display=str(self.display))
+            )
             return None
         try:
             for i in self.uninstall_inst:
                 session = c.SessionSpec()
                 session.run(i)
         except e.ModuleInstallationFailed:
-            ui.print(f"Un-installation of {self.display} failed. Quitting program.")
+            ev.publish(
+                ev.UninstallFailed(module=str(self.alias), display=str(self.display))
+            )
             sys.exit(1)
@@ -1,14 +1,18 @@
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, validator
 from pydantic.dataclasses import dataclass
 from typeguard import typechecked
 
+from devinstaller_core import checkpoint as cp
 from devinstaller_core import command as c
+from devinstaller_core import events as ev
 from devinstaller_core import exception as e
-from devinstaller_core import messages as m
 from devinstaller_core import settings as s
+from devinstaller_core import transaction as t
 from devinstaller_core import utilities as u
 
 ui = u.UserInteraction()
@@ -37,6 +41,8 @@ class ModuleBase(ABC):
     before: Optional[str] = None
     after: Optional[str] = None
     constants: Optional[Dict[str, str]] = None
+    locks: Optional[List[str]] = None
+    slots: Optional[Dict[str, int]] = None
 
     @validator("alias", pre=True, check_fields=False)
     @classmethod
@@ -84,6 +90,82 @@ class ModuleBase(ABC):
         """Abstract uninstall function for each module to be immplemented"""
         pass
 
+    def plan(self) -> List[Dict[str, Any]]:
+        """Returns the list of actions the module performs while installing,
+        without performing any of them.
+
+        Each action is a dict with the `action` key and its arguments.
+        """
+        return []
+
+    @classmethod
+    def plan_instructions(
+        cls, instructions: Optional[List[ModuleInstallInstruction]]
+    ) -> List[Dict[str, Any]]:
+        """Returns the `run` actions for the given instructions"""
+        if instructions is None:
+            return []
+        return [
+            {"action": "run", "cmd": i.cmd, "rollback": i.rollback}
+            for i in instructions
+        ]
+
+    def attach_checkpoint(self, checkpoint: Optional[cp.Checkpoint]) -> None:
+        """Attach the checkpoint of the current run to the module.
+
+        Every instruction executed by the module is numbered in the order it
+        is run and recorded in the checkpoint, and the instructions which were
+        already completed in the previous run are skipped.
+
+        Args:
+            checkpoint: The checkpoint of the current run
+        """
+        self.checkpoint = checkpoint
+        self.step = 0
+        self.completed: List[ModuleInstallInstruction] = []
+
+    def attach_transaction(self, transaction: Optional[t.FileTransaction]) -> None:
+        """Attach the filesystem transaction of the current run to the module.
+
+        Args:
+            transaction: The transaction journal
+        """
+        self.transaction = transaction
+
+    @typechecked
+    def snapshot(self, target: str, preserve: str = "link") -> None:
+        """Take a snapshot of the target before the module modifies it.
+
+        Does nothing if no transaction is attached to the module.
+
+        Args:
+            target: The full path of the target
+            preserve: The method used to preserve the target. One of
+                :data:`~devinstaller_core.transaction.PRESERVE_METHODS`
+        """
+        transaction: Optional[t.FileTransaction] = getattr(self, "transaction", None)
+        if transaction is not None:
+            assert self.alias is not None
+            transaction.snapshot(self.alias, target, preserve)
+
+    def restore(self) -> bool:
+        """Rollback all the filesystem changes made by the module.
+
+        Returns:
+            False if no changes were recorded for the module else True
+        """
+        transaction: Optional[t.FileTransaction] = getattr(self, "transaction", None)
+        if transaction is None:
+            return False
+        assert self.alias is not None
+        return transaction.rollback(self.alias)
+
+    def next_step(self) -> int:
+        """Returns the number of the next instruction to be run by the module"""
+        step = getattr(self, "step", 0)
+        self.step = step + 1
+        return step
+
     @typechecked
     def execute_instructions(
         self, instructions: Optional[List[ModuleInstallInstruction]]
@@ -100,14 +182,43 @@ class ModuleBase(ABC):
                 if the rollback command fails
         """
 
+        checkpoint: Optional[cp.Checkpoint] = getattr(self, "checkpoint", None)
+        alias = str(self.alias)
+        if getattr(self, "completed", None) is None:
+            self.completed = []
+        completed: List[ModuleInstallInstruction] = self.completed
+
         def core_logic(task=None):
             for index in range(len(instructions)):
                 inst = instructions[index]
+                step = self.next_step()
+                start = time.monotonic()
+                ev.publish(ev.InstructionStarted(module=alias, step=step, cmd=inst.cmd))
                 try:
-                    session.run(inst.cmd)
+                    if checkpoint is None:
+                        session.run(inst.cmd)
+                    elif step >= checkpoint.completed_steps(self.alias):
+                        session.run(inst.cmd)
+                        checkpoint.instruction_finished(self.alias, step)
+                    completed.append(inst)
+                    ev.publish(
+                        ev.InstructionFinished(
+                            module=alias,
+                            step=step,
+                            duration=round(time.monotonic() - start, 6),
+                        )
+                    )
                     if task is not None:
                         self.progress.update(task, advance=1)
-                except e.CommandFailed:
+                except e.CommandFailed as err:
+                    ev.publish(
+                        ev.InstructionFailed(
+                            module=alias,
+                            step=step,
+                            returncode=err.returncode,
+                            duration=round(time.monotonic() - start, 6),
+                        )
+                    )
                     rollback_list = instructions[:index]
                     rollback_list.reverse()
                     if task is not None:
@@ -119,13 +230,34 @@ class ModuleBase(ABC):
             return None
         self.progress = ui.track(transient=True)
         show_message = s.settings.DDOT_VERBOSE
-        if show_message:
+        # Only a single live display can be shown at a time, so the modules
+        # installed by the scheduler in the worker threads run without it.
+        if show_message or threading.current_thread() is not threading.main_thread():
             core_logic()
             return
         with self.progress:
             task = self.progress.add_task("Running...", total=len(instructions))
             core_logic(task)
 
+    def rollback_completed(self) -> None:
+        """Rollback every instruction completed by the module in the current
+        run, in the reverse order.
+
+        Used when the module fails after all of its instructions succeeded,
+        like when its `after` hook fails.
+
+        Raises:
+            ModuleRollbackFailed
+                if the rollback instructions fails
+        """
+        completed: List[ModuleInstallInstruction] = getattr(self, "completed", [])
+        if not completed:
+            return None
+        if getattr(self, "progress", None) is None:
+            self.progress = ui.track(transient=True)
+        self.rollback_instructions(completed, list(reversed(completed)))
+        self.completed = []
+
     @typechecked
     def rollback_instructions(
         self,
@@ -142,13 +274,8 @@ class ModuleBase(ABC):
                 if the rollback instructions fails
         """
         show_message = s.settings.DDOT_VERBOSE
-        ui.print(
-            "\n"
-            + m.error_message(
-                f"There was some error in installing module: [red]{self.name}[/red],\n"
-                "because of that I am rolling back all the changes so far."
-            )
-            + "\n"
+        ev.publish(
+            ev.RollbackStarted(module=self.name, steps=len(rollback_instructions))
         )
         show_message = s.settings.DDOT_VERBOSE
         if not show_message:
@@ -157,11 +284,11 @@ class ModuleBase(ABC):
         for inst in rollback_instructions:
             if inst.rollback is not None:
                 try:
-                    ui.print(
-                        m.warning_message(
-                            f"Rolling back `{inst.cmd}` using `{inst.rollback}`"
+                    ev.publish(
+                        ev.InstructionRolledBack(
+                            module=self.name, cmd=inst.cmd, rollback=inst.rollback
                         )
-                    ) if show_message else None
+                    )
                     session.run(inst.rollback)
                 except e.CommandFailed:
                     raise e.ModuleRollbackFailed
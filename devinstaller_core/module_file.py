@@ -1,22 +1,22 @@
 """File module
 """
-import grp
 import os
-import pwd
 import sys
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
-import oschmod
 from pydantic import validator
 from pydantic.dataclasses import dataclass
 
 from devinstaller_core import command as c
+from devinstaller_core import events as ev
 from devinstaller_core import exception as e
+from devinstaller_core import digest as dg
+from devinstaller_core import identity as ident
 from devinstaller_core import module_base as mb
+from devinstaller_core import template as tp
+from devinstaller_core import transaction as t
 from devinstaller_core import utilities as u
 
-ui = u.UserInteraction()
-
 
 @dataclass
 class ModuleFile(mb.ModuleBase):
@@ -48,7 +48,7 @@ class ModuleFile(mb.ModuleBase):
         if install_inst is None:
             return None
         for i in install_inst:
-            i.cmd = i.cmd.format(**constants)
+            i.cmd = tp.render(i.cmd, constants)
         return install_inst
 
     def install(self):
@@ -57,33 +57,58 @@ class ModuleFile(mb.ModuleBase):
             """
             raw_path = self.file_path if self.file_path else self.name
             path = u.resolve_path(raw_path)
-            mode = "w" if self.create else "a"
-            with open(path, mode) as f:
-                if self.owner and self.group:
-                    uid = pwd.getpwnam(self.owner).pw_uid
-                    gid = grp.getgrnam(self.group).gr_gid
-                    os.chown(f, uid, gid)
-                f.write(self.content)
-            if self.permission:
-                oschmod.set_mode(path, self.permission)
 
-        ui.print(f"Installing module: {self.display}...")
+            def apply(fd: int) -> None:
+                ident.apply(fd, self.owner, self.group, self.permission)
+
+            if self.create:
+                self.snapshot(path, "link")
+                t.replace_file(path, self.content, on_write=apply)
+            else:
+                self.snapshot(path, "clone")
+                with open(path, "a") as _f:
+                    _f.write(self.content)
+                    _f.flush()
+                    apply(_f.fileno())
+
+        ev.publish(ev.InstallStarted(module=str(self.alias), display=str(self.display)))
         # installation_steps = create_instruction_list(self.install_inst)
         try:
             self.execute_instructions(self.inits)
             core()
             self.execute_instructions(self.configs)
         except e.ModuleRollbackFailed:
-            ui.print(
-                f"Rollback instructions for {self.display} failed. Quitting program."
+            ev.publish(
+                ev.RollbackFailed(module=str(self.alias), display=str(self.display))
             )
             sys.exit(1)
 
+    def plan(self) -> List[Dict[str, Any]]:
+        """Returns the `inits`, the file write and the `configs` as actions"""
+        raw_path = self.file_path if self.file_path else self.name
+        write = {
+            "action": "write_file",
+            "path": u.resolve_path(raw_path),
+            "append": not self.create,
+            "content": self.content,
+            "digest": dg.hash_data(self.content),
+            "owner": self.owner,
+            "group": self.group,
+            "permission": self.permission,
+        }
+        return (
+            self.plan_instructions(self.inits)
+            + [write]
+            + self.plan_instructions(self.configs)
+        )
+
     def uninstall(self):
         """Method to rollback if the installation failed and this module is now
         an orphan module.
         """
         if self.rollback:
+            if self.restore():
+                return None
             raw_path = self.file_path if self.file_path else self.name
             path = u.resolve_path(raw_path)
             os.remove(path)
@@ -1,21 +1,19 @@
 """Folder module
 """
-import grp
 import os
-import pwd
 import sys
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
-import oschmod
 from pydantic import validator
 from pydantic.dataclasses import dataclass
 
+from devinstaller_core import events as ev
 from devinstaller_core import exception as e
+from devinstaller_core import identity as ident
 from devinstaller_core import module_base as mb
+from devinstaller_core import template as tp
 from devinstaller_core import utilities as u
 
-ui = u.UserInteraction()
-
 
 @dataclass
 class ModuleFolder(mb.ModuleBase):
@@ -46,40 +44,58 @@ class ModuleFolder(mb.ModuleBase):
         if install_inst is None:
             return None
         for i in install_inst:
-            i.cmd = i.cmd.format(**constants)
+            i.cmd = tp.render(i.cmd, constants)
         return install_inst
 
     def install(self):
         def core():
             """Core logic for creating folder
+
+            An existing folder is used as is instead of failing. Only its
+            owner, group and permission are changed, and they are restored
+            when the module is rolled back.
             """
             raw_path = self.folder_path if self.folder_path else self.name
             path = u.resolve_path(raw_path)
-            os.makedirs(path)
-            if self.owner and self.group:
-                uid = pwd.getpwnam(self.owner).pw_uid
-                gid = grp.getgrnam(self.group).gr_gid
-                os.chown(path, uid, gid)
-            if self.permission:
-                oschmod.set_mode(path, self.permission)
+            self.snapshot(path, "metadata")
+            os.makedirs(path, exist_ok=True)
+            ident.apply_path(path, self.owner, self.group, self.permission)
 
-        ui.print(f"Installing module: {self.display}...")
+        ev.publish(ev.InstallStarted(module=str(self.alias), display=str(self.display)))
         # installation_steps = create_instruction_list(self.install_inst)
         try:
             self.execute_instructions(self.inits)
             core()
             self.execute_instructions(self.configs)
         except e.ModuleRollbackFailed:
-            ui.print(
-                f"Rollback instructions for {self.display} failed. Quitting program."
+            ev.publish(
+                ev.RollbackFailed(module=str(self.alias), display=str(self.display))
             )
             sys.exit(1)
 
+    def plan(self) -> List[Dict[str, Any]]:
+        """Returns the `inits`, the folder creation and the `configs` as actions"""
+        raw_path = self.folder_path if self.folder_path else self.name
+        make_dir = {
+            "action": "make_dir",
+            "path": u.resolve_path(raw_path),
+            "owner": self.owner,
+            "group": self.group,
+            "permission": self.permission,
+        }
+        return (
+            self.plan_instructions(self.inits)
+            + [make_dir]
+            + self.plan_instructions(self.configs)
+        )
+
     def uninstall(self):
         """Method to rollback if the installation failed and this module is now
         an orphan module.
         """
         if self.rollback:
+            if self.restore():
+                return None
             raw_path = self.folder_path if self.folder_path else self.name
             path = u.resolve_path(raw_path)
             os.removedirs(path)
@@ -0,0 +1,65 @@
+"""Index of the modules compatible with each platform of the spec
+
+A spec listing many platforms declares most of its modules for only a few of
+them. The index is built once for the validated spec, so creating the
+dependency graph for a platform only touches the modules of that platform.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from typeguard import typechecked
+
+from devinstaller_core.common_models import TypeCommonModule, TypeFullDocument
+
+
+@dataclass
+class ModuleIndex:
+    """The modules of the spec grouped by platform
+
+    The modules are referred to by their position in the `modules` block, since
+    more than one module can share the same alias.
+
+    Attributes:
+        modules: Positions of the modules compatible with each platform, in the
+            order they are declared
+    """
+
+    modules: Dict[str, List[int]] = field(default_factory=dict)
+
+    @typechecked
+    def get_modules(
+        self, document: TypeFullDocument, platform_codename: str
+    ) -> Optional[List[TypeCommonModule]]:
+        """Returns the modules of the document compatible with the platform,
+        or None if the platform is not in the index
+        """
+        if platform_codename not in self.modules:
+            return None
+        module_list = document["modules"]
+        return [module_list[i] for i in self.modules[platform_codename]]
+
+
+@typechecked
+def build(document: TypeFullDocument) -> ModuleIndex:
+    """Build the index for all the platforms declared in the document
+
+    Modules without `supported_platforms` are compatible with every platform.
+    The modules sharing the same alias are kept, since the dependency graph
+    asks which one to use.
+
+    Args:
+        document: The validated schema object
+
+    Returns:
+        The index
+    """
+    index = ModuleIndex()
+    codenames = [i["name"] for i in document.get("platforms", [])]
+    for codename in codenames:
+        index.modules[codename] = []
+    for position, module in enumerate(document["modules"]):
+        supported = module.get("supported_platforms")
+        for codename in codenames if supported is None else supported:
+            if codename in index.modules:
+                index.modules[codename].append(position)
+    return index
@@ -1,21 +1,19 @@
 """Link module
 """
-import grp
 import os
-import pwd
 import sys
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
-import oschmod
 from pydantic import validator
 from pydantic.dataclasses import dataclass
 
+from devinstaller_core import events as ev
 from devinstaller_core import exception as e
+from devinstaller_core import identity as ident
 from devinstaller_core import module_base as mb
+from devinstaller_core import template as tp
 from devinstaller_core import utilities as u
 
-ui = u.UserInteraction()
-
 
 @dataclass
 class ModuleLink(mb.ModuleBase):
@@ -48,42 +46,68 @@ class ModuleLink(mb.ModuleBase):
         if install_inst is None:
             return None
         for i in install_inst:
-            i.cmd = i.cmd.format(**constants)
+            i.cmd = tp.render(i.cmd, constants)
         return install_inst
 
     def install(self):
         def core():
-            """Core logic for creating file
+            """Core logic for creating the link
+
+            The link is created next to the `dest` and atomically replaces it,
+            so an existing `dest` is overwritten instead of failing. Its
+            snapshot is restored when the module is rolled back.
             """
             source = u.resolve_path(self.source)
             dest = u.resolve_path(self.dest)
-            if self.symbolic:
-                os.symlink(source, dest)
-            else:
-                os.link(source, dest)
-            if self.owner and self.group:
-                uid = pwd.getpwnam(self.owner).pw_uid
-                gid = grp.getgrnam(self.group).gr_gid
-                os.chown(source, uid, gid)
-            if self.permission:
-                oschmod.set_mode(source, self.permission)
+            self.snapshot(dest, "link")
+            self.snapshot(source, "metadata")
+            temp_dest = f"{dest}.{os.getpid()}.tmp"
+            try:
+                if self.symbolic:
+                    os.symlink(source, temp_dest)
+                else:
+                    os.link(source, temp_dest)
+                os.replace(temp_dest, dest)
+            finally:
+                if os.path.lexists(temp_dest):
+                    os.unlink(temp_dest)
+            ident.apply_path(source, self.owner, self.group, self.permission)
 
-        ui.print(f"Installing module: {self.display}...")
+        ev.publish(ev.InstallStarted(module=str(self.alias), display=str(self.display)))
         # installation_steps = create_instruction_list(self.install_inst)
         try:
             self.execute_instructions(self.inits)
             core()
             self.execute_instructions(self.configs)
         except e.ModuleRollbackFailed:
-            ui.print(
-                f"Rollback instructions for {self.display} failed. Quitting program."
+            ev.publish(
+                ev.RollbackFailed(module=str(self.alias), display=str(self.display))
             )
             sys.exit(1)
 
+    def plan(self) -> List[Dict[str, Any]]:
+        """Returns the `inits`, the link creation and the `configs` as actions"""
+        link = {
+            "action": "link",
+            "source": u.resolve_path(self.source),
+            "dest": u.resolve_path(self.dest),
+            "symbolic": self.symbolic,
+            "owner": self.owner,
+            "group": self.group,
+            "permission": self.permission,
+        }
+        return (
+            self.plan_instructions(self.inits)
+            + [link]
+            + self.plan_instructions(self.configs)
+        )
+
     def uninstall(self):
         """Method to rollback if the installation failed and this module is now
         an orphan module.
         """
         if self.rollback:
+            if self.restore():
+                return None
             path = u.resolve_path(self.source)
             os.unlink(path)
@@ -1,15 +1,14 @@
 """Phony module
 """
 import sys
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import validator
 from pydantic.dataclasses import dataclass
 
+from devinstaller_core import events as ev
 from devinstaller_core import module_base as mb
-from devinstaller_core import utilities
-
-ui = utilities.ui
+from devinstaller_core import template as tp
 
 
 @dataclass
@@ -32,15 +31,21 @@ class ModulePhony(mb.ModuleBase):
         if install_inst is None:
             return None
         for i in install_inst:
-            i.cmd = i.cmd.format(**constants)
+            i.cmd = tp.render(i.cmd, constants)
         return install_inst
 
     def install(self):
         """Install using the given commands
         """
-        ui.print(f"Running commands in: {self.display}...")
+        ev.publish(
+            ev.CommandsStarted(module=str(self.alias), display=str(self.display))
+        )
         self.execute_instructions(self.commands)
 
+    def plan(self) -> List[Dict[str, Any]]:
+        """Returns the commands as `run` actions"""
+        return self.plan_instructions(self.commands)
+
     def uninstall(self):
         """Dummy method. Not part of the specification but here for initializing
         the object.
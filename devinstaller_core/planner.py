@@ -0,0 +1,70 @@
+"""Dry-run planner which materializes the execution plan without any side effects
+"""
+import json
+from typing import Any, Dict, List, Optional
+
+from typeguard import typechecked
+
+from devinstaller_core import dependency_graph as dg
+
+
+@typechecked
+def create_plan(
+    dependency_graph: dg.DependencyGraph, requirement_list: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """Create the execution plan for installing the given modules.
+
+    Nothing is installed and no command is run. The plan contains the order in
+    which the modules would be installed, the same order grouped into levels
+    which can be installed in parallel, and every action of each module with
+    all the constants already substituted.
+
+    Args:
+        dependency_graph: The dependency graph of the current platform
+        requirement_list: The list of modules to be installed. Defaults to all
+            the modules in the graph.
+
+    Returns:
+        The plan as a JSON serializable dict
+    """
+    if requirement_list is None:
+        requirement_list = list(dependency_graph.graph.keys())
+    order = dependency_graph.install_order(requirement_list)
+    modules: List[Dict[str, Any]] = []
+    for module_name in order:
+        module = dependency_graph.graph[module_name]
+        modules.append(
+            {
+                "alias": module_name,
+                "name": module.name,
+                "module_type": dg.get_module_type(module),
+                "requires": getattr(module, "requires", None) or [],
+                "optionals": getattr(module, "optionals", None) or [],
+                "before": module.before,
+                "after": module.after,
+                "actions": module.plan(),
+            }
+        )
+    return {
+        "platform": dependency_graph.platform_codename,
+        "requirements": requirement_list,
+        "order": order,
+        "levels": dependency_graph.install_levels(requirement_list),
+        "modules": modules,
+    }
+
+
+@typechecked
+def dump(plan: Dict[str, Any]) -> str:
+    """Serialize the plan into JSON.
+
+    The keys are sorted so the same spec always gives the same output, which
+    makes the plans easy to diff.
+
+    Args:
+        plan: The plan created using :func:`create_plan`
+
+    Returns:
+        The JSON string
+    """
+    return json.dumps(plan, indent=2, sort_keys=True)
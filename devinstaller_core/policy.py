@@ -0,0 +1,168 @@
+"""Declarative policy for making selections without asking the user
+"""
+from typing import Any, Dict, List, Optional
+
+from typeguard import typechecked
+
+from devinstaller_core import exception as e
+from devinstaller_core import settings as s
+
+SELECTION_KINDS = ["module", "platform", "interface", "confirm", "prompt"]
+"""Kinds of selections which can be made using the policy
+
+Values allowed:
+    1. `module`: Which one of the modules sharing the same codename is used
+    2. `platform`: Which one of the platforms is used
+    3. `interface`: Which one of the interfaces is used
+    4. `confirm`: The response to confirmations. Rule is either `yes` or `no`.
+    5. `prompt`: The response to any other prompt when there is no one to ask,
+       like in the headless runs
+"""
+
+
+class SelectionPolicy:
+    """The policy used for making the selections which would otherwise block on
+    a prompt.
+
+    Each kind of selection has a rule:
+
+    - `first`: Select the first choice
+    - `last`: Select the last choice
+    - `prefer:<name>,<name>,...`: Select the first name in the priority list
+      which is one of the choices
+
+    Rules can be overridden for specific platforms using the `platforms` key.
+
+    Examples:
+        .. code-block:: json
+
+            {
+                "module": "first",
+                "platform": "prefer:ubuntu,debian",
+                "confirm": "no",
+                "platforms": {"macos": {"module": "prefer:foo_brew"}}
+            }
+
+    Args:
+        rules: The rules for each kind of selection
+        interactive: If False then the selections which can't be made using the
+            rules raise an error instead of asking the user
+
+    Raises:
+        DevinstallerError
+            with error code :ref:`error-code-D106`
+    """
+
+    @typechecked
+    def __init__(
+        self, rules: Optional[Dict[str, Any]] = None, interactive: bool = True
+    ) -> None:
+        self.rules: Dict[str, Any] = {} if rules is None else rules
+        self.interactive = interactive
+        for kind in self.rules:
+            if kind != "platforms" and kind not in SELECTION_KINDS:
+                raise e.DevinstallerError(kind, "D106", "Unknown selection kind.")
+
+    @classmethod
+    def from_settings(cls) -> "SelectionPolicy":
+        """Create the policy using `DDOT_POLICY` and `DDOT_NON_INTERACTIVE`"""
+        return cls(
+            rules=s.settings.DDOT_POLICY,
+            interactive=not s.settings.DDOT_NON_INTERACTIVE,
+        )
+
+    @typechecked
+    def get_rule(
+        self, kind: str, platform_codename: Optional[str] = None
+    ) -> Optional[str]:
+        """Returns the rule for the kind of selection, giving priority to the
+        rule for the platform
+        """
+        platform_rules = self.rules.get("platforms", {}).get(platform_codename, {})
+        return platform_rules.get(kind, self.rules.get(kind))
+
+    @typechecked
+    def select(
+        self, kind: str, choices: List[str], platform_codename: Optional[str] = None
+    ) -> Optional[int]:
+        """Select one of the choices using the rule for the given kind.
+
+        Args:
+            kind: The kind of the selection
+            choices: The names of the choices
+            platform_codename: The codename of the current platform
+
+        Returns:
+            The index of the selected choice or None if the user has to be asked
+
+        Raises:
+            DevinstallerError
+                with error code :ref:`error-code-D106` if the selection can't be
+                made and the policy is not interactive
+        """
+        rule = self.get_rule(kind, platform_codename)
+        index: Optional[int] = None
+        if rule == "first" and choices:
+            index = 0
+        elif rule == "last" and choices:
+            index = len(choices) - 1
+        elif rule is not None and rule.startswith("prefer:"):
+            for name in rule[len("prefer:") :].split(","):
+                if name.strip() in choices:
+                    index = choices.index(name.strip())
+                    break
+        elif rule is not None:
+            raise e.DevinstallerError(rule, "D106", f"Unknown rule for `{kind}`.")
+        if index is None:
+            self.check_interactive(kind, choices)
+        return index
+
+    @typechecked
+    def confirm(self, platform_codename: Optional[str] = None) -> Optional[bool]:
+        """Respond to a confirmation using the rule for `confirm`
+
+        Returns:
+            The response or None if the user has to be asked
+        """
+        rule = self.get_rule("confirm", platform_codename)
+        if rule is None:
+            self.check_interactive("confirm", ["yes", "no"])
+            return None
+        if rule not in ["yes", "no"]:
+            raise e.DevinstallerError(rule, "D106", "Unknown rule for `confirm`.")
+        return rule == "yes"
+
+    @typechecked
+    def check_interactive(self, kind: str, choices: List[str]) -> None:
+        """Raise if the user can't be asked for making the selection"""
+        if not self.interactive:
+            raise e.DevinstallerError(
+                kind,
+                "D106",
+                f"Couldn't select from {', '.join(choices)} without asking the user.",
+            )
+
+
+_policy: Optional[SelectionPolicy] = None
+
+
+def get_policy() -> SelectionPolicy:
+    """Returns the current selection policy.
+
+    Defaults to the policy created from the settings.
+    """
+    global _policy
+    if _policy is None:
+        _policy = SelectionPolicy.from_settings()
+    return _policy
+
+
+@typechecked
+def set_policy(policy: Optional[SelectionPolicy]) -> None:
+    """Set the selection policy, for example from the command line arguments.
+
+    Args:
+        policy: The new policy. If None the policy is created from the settings again.
+    """
+    global _policy
+    _policy = policy
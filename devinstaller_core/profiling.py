@@ -0,0 +1,138 @@
+"""Opt-in profiling of each phase of the run
+
+Profiling is enabled by setting `DDOT_PROFILE_DIR`. Every run gets its own
+directory inside it, and every phase writes a `.prof` file which can be opened
+using `pstats` or `snakeviz`, and a report of the top allocations made during
+the phase.
+"""
+import contextlib
+import cProfile
+import os
+import re
+import threading
+import time
+import tracemalloc
+from typing import Iterator, List, Optional
+
+from typeguard import typechecked
+
+from devinstaller_core import settings as s
+from devinstaller_core import utilities as u
+
+TOP_ALLOCATIONS = 25
+"""Number of lines in the allocation report of each phase
+"""
+
+
+class Profiler:
+    """Profiles the phases of a single run
+
+    Nested phases are profiled exclusively, so the time spent in a nested phase
+    is not part of the profile of the phase containing it.
+
+    Args:
+        run_dir: The directory where the reports are written
+    """
+
+    @typechecked
+    def __init__(self, run_dir: str) -> None:
+        self.run_dir = run_dir
+        os.makedirs(run_dir, exist_ok=True)
+        self.count = 0
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def get_stack(self) -> List[cProfile.Profile]:
+        """Returns the profiles of the phases running in the current thread"""
+        if not hasattr(self.local, "stack"):
+            self.local.stack = []
+        return self.local.stack
+
+    @typechecked
+    def get_path(self, name: str) -> str:
+        """Returns the path prefix for the reports of the next phase"""
+        with self.lock:
+            self.count += 1
+            count = self.count
+        name = re.sub(r"[^\w.-]", "_", name)
+        return os.path.join(self.run_dir, f"{count:04d}-{name}")
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Profile the code run inside the context
+
+        Args:
+            name: The name of the phase
+        """
+        path = self.get_path(name)
+        stack = self.get_stack()
+        if stack:
+            stack[-1].disable()
+        profile = cProfile.Profile()
+        stack.append(profile)
+        before = tracemalloc.take_snapshot()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            after = tracemalloc.take_snapshot()
+            stack.pop()
+            if stack:
+                stack[-1].enable()
+            profile.dump_stats(f"{path}.prof")
+            self.write_allocations(f"{path}.alloc.txt", before, after)
+
+    @typechecked
+    def write_allocations(
+        self, path: str, before: tracemalloc.Snapshot, after: tracemalloc.Snapshot
+    ) -> None:
+        """Write the lines which allocated the most memory during the phase"""
+        stats = after.compare_to(before, "lineno")
+        with open(path, "w") as _f:
+            for stat in stats[:TOP_ALLOCATIONS]:
+                _f.write(f"{stat}\n")
+
+
+_profiler: Optional[Profiler] = None
+"""The profiler of the current run
+"""
+
+
+def get_profiler() -> Optional[Profiler]:
+    """Returns the profiler of the current run, creating it on the first call.
+
+    Returns None if `DDOT_PROFILE_DIR` is not set.
+    """
+    global _profiler
+    if _profiler is None and s.settings.DDOT_PROFILE_DIR:
+        run_name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        run_dir = os.path.join(u.resolve_path(s.settings.DDOT_PROFILE_DIR), run_name)
+        _profiler = Profiler(run_dir)
+    return _profiler
+
+
+def set_profiler(profiler: Optional[Profiler]) -> None:
+    """Replace the profiler of the current run"""
+    global _profiler
+    _profiler = profiler
+
+
+@contextlib.contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Profile the phase if profiling is enabled, otherwise do nothing
+
+    Examples:
+        - with phase("parse"): ...
+
+    Args:
+        name: The name of the phase
+    """
+    profiler = get_profiler()
+    if profiler is None:
+        yield
+        return None
+    with profiler.phase(name):
+        yield
@@ -0,0 +1,106 @@
+"""Loads the prog files straight from memory
+
+The prog files are executed from their contents instead of being written to a
+temporary file first. Their code objects are compiled only once for each
+digest while they are cached and every prog file gets its own module name, so
+the prog files of the included spec files can be loaded side by side.
+"""
+import importlib.abc
+import importlib.util
+import linecache
+import sys
+import threading
+import types
+
+from typeguard import typechecked
+
+from devinstaller_core import metrics as mt
+from devinstaller_core import utilities as u
+
+MODULE_PREFIX = "devfile_"
+"""Prefix of the module names of the prog files, followed by their digest
+"""
+
+MAX_CODE_OBJECTS = 64
+"""The maximum number of compiled prog files kept in `code_objects`
+"""
+
+code_objects = u.LRUCache(MAX_CODE_OBJECTS)
+"""The compiled prog files with the digest of their contents as the key
+"""
+
+_lock = threading.Lock()
+
+
+class ProgLoader(importlib.abc.InspectLoader):
+    """The loader executing a prog file from its contents
+
+    Args:
+        source: The contents of the prog file
+        digest: The digest of the contents
+        origin: The path or url of the prog file, shown in the tracebacks
+    """
+
+    def __init__(self, source: str, digest: str, origin: str) -> None:
+        self.source = source
+        self.digest = digest
+        self.origin = origin
+
+    def get_source(self, fullname: str) -> str:
+        """Returns the contents of the prog file"""
+        return self.source
+
+    def get_code(self, fullname: str) -> types.CodeType:
+        """Returns the code object, compiling it only if no prog file with the
+        same digest was compiled before
+        """
+        with _lock:
+            code = code_objects.get(self.digest)
+        mt.record_cache("prog_compile", code is not None)
+        if code is None:
+            code = compile(self.source, self.origin, "exec", dont_inherit=True)
+            with _lock:
+                code_objects[self.digest] = code
+        return code
+
+    def is_package(self, fullname: str) -> bool:
+        return False
+
+
+@typechecked
+def get_module_name(digest: str) -> str:
+    """Returns the name of the module of the prog file"""
+    return MODULE_PREFIX + digest[:16]
+
+
+@typechecked
+def load(source: str, digest: str, origin: str) -> types.ModuleType:
+    """Execute the prog file and returns it as a new module
+
+    The module is added to `sys.modules`, so the prog file can use
+    `dataclasses`, `pickle` and the like which look up their module by name.
+    Its contents are added to `linecache`, so the tracebacks show the lines
+    of the prog file even if it was never saved.
+
+    Args:
+        source: The contents of the prog file
+        digest: The digest of the contents
+        origin: The path or url of the prog file
+
+    Returns:
+        The module
+    """
+    module_name = get_module_name(digest)
+    loader = ProgLoader(source, digest, origin)
+    spec = importlib.util.spec_from_loader(module_name, loader, origin=origin)
+    assert spec is not None
+    module = importlib.util.module_from_spec(spec)
+    lines = source.splitlines(True)
+    linecache.cache[origin] = (len(source), None, lines, origin)
+    sys.modules[module_name] = module
+    try:
+        loader.exec_module(module)
+    except BaseException:
+        sys.modules.pop(module_name, None)
+        raise
+    return module
@@ -0,0 +1,309 @@
+"""Parallel installation of the modules which respects their resources
+"""
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from typeguard import typechecked
+
+from devinstaller_core import events as ev
+from devinstaller_core import history as hi
+from devinstaller_core import settings as s
+
+DEFAULT_CAPACITIES = {"cpu": os.cpu_count() or 1}
+"""Capacity of the slots which are not set in `DDOT_SLOTS`.
+
+Any other slot has a capacity of 1.
+"""
+
+INSTRUCTION_DURATION = 1.0
+"""Estimated seconds taken by a single instruction of a module which has no
+recorded duration
+"""
+
+INSTRUCTION_FIELDS = ["inits", "install_inst", "configs", "commands"]
+"""Fields of the module whose instructions are run when it is installed
+"""
+
+
+class Resources:
+    """The locks held and the slots used by the running modules
+
+    Args:
+        capacities: The capacity of each slot
+    """
+
+    @typechecked
+    def __init__(self, capacities: Optional[Dict[str, int]] = None) -> None:
+        self.capacities = dict(DEFAULT_CAPACITIES, **(capacities or {}))
+        self.used: Dict[str, int] = {}
+        self.locks: Set[str] = set()
+
+    @typechecked
+    def demand(self, module: Any) -> Tuple[Set[str], Dict[str, int]]:
+        """Returns the locks and the slots needed by the module.
+
+        A module asking for more than the capacity of a slot gets the whole
+        slot, so it can still run.
+        """
+        locks = set(getattr(module, "locks", None) or [])
+        slots = {
+            name: min(count, self.capacities.get(name, 1))
+            for name, count in (getattr(module, "slots", None) or {}).items()
+        }
+        return locks, slots
+
+    @typechecked
+    def available(self, module: Any) -> bool:
+        """Check if the module can start now"""
+        locks, slots = self.demand(module)
+        if locks & self.locks:
+            return False
+        return all(
+            self.used.get(name, 0) + count <= self.capacities.get(name, 1)
+            for name, count in slots.items()
+        )
+
+    @typechecked
+    def acquire(self, module: Any) -> None:
+        """Take the locks and the slots of the module"""
+        locks, slots = self.demand(module)
+        self.locks.update(locks)
+        for name, count in slots.items():
+            self.used[name] = self.used.get(name, 0) + count
+
+    @typechecked
+    def release(self, module: Any) -> None:
+        """Give back the locks and the slots of the module"""
+        locks, slots = self.demand(module)
+        self.locks.difference_update(locks)
+        for name, count in slots.items():
+            self.used[name] -= count
+
+
+class Scheduler:
+    """Install the modules of the graph in parallel.
+
+    A module starts once all of its `requires` and `optionals` are done, and
+    only when its `locks` are free and its `slots` fit in the remaining
+    capacity. Among the modules which are ready, the ones with the longest
+    chain of work left after them start first, so the long chains don't start
+    late. Ties are broken by the install order. A module which has to wait for
+    its resources doesn't hold back the ones after it.
+
+    The chains are measured using the durations of the previous runs, and the
+    number of instructions for the modules which were never installed.
+
+    If a module in the `requires` of a module fails, the module fails without
+    being installed. The failure of a module in the `optionals` is ignored.
+
+    Args:
+        graph: The dependency graph
+        max_workers: Maximum number of modules installed at the same time
+        capacities: The capacity of each slot. Defaults to `DDOT_SLOTS`.
+        history: The durations of the previous runs
+    """
+
+    @typechecked
+    def __init__(
+        self,
+        graph: Any,
+        max_workers: int = 4,
+        capacities: Optional[Dict[str, int]] = None,
+        history: Optional[hi.DurationHistory] = None,
+    ) -> None:
+        self.graph = graph
+        self.history = history
+        self.max_workers = max_workers
+        self.resources = Resources(
+            s.settings.DDOT_SLOTS if capacities is None else capacities
+        )
+        self.order: Dict[str, int] = {}
+        self.paths: Dict[str, float] = {}
+        self.waiting: Dict[str, Set[str]] = {}
+        self.dependents: Dict[str, List[str]] = {}
+        self.ready: List[str] = []
+        self.running: Dict[Future, str] = {}
+
+    @typechecked
+    def estimate(self, module_name: str) -> float:
+        """Returns the expected install duration of the module in seconds"""
+        if self.history is not None:
+            duration = self.history.get(module_name)
+            if duration is not None:
+                return duration
+        module = self.graph.graph[module_name]
+        count = sum(len(getattr(module, i, None) or []) for i in INSTRUCTION_FIELDS)
+        return count * INSTRUCTION_DURATION
+
+    @typechecked
+    def prioritize(self, order: List[str]) -> None:
+        """Compute the length of the critical path starting at each module,
+        which is its own duration plus the longest path among the modules
+        depending on it.
+
+        Args:
+            order: The install order of the modules
+        """
+        self.order = {name: index for index, name in enumerate(order)}
+        self.paths = {}
+        dependents: Dict[str, List[str]] = {}
+        for module_name in order:
+            for child_name in self.graph.dependencies(module_name):
+                dependents.setdefault(child_name, []).append(module_name)
+        for module_name in reversed(order):
+            after = [self.paths[i] for i in dependents.get(module_name, [])]
+            self.paths[module_name] = self.estimate(module_name) + max(after, default=0)
+
+    @typechecked
+    def priority(self, module_name: str) -> Any:
+        """Returns the sort key of the module among the ready modules. Lower
+        keys start first.
+        """
+        return (-self.paths[module_name], self.order[module_name])
+
+    @typechecked
+    def check_requires(self, module_name: str) -> bool:
+        """Publish the failed dependencies of the module
+
+        Returns:
+            False if any of the `requires` failed
+        """
+        module = self.graph.graph[module_name]
+        for index, child_name in enumerate(getattr(module, "requires", None) or []):
+            if self.graph.graph[child_name].status == "failed":
+                ev.publish(
+                    ev.RequiredModuleFailed(module=module_name, child=child_name)
+                )
+                self.graph.orphan_modules.update(module.requires[:index])
+                return False
+        for child_name in getattr(module, "optionals", None) or []:
+            if self.graph.graph[child_name].status == "failed":
+                ev.publish(
+                    ev.OptionalModuleFailed(module=module_name, child=child_name)
+                )
+        return True
+
+    @typechecked
+    def prepare(self, order: List[str]) -> None:
+        """Find the modules each module is waiting for and the modules which
+        are ready to start
+
+        Args:
+            order: The install order of the modules
+        """
+        self.waiting = {}
+        self.dependents = {}
+        self.ready = []
+        for module_name in order:
+            if self.graph.graph[module_name].status is not None:
+                continue
+            pending = {
+                i
+                for i in self.graph.dependencies(module_name)
+                if self.graph.graph[i].status is None
+            }
+            self.waiting[module_name] = pending
+            for child_name in pending:
+                self.dependents.setdefault(child_name, []).append(module_name)
+            if not pending:
+                self.ready.append(module_name)
+
+    @typechecked
+    def finish(self, module_name: str) -> None:
+        """Mark the module as done and move the modules which were waiting
+        only for it to the ready modules
+        """
+        for parent_name in self.dependents.get(module_name, []):
+            self.waiting[parent_name].discard(module_name)
+            if not self.waiting[parent_name]:
+                self.ready.append(parent_name)
+
+    def dispatch(self, executor: ThreadPoolExecutor) -> None:
+        """Start the ready modules in the order of their priority, as long as
+        there are free workers and their resources are available
+
+        Args:
+            executor: The executor installing the modules
+        """
+        self.ready.sort(key=self.priority)
+        for module_name in list(self.ready):
+            if len(self.running) >= self.max_workers:
+                break
+            module = self.graph.graph[module_name]
+            if not self.check_requires(module_name):
+                self.ready.remove(module_name)
+                module.status = "failed"
+                self.finish(module_name)
+                continue
+            if not self.resources.available(module):
+                continue
+            self.ready.remove(module_name)
+            module.status = "in progress"
+            self.resources.acquire(module)
+            future = executor.submit(self.graph.traverse_install, module_name)
+            self.running[future] = module_name
+
+    @typechecked
+    def run(self, requirement_list: List[str]) -> None:
+        """Install the modules in the requirement list and their dependencies
+
+        Args:
+            requirement_list: The list of modules to be installed
+        """
+        order = self.graph.install_order(requirement_list)
+        self.prioritize(order)
+        self.prepare(order)
+        self.running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while self.ready or self.running:
+                self.dispatch(executor)
+                if not self.running:
+                    continue
+                done, _ = wait(list(self.running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    module_name = self.running.pop(future)
+                    self.resources.release(self.graph.graph[module_name])
+                    future.result()
+                    self.finish(module_name)
+        self.graph.prune_orphans(requirement_list)
+
+    @typechecked
+    def run_level(self, level: List[str], func: Callable[[str], None]) -> None:
+        """Call the function for every module in the level in parallel,
+        respecting the resources of the modules
+
+        Args:
+            level: Names of the modules which don't depend on each other
+            func: The function called with the name of each module
+        """
+        pending = list(level)
+        running: Dict[Future, str] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                for module_name in list(pending):
+                    if len(running) >= self.max_workers:
+                        break
+                    module = self.graph.graph[module_name]
+                    if not self.resources.available(module):
+                        continue
+                    pending.remove(module_name)
+                    self.resources.acquire(module)
+                    running[executor.submit(func, module_name)] = module_name
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    module_name = running.pop(future)
+                    self.resources.release(self.graph.graph[module_name])
+                    future.result()
+
+    @typechecked
+    def uninstall(self, levels: List[List[str]]) -> None:
+        """Uninstall the modules level by level, with the modules in each
+        level uninstalled in parallel
+
+        Args:
+            levels: The levels returned by :meth:`DependencyGraph.uninstall_levels
+                <devinstaller_core.dependency_graph.DependencyGraph.uninstall_levels>`
+        """
+        for level in levels:
+            self.run_level(level, lambda i: self.graph.graph[i].uninstall())
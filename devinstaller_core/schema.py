@@ -42,6 +42,7 @@ from typeguard import typechecked
 
 from devinstaller_core import common_models as cm
 from devinstaller_core import exception as e
+from devinstaller_core import profiling as pr
 
 
 @typechecked
@@ -80,7 +81,8 @@ def get_validated_document(document: Dict[Any, Any]) -> cm.TypeFullDocument:
         SpecificationError
             with error code :ref:`error-code-S100`
     """
-    data = validate(document, schema=cm.schema())
+    with pr.phase("validate"):
+        data = validate(document, schema=cm.schema())
     if data["valid"]:
         d = data["document"]
         return cm.TypeFullDocument(d)
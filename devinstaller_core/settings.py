@@ -1,9 +1,21 @@
+from typing import Any, Dict, Optional
+
 from pydantic import BaseSettings
 import os
 
 
 class Settings(BaseSettings):
     DDOT_VERBOSE = False
+    DDOT_STATE_DIR: str = "~/.devinstaller"
+    DDOT_POLICY: Dict[str, Any] = {}
+    DDOT_NON_INTERACTIVE = False
+    DDOT_SOCKET: str = "~/.devinstaller/daemon.sock"
+    DDOT_PROFILE_DIR: Optional[str] = None
+    DDOT_HEADLESS: Optional[bool] = None
+    DDOT_METRICS_FILE: Optional[str] = None
+    DDOT_MAX_WORKERS: int = 1
+    DDOT_SLOTS: Dict[str, int] = {}
+    DDOT_DIGEST_ALGORITHM: str = "sha256"
 
 
 settings = Settings()
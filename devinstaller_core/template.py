@@ -0,0 +1,164 @@
+"""Compiled templates for replacing the constants in the instructions
+
+The instructions use the `str.format` syntax, like `mkdir {home}/bin`. Each
+template is parsed only once and the parsed form is shared by every module
+using the same instruction.
+"""
+import string
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from typeguard import typechecked
+
+from devinstaller_core import exception as e
+from devinstaller_core import utilities as u
+
+TEMPLATE_FIELDS = ["inits", "install_inst", "configs", "commands", "uninstall_inst"]
+"""Fields of the modules whose instructions are templates
+"""
+
+_formatter = string.Formatter()
+
+_lock = threading.Lock()
+
+
+class Template:
+    """A parsed instruction template
+
+    Args:
+        source: The template string
+
+    Attributes:
+        parts: The literal text and the replacement field of each part
+        keys: The names of the constants used by the template
+    """
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        self.parts: List[Tuple[str, Optional[str], str, Optional[str]]] = []
+        self.keys: Set[str] = set()
+        for literal, field_name, format_spec, conversion in _formatter.parse(source):
+            self.parts.append((literal, field_name, format_spec or "", conversion))
+            if field_name is not None:
+                self.keys.add(get_key(field_name))
+            for nested in _formatter.parse(format_spec or ""):
+                if nested[1] is not None:
+                    self.keys.add(get_key(nested[1]))
+
+    def missing(self, constants: Dict[str, Any]) -> Set[str]:
+        """Returns the keys used by the template which are not in the constants"""
+        return {i for i in self.keys if i not in constants}
+
+    def render(self, constants: Dict[str, Any]) -> str:
+        """Returns the template with all the constants replaced
+
+        Raises:
+            SpecificationError
+                with error code :ref:`error-code-S103`
+        """
+        missing = self.missing(constants)
+        if missing:
+            raise missing_constants_error({self.source: missing})
+        if not self.keys:
+            return "".join(literal for literal, *_ in self.parts)
+        result: List[str] = []
+        for literal, field_name, format_spec, conversion in self.parts:
+            result.append(literal)
+            if field_name is None:
+                continue
+            if field_name in constants and not format_spec and conversion is None:
+                result.append(str(constants[field_name]))
+                continue
+            value, _ = _formatter.get_field(field_name, (), constants)
+            value = _formatter.convert_field(value, conversion)
+            spec = _formatter.vformat(format_spec, (), constants)
+            result.append(_formatter.format_field(value, spec))
+        return "".join(result)
+
+
+def get_key(field_name: str) -> str:
+    """Returns the name of the constant used by the replacement field, like
+    `user` for `{user.name}`
+    """
+    for index, char in enumerate(field_name):
+        if char in ".[":
+            return field_name[:index]
+    return field_name
+
+
+MAX_TEMPLATES = 4096
+"""The maximum number of compiled templates kept in `templates`
+"""
+
+templates = u.LRUCache(MAX_TEMPLATES)
+"""The compiled templates with the template string as the key
+"""
+
+
+@typechecked
+def get_template(source: str) -> Template:
+    """Returns the compiled template, compiling it on the first use"""
+    template = templates.get(source)
+    if template is None:
+        template = Template(source)
+        with _lock:
+            templates[source] = template
+    return template
+
+
+@typechecked
+def render(source: str, constants: Dict[str, Any]) -> str:
+    """Replace the constants in the template string
+
+    Raises:
+        SpecificationError
+            with error code :ref:`error-code-S103`
+    """
+    return get_template(source).render(constants)
+
+
+@typechecked
+def get_sources(module: Dict[str, Any]) -> List[str]:
+    """Returns all the templates in the instructions of the module object"""
+    sources: List[str] = []
+    for field_name in TEMPLATE_FIELDS:
+        for inst in module.get(field_name) or []:
+            if isinstance(inst, str):
+                sources.append(inst)
+                continue
+            for key in ["cmd", "rollback"]:
+                value = (
+                    inst.get(key)
+                    if isinstance(inst, dict)
+                    else getattr(inst, key, None)
+                )
+                if value is not None:
+                    sources.append(value)
+    return sources
+
+
+@typechecked
+def find_missing(module: Dict[str, Any], constants: Dict[str, Any]) -> Set[str]:
+    """Returns the constants used by the instructions of the module object
+    which are not declared
+    """
+    missing: Set[str] = set()
+    for source in get_sources(module):
+        missing |= get_template(source).missing(constants)
+    return missing
+
+
+@typechecked
+def missing_constants_error(missing: Dict[str, Set[str]]) -> e.SpecificationError:
+    """Returns the error listing the missing constants of every module or
+    template
+
+    Args:
+        missing: The missing constants with the module or template as the key
+    """
+    error = "; ".join(f"{k}: {', '.join(sorted(v))}" for k, v in missing.items())
+    return e.SpecificationError(
+        error=error,
+        error_code="S103",
+        message="The instructions use constants which are not declared.",
+    )
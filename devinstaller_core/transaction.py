@@ -0,0 +1,316 @@
+"""Journal of the filesystem changes made by the modules, used for rolling them back
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+from typing import Any, Callable, Dict, List, Optional, TextIO
+
+from typeguard import typechecked
+
+from devinstaller_core import events as ev
+from devinstaller_core import settings as s
+from devinstaller_core import utilities as u
+
+FICLONE = 0x40049409
+"""The `ioctl` request code used for cloning a file on Linux (reflink)
+"""
+
+PRESERVE_METHODS = ["link", "clone", "metadata"]
+"""Methods allowed for preserving a target before it is modified
+
+Values allowed:
+    1. `link`: The target is hardlinked. Use this if the target is going to be
+       replaced (new inode) instead of modified in place.
+    2. `clone`: The target is reflinked if the filesystem supports it else
+       copied. Use this if the target is going to be modified in place.
+    3. `metadata`: Only the mode and the ownership of the target is preserved.
+"""
+
+
+class FileTransaction:
+    """Journal of all the targets created or overwritten by the modules.
+
+    Before a module modifies a target it takes a snapshot of it. If the target
+    didn't exist then only the fact that the module created it is recorded.
+    Otherwise the target is preserved in the backup directory, using a
+    hardlink or a reflink wherever possible so that no data is copied.
+
+    Rolling back a module restores every target it has touched in the reverse
+    order, each restore being a single atomic rename. The journal is kept on
+    the disk so the changes can be rolled back even in a later run, for
+    example while uninstalling the orphan modules.
+
+    Once a run succeeds the entries of its modules are released, so only the
+    modules still needing a rollback, like the orphan modules, keep their
+    backups. The manifest is compacted when it is loaded.
+
+    Args:
+        journal_dir: The directory where the journal and the backups are stored
+
+    Attributes:
+        entries: The snapshots taken by each module in the order they are taken
+        run_aliases: The modules which took a snapshot in the current run, in
+            the order of their first snapshot
+    """
+
+    @typechecked
+    def __init__(self, journal_dir: str) -> None:
+        self.journal_dir = u.resolve_path(journal_dir)
+        self.backup_dir = os.path.join(self.journal_dir, "backups")
+        self.manifest_path = os.path.join(self.journal_dir, "manifest.jsonl")
+        self.entries: Dict[str, List[Dict[str, Any]]] = {}
+        self.run_aliases: List[str] = []
+        self._file: Optional[TextIO] = None
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        """Replay the manifest and restore the entries of the previous runs
+
+        If the manifest has records which are no longer needed, like the
+        released entries, it is rewritten with only the remaining entries.
+        """
+        if not os.path.isfile(self.manifest_path):
+            return None
+        count = 0
+        with open(self.manifest_path, "r") as _f:
+            for line in _f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                self.replay(record)
+                count += 1
+        if count > sum(len(i) for i in self.entries.values()):
+            self.compact()
+
+    def compact(self) -> None:
+        """Atomically rewrite the manifest with only the current entries"""
+        temp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as _f:
+            for alias, entries in self.entries.items():
+                for entry in entries:
+                    record = {"op": "snapshot", "module": alias, "entry": entry}
+                    _f.write(json.dumps(record) + "\n")
+            _f.flush()
+            os.fsync(_f.fileno())
+        os.replace(temp_path, self.manifest_path)
+
+    @typechecked
+    def replay(self, record: Dict[str, Any]) -> None:
+        """Apply a single manifest record to the entries
+
+        Args:
+            record: The manifest record
+        """
+        alias = record["module"]
+        if record["op"] == "snapshot":
+            self.entries.setdefault(alias, []).append(record["entry"])
+        elif record["op"] == "release":
+            self.entries.pop(alias, None)
+
+    def write(self, **record: Any) -> None:
+        """Append the record to the manifest
+
+        Args:
+            record: The data to be recorded
+        """
+        with self._lock:
+            if self._file is None:
+                os.makedirs(self.backup_dir, exist_ok=True)
+                self._file = open(self.manifest_path, "a")
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+            self.replay(record)
+
+    def close(self) -> None:
+        """Sync and close the manifest"""
+        if self._file is not None:
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+
+    @typechecked
+    def snapshot(self, alias: str, target: str, preserve: str = "link") -> None:
+        """Take a snapshot of the target before it is modified by the module.
+
+        Only the first snapshot of a target is kept, so the backup is always
+        the state of the target before any module touched it.
+
+        Args:
+            alias: The alias of the module which is going to modify the target
+            target: The full path of the target
+            preserve: The method used to preserve the target. One of
+                :data:`PRESERVE_METHODS`
+        """
+        for entry in self.entries.get(alias, []):
+            if entry["target"] == target:
+                return None
+        if alias not in self.run_aliases:
+            self.run_aliases.append(alias)
+        entry: Dict[str, Any] = {"target": target, "backup": None, "stat": None}
+        if os.path.lexists(target):
+            stat = os.lstat(target)
+            entry["stat"] = [stat.st_mode, stat.st_uid, stat.st_gid]
+            if preserve != "metadata":
+                os.makedirs(self.backup_dir, exist_ok=True)
+                key = hashlib.sha256(f"{alias}:{target}".encode("utf-8")).hexdigest()
+                backup = os.path.join(self.backup_dir, key)
+                if preserve == "clone":
+                    clone_file(target, backup)
+                else:
+                    os.link(target, backup, follow_symlinks=False)
+                entry["backup"] = backup
+        self.write(op="snapshot", module=alias, entry=entry)
+
+    @typechecked
+    def rollback(self, alias: str) -> bool:
+        """Restore all the targets touched by the module
+
+        A target which can't be restored, like a folder created by the module
+        which has files in it, is reported using the
+        :class:`~devinstaller_core.events.RestoreFailed` event and left as is,
+        while the remaining targets are still restored.
+
+        Args:
+            alias: The alias of the module
+
+        Returns:
+            False if there was nothing recorded for the module else True
+        """
+        entries = self.entries.get(alias)
+        if entries is None:
+            return False
+        for entry in reversed(entries):
+            try:
+                restore_entry(entry)
+            except OSError as err:
+                ev.publish(
+                    ev.RestoreFailed(
+                        module=alias, target=entry["target"], error=str(err)
+                    )
+                )
+        self.write(op="release", module=alias)
+        return True
+
+    @typechecked
+    def rollback_all(self, aliases: Optional[List[str]] = None) -> None:
+        """Rollback all the given modules in the reverse order of their snapshots
+
+        Args:
+            aliases: The modules to be rolled back. Defaults to every module in
+                the journal.
+        """
+        if aliases is None:
+            aliases = list(self.entries.keys())
+        for alias in reversed(aliases):
+            self.rollback(alias)
+
+    @typechecked
+    def release(self, alias: str) -> None:
+        """Forget the snapshots of the module and remove its backups.
+
+        Use this once the changes made by the module no longer needs to be
+        rolled back.
+
+        Args:
+            alias: The alias of the module
+        """
+        for entry in self.entries.get(alias, []):
+            if entry["backup"] is not None and os.path.lexists(entry["backup"]):
+                os.unlink(entry["backup"])
+        self.write(op="release", module=alias)
+
+
+@typechecked
+def restore_entry(entry: Dict[str, Any]) -> None:
+    """Restore the target of a single journal entry
+
+    Args:
+        entry: The journal entry
+    """
+    target = entry["target"]
+    backup = entry["backup"]
+    stat = entry["stat"]
+    if backup is not None:
+        os.replace(backup, target)
+    elif stat is None:
+        if os.path.isdir(target) and not os.path.islink(target):
+            os.rmdir(target)
+        elif os.path.lexists(target):
+            os.unlink(target)
+    if stat is not None and not os.path.islink(target):
+        os.chmod(target, stat[0])
+        if (stat[1], stat[2]) != (os.stat(target).st_uid, os.stat(target).st_gid):
+            os.chown(target, stat[1], stat[2])
+
+
+@typechecked
+def clone_file(source: str, dest: str) -> None:
+    """Clone the file using a reflink, falling back to a copy if the
+    filesystem doesn't support it
+
+    Args:
+        source: Path to the source file
+        dest: Path to the clone
+    """
+    try:
+        import fcntl
+
+        with open(source, "rb") as _s, open(dest, "wb") as _d:
+            fcntl.ioctl(_d.fileno(), FICLONE, _s.fileno())
+        shutil.copystat(source, dest)
+    except (ImportError, OSError):
+        shutil.copy2(source, dest, follow_symlinks=False)
+
+
+@typechecked
+def get_transaction() -> FileTransaction:
+    """Get the filesystem transaction journal stored in the `DDOT_STATE_DIR`
+    directory with the entries of the previous runs restored.
+
+    Returns:
+        The transaction object
+    """
+    journal_dir = os.path.join(s.settings.DDOT_STATE_DIR, "transaction")
+    transaction = FileTransaction(journal_dir)
+    transaction.load()
+    return transaction
+
+
+@typechecked
+def replace_file(
+    file_path: str, content: str, on_write: Optional[Callable[[int], None]] = None
+) -> None:
+    """Write the content into a new file and atomically replace the target
+    with it.
+
+    The target is never modified in place so a hardlink taken as its snapshot
+    keeps the old contents. The owner, the group and the mode of the target
+    are carried over to the new file.
+
+    Args:
+        file_path: Path to the target
+        content: The contents of the new file
+        on_write: Called with the file descriptor of the new file once the
+            content is written, before it replaces the target
+    """
+    temp_path = f"{file_path}.{os.getpid()}.tmp"
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        with os.fdopen(fd, "w") as _f:
+            _f.write(content)
+            _f.flush()
+            if os.path.exists(file_path):
+                stat = os.stat(file_path)
+                if (stat.st_uid, stat.st_gid) != (os.getuid(), os.getgid()):
+                    os.fchown(_f.fileno(), stat.st_uid, stat.st_gid)
+                shutil.copymode(file_path, temp_path)
+            if on_write is not None:
+                on_write(_f.fileno())
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.lexists(temp_path):
+            os.unlink(temp_path)
+        raise
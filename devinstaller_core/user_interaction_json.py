@@ -0,0 +1,159 @@
+"""Headless user interaction which writes JSON lines instead of rich text
+
+It is used when the stdout is not a TTY, like in the CI or the fleet runs.
+Every line written to the stdout is a JSON object with the `event` name and the
+time `ts`. Prompts are answered using the selection policy instead of waiting
+for the user.
+"""
+import contextlib
+import itertools
+import json
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from rich.markup import render
+from typeguard import typechecked
+
+from devinstaller_core import extension as ex
+from devinstaller_core import policy as pl
+
+_lock = threading.Lock()
+
+
+def emit(event: str, **fields: Any) -> None:
+    """Write the event as a single JSON line to the stdout"""
+    line = json.dumps(
+        dict(event=event, ts=round(time.time(), 6), **fields),
+        separators=(",", ":"),
+        default=str,
+    )
+    with _lock:
+        sys.stdout.write(line + "\n")
+        sys.stdout.flush()
+
+
+def plain_text(obj: Any) -> str:
+    """Returns the text of the object without the rich markup"""
+    if isinstance(obj, str):
+        try:
+            return render(obj).plain
+        except Exception:
+            return obj
+    return str(obj)
+
+
+def get_policy() -> pl.SelectionPolicy:
+    """Returns the current selection policy, which never asks the user"""
+    return pl.SelectionPolicy(rules=pl.get_policy().rules, interactive=False)
+
+
+class Tracker:
+    """Replacement for the `rich` progress bar which emits the progress of
+    the tasks as events
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        self.ids = itertools.count()
+        self.tasks: Dict[int, Dict[str, Any]] = {}
+
+    def __enter__(self) -> "Tracker":
+        return self
+
+    def __exit__(self, *args) -> None:
+        return None
+
+    def add_task(
+        self, description: str, total: Optional[float] = None, **kwargs
+    ) -> int:
+        """Start a new task"""
+        task_id = next(self.ids)
+        self.tasks[task_id] = {
+            "description": description,
+            "total": total,
+            "completed": 0,
+            "start": time.monotonic(),
+        }
+        emit("task_started", task=task_id, description=description, total=total)
+        return task_id
+
+    def update(self, task_id: int, advance: float = 0, **kwargs) -> None:
+        """Update the progress of the task"""
+        task = self.tasks[task_id]
+        task["completed"] += advance
+        emit(
+            "task_updated",
+            task=task_id,
+            completed=task["completed"],
+            total=task["total"],
+        )
+
+    def remove_task(self, task_id: int) -> None:
+        """Stop the task"""
+        task = self.tasks.pop(task_id)
+        duration = time.monotonic() - task["start"]
+        emit("task_removed", task=task_id, duration=round(duration, 6))
+
+
+class ExtUserInteraction(ex.ExtUserInteraction):
+    """User interaction for the runs where no one is watching.
+
+    Selections are made using the `prompt` rule of the selection policy and the
+    confirmations using the `confirm` rule. If the policy has no rule for it,
+    the prompt fails instead of blocking.
+    """
+
+    @typechecked
+    def confirm(self, title: str) -> bool:
+        response = get_policy().confirm()
+        emit("prompt", kind="confirm", title=title, response=response)
+        return bool(response)
+
+    @typechecked
+    def select(self, title: str, choices) -> str:
+        choices = list(choices)
+        index = get_policy().select("prompt", choices)
+        assert index is not None
+        emit("prompt", kind="select", title=title, response=choices[index])
+        return choices[index]
+
+    @typechecked
+    def checkbox(self, title: str, choices) -> List[str]:
+        """Select all the choices in the `prefer` list of the `prompt` rule or a
+        single choice for the other rules
+        """
+        choices = list(choices)
+        rule = get_policy().get_rule("prompt") or ""
+        if rule.startswith("prefer:"):
+            names = [i.strip() for i in rule[len("prefer:") :].split(",")]
+            response = [i for i in choices if i in names]
+        else:
+            index = get_policy().select("prompt", choices)
+            assert index is not None
+            response = [choices[index]]
+        emit("prompt", kind="checkbox", title=title, response=response)
+        return response
+
+    def print(self, *args, **kwargs) -> None:
+        emit("message", text=" ".join(plain_text(i) for i in args))
+
+    @contextlib.contextmanager
+    def status(self, *args, **kwargs) -> Iterator[None]:
+        text = " ".join(plain_text(i) for i in args)
+        emit("status_started", text=text)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            emit(
+                "status_finished",
+                text=text,
+                duration=round(time.monotonic() - start, 6),
+            )
+
+    def track(self, *args, **kwargs) -> Tracker:
+        return Tracker(*args, **kwargs)
+
+    def event(self, event: Any) -> None:
+        emit(event.name, **event.fields())
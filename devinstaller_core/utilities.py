@@ -1,11 +1,16 @@
+import collections
 import os
+import sys
+import threading
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional
 
 from typeguard import typechecked
 
 from devinstaller_core import constants as c
+from devinstaller_core import events as ev
 from devinstaller_core import extension as ex
+from devinstaller_core import settings as s
 
 
 class UserInteraction(ex.BaseExtension[ex.ExtUserInteraction]):
@@ -14,6 +19,8 @@ class UserInteraction(ex.BaseExtension[ex.ExtUserInteraction]):
     def __init__(self) -> None:
         ext_class = c.UserInteraction.EXTENSION_CLASS
         builtin_extensions = c.UserInteraction.BUILTIN_EXTENSIONS
+        if is_headless():
+            builtin_extensions = c.UserInteraction.HEADLESS_EXTENSIONS
         super().__init__(builtin_extensions=builtin_extensions, ext_class=ext_class)
         abs_methods = getattr(ex.ExtUserInteraction, "__abstractmethods__")
         for method in list(abs_methods):
@@ -43,8 +50,25 @@ class UserInteraction(ex.BaseExtension[ex.ExtUserInteraction]):
         """Track the progress of a list of tasks
         """
 
+    def event(self, event: Any) -> None:
+        """Report an event from the event bus"""
+        self.return_object.event(event)
+
+
+def is_headless() -> bool:
+    """Check if the headless user interaction should be used.
+
+    Uses `DDOT_HEADLESS` if it is set, otherwise headless is used when the
+    stdout is not a TTY.
+    """
+    headless = s.settings.DDOT_HEADLESS
+    if headless is None:
+        return not sys.stdout.isatty()
+    return headless
+
 
 ui = UserInteraction()
+ev.bus.subscribe(ui.event)
 
 
 class Dictionary:
@@ -70,6 +94,53 @@ class Dictionary:
         return new_dictionary
 
 
+class LRUCache(collections.OrderedDict):
+    """Dictionary keeping only the most recently used items.
+
+    Reading or writing an item marks it as the most recently used. Once there
+    are more than `maxsize` items the least recently used ones are evicted.
+    The cache can be shared between threads.
+
+    Args:
+        maxsize: The maximum number of items kept
+        on_evict: Called with the key and the value of every evicted item
+    """
+
+    def __init__(
+        self, maxsize: int, on_evict: Optional[Callable[[Any, Any], None]] = None
+    ) -> None:
+        super().__init__()
+        self.maxsize = maxsize
+        self.on_evict = on_evict
+        self._lock = threading.RLock()
+
+    def __getitem__(self, key: Any) -> Any:
+        with self._lock:
+            value = super().__getitem__(key)
+            self.move_to_end(key)
+            return value
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        with self._lock:
+            super().__setitem__(key, value)
+            self.move_to_end(key)
+            while len(self) > self.maxsize:
+                old_key = next(iter(self))
+                old_value = super().__getitem__(old_key)
+                del self[old_key]
+                if self.on_evict is not None:
+                    self.on_evict(old_key, old_value)
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Returns the item marking it as the most recently used, or the
+        default if the key is not in the cache
+        """
+        with self._lock:
+            if key not in self:
+                return default
+            return self[key]
+
+
 class Compare:
     """All the methods you need to compare stuffs."""
 
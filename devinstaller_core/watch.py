@@ -0,0 +1,366 @@
+"""Watch mode which re-applies only the modules changed in the spec
+"""
+import ctypes
+import ctypes.util
+import dataclasses
+import json
+import os
+import select
+import struct
+import time
+from typing import Dict, List, Optional, Set
+
+from typeguard import typechecked
+
+from devinstaller_core import dependency_graph as dg
+from devinstaller_core import events as ev
+from devinstaller_core import file_manager as f
+from devinstaller_core import include as inc
+from devinstaller_core import lib
+from devinstaller_core import utilities as u
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+"""Events on the directories which means a file in it has changed
+"""
+
+EVENT_HEADER = struct.Struct("iIII")
+"""Layout of the `inotify_event` struct without the name
+"""
+
+DEBOUNCE = 0.05
+"""Time in seconds to wait for more events after the first one, since editors
+usually write a file in multiple steps
+"""
+
+
+class PollingWatcher:
+    """Watches the files by checking their modification time.
+
+    Used where inotify is not available.
+
+    Args:
+        paths: The full paths of the files to watch
+
+    Attributes:
+        overflowed: True if some of the changes may have been missed, in
+            which case everything has to be applied again
+    """
+
+    @typechecked
+    def __init__(self, paths: List[str]) -> None:
+        self.paths: List[str] = []
+        self.mtimes: Dict[str, float] = {}
+        self.overflowed = False
+        self.set_paths(paths)
+
+    @typechecked
+    def set_paths(self, paths: List[str]) -> None:
+        """Change the files being watched.
+
+        The files which were already watched keep their state, so a change
+        made while the paths are updated is not missed.
+        """
+        self.paths = paths
+        mtimes = self.get_mtimes()
+        self.mtimes = {i: self.mtimes.get(i, mtimes[i]) for i in paths}
+
+    def get_mtimes(self) -> Dict[str, float]:
+        """Returns the modification time of each of the files"""
+        mtimes: Dict[str, float] = {}
+        for path in self.paths:
+            try:
+                mtimes[path] = os.stat(path).st_mtime
+            except FileNotFoundError:
+                mtimes[path] = 0.0
+        return mtimes
+
+    @typechecked
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        """Wait until any of the files change
+
+        Args:
+            timeout: Maximum time to wait in seconds. Waits forever if None.
+
+        Returns:
+            The files which have changed. Empty if timed out.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while deadline is None or time.monotonic() < deadline:
+            mtimes = self.get_mtimes()
+            changed = {i for i in self.paths if mtimes[i] != self.mtimes[i]}
+            if changed:
+                self.mtimes = mtimes
+                return changed
+            time.sleep(0.2)
+        return set()
+
+    def close(self) -> None:
+        """Stop watching"""
+
+
+class InotifyWatcher(PollingWatcher):
+    """Watches the files using inotify.
+
+    The parent directories are watched instead of the files themselves, so the
+    files replaced using a rename, which is how most of the editors save, are
+    still tracked. If the event queue of the kernel overflows then every file
+    is reported as changed and :attr:`overflowed` is set.
+
+    Args:
+        paths: The full paths of the files to watch
+
+    Raises:
+        OSError
+            if inotify is not available
+    """
+
+    @typechecked
+    def __init__(self, paths: List[str]) -> None:
+        self.paths = []
+        self.overflowed = False
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs: Dict[int, str] = {}
+        try:
+            self.set_paths(paths)
+        except OSError:
+            os.close(self.fd)
+            raise
+
+    @typechecked
+    def set_paths(self, paths: List[str]) -> None:
+        """Change the files being watched, watching the new directories.
+
+        Raises:
+            OSError
+                if a directory couldn't be watched
+        """
+        self.paths = paths
+        watched = set(self.dirs.values())
+        for directory in {os.path.dirname(i) for i in paths} - watched:
+            wd = self.libc.inotify_add_watch(
+                self.fd, directory.encode("utf-8"), WATCH_MASK
+            )
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"Couldn't watch {directory}")
+            self.dirs[wd] = directory
+
+    def read_events(self, timeout: Optional[float]) -> Set[str]:
+        """Returns the paths of the files which had any event"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        data = os.read(self.fd, 64 * 1024)
+        changed: Set[str] = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset : offset + length].rstrip(b"\0").decode("utf-8")
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                self.overflowed = True
+                changed.update(self.paths)
+                continue
+            directory = self.dirs.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                del self.dirs[wd]
+                continue
+            changed.add(os.path.join(directory, name))
+        return changed
+
+    @typechecked
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return set()
+            changed = self.read_events(remaining)
+            if not changed:
+                continue
+            changed.update(self.read_events(DEBOUNCE))
+            changed.intersection_update(self.paths)
+            if changed:
+                return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+@typechecked
+def get_watcher(paths: List[str]) -> PollingWatcher:
+    """Returns an inotify watcher, falling back to polling if inotify is not
+    available on the current platform
+    """
+    try:
+        return InotifyWatcher(paths)
+    except (OSError, AttributeError, TypeError):
+        return PollingWatcher(paths)
+
+
+@typechecked
+def fingerprint(module: dg.TypeAnyModule) -> str:
+    """Returns the fingerprint of the module.
+
+    It changes if anything in the module, after the constants are substituted,
+    changes. The `status` of the module is not part of the fingerprint.
+    """
+    fields = dataclasses.asdict(module)
+    fields.pop("status", None)
+    fields["module_type"] = dg.get_module_type(module)
+    data = json.dumps(fields, sort_keys=True, default=str)
+    return f.FileManager.hash_data(data)
+
+
+@typechecked
+def changed_modules(
+    old_graph: dg.DependencyGraph, new_graph: dg.DependencyGraph
+) -> Set[str]:
+    """Returns the modules which are new or different in the `new_graph`"""
+    changed: Set[str] = set()
+    for name, module in new_graph.graph.items():
+        old_module = old_graph.graph.get(name)
+        if old_module is None or fingerprint(old_module) != fingerprint(module):
+            changed.add(name)
+    return changed
+
+
+@typechecked
+def dependents(
+    dependency_graph: dg.DependencyGraph, module_names: Set[str]
+) -> Set[str]:
+    """Returns the given modules along with all the modules which require them,
+    directly or indirectly
+    """
+    required_by: Dict[str, Set[str]] = {}
+    for name, module in dependency_graph.graph.items():
+        for child_name in getattr(module, "requires", None) or []:
+            required_by.setdefault(child_name, set()).add(name)
+    result = set(module_names)
+    stack = list(module_names)
+    while stack:
+        for parent_name in required_by.get(stack.pop(), set()):
+            if parent_name not in result:
+                result.add(parent_name)
+                stack.append(parent_name)
+    return result
+
+
+@typechecked
+def reinstall_changed(
+    old_graph: dg.DependencyGraph,
+    new_graph: dg.DependencyGraph,
+    requirement_list: List[str],
+    changed: Optional[Set[str]] = None,
+) -> Set[str]:
+    """Install only the changed modules and their dependents from the new graph.
+
+    The `status` of every other module is carried over from the old graph, so
+    the traversal skips them.
+
+    Args:
+        old_graph: The graph which was installed last
+        new_graph: The graph created from the changed spec
+        requirement_list: The list of modules to be installed
+        changed: The modules to be installed again. Defaults to the
+            modules which are new or different in the `new_graph`.
+
+    Returns:
+        The modules which were installed again
+    """
+    if changed is None:
+        changed = changed_modules(old_graph, new_graph)
+    affected = dependents(new_graph, changed)
+    affected.intersection_update(new_graph.install_order(requirement_list))
+    for name, module in new_graph.graph.items():
+        if name not in affected and name in old_graph.graph:
+            module.status = old_graph.graph[name].status
+    new_graph.orphan_modules = set(old_graph.orphan_modules)
+    new_graph.install(requirement_list)
+    return affected
+
+
+@typechecked
+def watch_paths(spec: str, dependency_graph: dg.DependencyGraph) -> List[str]:
+    """Returns the full paths of the spec file, the local spec files included
+    by it and the local files used by the modules
+    """
+    paths: List[str] = []
+    res = f.DevFileManager.check_path(spec)
+    if res.method == "file":
+        paths.append(u.resolve_path(res.path))
+        paths += [u.resolve_path(i) for i in inc.resolve_file(spec).paths]
+    for module in dependency_graph.graph.values():
+        source: Optional[str] = getattr(module, "source", None)
+        if source is not None:
+            paths.append(u.resolve_path(source))
+    return sorted(set(paths))
+
+
+@typechecked
+def watch(
+    spec: str,
+    platform_codename: Optional[str] = None,
+    interface_name: Optional[str] = None,
+    requirement_list: Optional[List[str]] = None,
+) -> None:
+    """Install the modules and keep re-applying the changed modules whenever
+    the spec file or the files used by the modules change, until interrupted.
+
+    A single watcher is used for the whole session, so the changes made while
+    the modules are installed are not missed. If the watcher missed some of
+    the changes then every module is applied again.
+
+    Args:
+        spec: The path to the spec file. Follows the spec format.
+        platform_codename: The codename of the platform
+        interface_name: The name of the interface
+        requirement_list: The list of modules to be installed. Defaults to all
+            the modules.
+    """
+
+    def create_graph() -> dg.DependencyGraph:
+        return lib.create_dependency_graph(
+            schema_object=lib.core(file_path=spec),
+            platform_codename=platform_codename,
+            interface_name=interface_name,
+        )
+
+    graph = create_graph()
+    watcher = get_watcher(watch_paths(spec, graph))
+    try:
+        requirements = requirement_list or list(graph.graph.keys())
+        graph.install(requirements)
+        while True:
+            watcher.wait()
+            try:
+                new_graph = create_graph()
+            except Exception as err:
+                ev.publish(ev.WatchFailed(error=str(err)))
+                continue
+            changed = set(new_graph.graph.keys()) if watcher.overflowed else None
+            watcher.overflowed = False
+            requirements = requirement_list or list(new_graph.graph.keys())
+            start = time.monotonic()
+            affected = reinstall_changed(graph, new_graph, requirements, changed)
+            ev.publish(
+                ev.WatchApplied(
+                    modules=sorted(affected), seconds=time.monotonic() - start
+                )
+            )
+            graph = new_graph
+            watcher.set_paths(watch_paths(spec, graph))
+    finally:
+        watcher.close()
@@ -0,0 +1,38 @@
+from benchmarks import generator as g
+from benchmarks import memory as mb
+from benchmarks import runner as r
+from benchmarks import scheduling as sb
+from devinstaller_core import schema as s
+
+
+class TestBenchmarks:
+    def test_generate(self):
+        shape = g.Shape(modules=20, depth=4, fan_out=2, constants_depth=3)
+        spec = g.generate(shape)
+        document = s.get_validated_document(spec)
+        assert len(document["modules"]) == 20
+        assert len(document["constants"]) == 3
+        assert all(len(i.get("requires", [])) <= 2 for i in document["modules"])
+
+    def test_run(self, tmp_path):
+        results = r.run([g.Shape(modules=5, depth=2)], repeat=1)
+        phases = results["results"]["m5-d2-f3-c3-p2"]
+        assert set(phases) == {
+            "parse",
+            "validate",
+            "graph",
+            "patch_constants",
+            "traverse",
+        }
+        r.save(results, results_dir=str(tmp_path))
+        old = r.load(results["commit"], results_dir=str(tmp_path))
+        assert r.compare(old, results)["m5-d2-f3-c3-p2"]["parse"] == 1.0
+
+    def test_scheduling(self):
+        result = sb.benchmark_shape(g.Shape(modules=30, depth=3, fan_out=2), workers=4)
+        assert result["lower_bound"] <= result["critical_path"] <= result["fifo"]
+
+    def test_memory(self):
+        results = mb.run(size=20)
+        assert set(results) == {"read", "mmap", "mmap_cached"}
+        assert results["mmap_cached"] < results["read"]
@@ -0,0 +1,97 @@
+import pytest
+
+from devinstaller_core import block_platform as bp
+from devinstaller_core import checkpoint as cp
+from devinstaller_core import dependency_graph as dg
+
+
+@pytest.fixture
+def journal_path(tmp_path):
+    return str(tmp_path / "runs" / "test.journal")
+
+
+@pytest.fixture
+def schema_object():
+    return {
+        "modules": [
+            {
+                "name": "foo",
+                "module_type": "phony",
+                "commands": [{"cmd": "py: 1"}, {"cmd": "py: 2"}, {"cmd": "py: 3"}],
+            },
+            {"name": "bar", "module_type": "phony", "commands": [{"cmd": "py: 4"}]},
+            {"name": "baz", "module_type": "group", "requires": ["bar", "foo"]},
+        ]
+    }
+
+
+@pytest.fixture
+def mocked_run(mocker):
+    return mocker.patch("devinstaller_core.module_base.session.run")
+
+
+class TestCheckpoint:
+    def test_replay(self, journal_path):
+        obj = cp.Checkpoint(journal_path)
+        obj.module_started("foo")
+        obj.instruction_finished("foo", 0)
+        obj.instruction_finished("foo", 1)
+        obj.module_started("bar")
+        obj.module_finished("bar", "failed", {"baz"})
+        obj.close()
+        new_obj = cp.Checkpoint(journal_path)
+        new_obj.load()
+        assert new_obj.statuses == {"foo": "in progress", "bar": "failed"}
+        assert new_obj.completed_steps("foo") == 2
+        assert new_obj.completed_steps("bar") == 0
+        assert new_obj.orphan_modules == {"baz"}
+
+    def test_truncated_entry(self, journal_path):
+        obj = cp.Checkpoint(journal_path)
+        obj.module_started("foo")
+        obj.close()
+        with open(journal_path, "a") as _f:
+            _f.write('{"event": "module_fini')
+        new_obj = cp.Checkpoint(journal_path)
+        new_obj.load()
+        assert new_obj.statuses == {"foo": "in progress"}
+
+    def test_clear(self, journal_path):
+        obj = cp.Checkpoint(journal_path)
+        obj.module_started("foo")
+        obj.clear()
+        new_obj = cp.Checkpoint(journal_path)
+        new_obj.load()
+        assert new_obj.statuses == {}
+
+
+class TestResume:
+    def test_resume(self, journal_path, schema_object, mocked_run):
+        previous = cp.Checkpoint(journal_path)
+        previous.module_started("bar")
+        previous.instruction_finished("bar", 0)
+        previous.module_finished("bar", "success", set())
+        previous.module_started("foo")
+        previous.instruction_finished("foo", 0)
+        previous.close()
+        checkpoint = cp.Checkpoint(journal_path)
+        checkpoint.load()
+        graph = dg.DependencyGraph(
+            schema_object=schema_object, platform_object=bp.BlockPlatform()
+        )
+        graph.install(["baz"], checkpoint=checkpoint)
+        commands = [call.args[0] for call in mocked_run.call_args_list]
+        assert commands == ["py: 2", "py: 3"]
+        assert graph.graph["bar"].status == "success"
+        assert graph.graph["foo"].status == "success"
+
+    def test_cleared_after_run(self, journal_path, schema_object, mocked_run):
+        checkpoint = cp.Checkpoint(journal_path)
+        graph = dg.DependencyGraph(
+            schema_object=schema_object, platform_object=bp.BlockPlatform()
+        )
+        graph.install(["baz"], checkpoint=checkpoint)
+        assert mocked_run.call_count == 4
+        new_obj = cp.Checkpoint(journal_path)
+        new_obj.load()
+        assert new_obj.statuses == {}
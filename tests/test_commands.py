@@ -32,13 +32,18 @@
 #   or other dealings in the software.
 # -----------------------------------------------------------------------------
 import shlex
+import types
 
 import pytest
 
 # from devinstaller_core import exception as e
 from devinstaller_core import command as c
 from devinstaller_core import command_python as cp
+from devinstaller_core import block_platform as bp
 from devinstaller_core import command_shell as cs
+from devinstaller_core import dependency_graph as dg
+from devinstaller_core import events as ev
+from devinstaller_core import exception as e
 from devinstaller_core import extension as ex
 
 # def test_command_run(fake_process):
@@ -77,3 +82,120 @@ class TestCommand:
         res = obj.parse("py: print('hi')")
         assert res.prog == "py"
         assert res.cmd == "print('hi')"
+
+
+class TestSessionProg:
+    def get_prog_module(self):
+        module = types.ModuleType("devfile_test")
+        exec("calls = []\ndef hook():\n    calls.append('hook')\n", module.__dict__)
+        return module
+
+    def test_launch(self):
+        module = self.get_prog_module()
+        loads = []
+        session = c.SessionProg(lambda: loads.append(1) or module)
+        assert session.launch("hook") >= 0
+        session.launch("hook")
+        assert module.calls == ["hook", "hook"]
+        assert loads == [1]
+        with pytest.raises(e.SpecificationError):
+            session.launch("missing")
+
+    def test_no_prog_file(self):
+        with pytest.raises(e.SpecificationError):
+            c.SessionProg().launch("hook")
+
+    def test_hooks(self):
+        module = self.get_prog_module()
+        graph = dg.DependencyGraph(
+            schema_object={
+                "modules": [
+                    {"name": "foo", "module_type": "group"},
+                    {"name": "bar", "module_type": "group"},
+                ]
+            },
+            platform_object=bp.BlockPlatform(),
+            before_each="hook",
+            after_each="hook",
+            load_prog=lambda: module,
+        )
+        received = []
+        ev.bus.subscribe(received.append)
+        try:
+            graph.install(["foo", "bar"])
+        finally:
+            ev.bus.unsubscribe(received.append)
+        assert module.calls == ["hook"] * 4
+        hooks = [(i.module, i.hook) for i in received if isinstance(i, ev.HookFinished)]
+        assert hooks == [
+            ("foo", "before"),
+            ("foo", "after"),
+            ("bar", "before"),
+            ("bar", "after"),
+        ]
+
+    def test_failed_hook(self):
+        module = types.ModuleType("devfile_test")
+        exec("def hook():\n    raise ValueError()\n", module.__dict__)
+        graph = dg.DependencyGraph(
+            schema_object={"modules": [{"name": "foo", "module_type": "group"}]},
+            platform_object=bp.BlockPlatform(),
+            before_each="hook",
+            load_prog=lambda: module,
+        )
+        graph.install(["foo"])
+        assert graph.graph["foo"].status == "failed"
+
+    def test_failed_after_hook(self, tmp_path):
+        module = types.ModuleType("devfile_test")
+        exec("def hook():\n    raise ValueError()\n", module.__dict__)
+        target = tmp_path / "installed"
+        graph = dg.DependencyGraph(
+            schema_object={
+                "modules": [
+                    {
+                        "name": "foo",
+                        "module_type": "app",
+                        "install_inst": [
+                            {"cmd": f"touch {target}", "rollback": f"rm {target}"}
+                        ],
+                    }
+                ]
+            },
+            platform_object=bp.BlockPlatform(),
+            after_each="hook",
+            load_prog=lambda: module,
+        )
+        received = []
+        ev.bus.subscribe(received.append)
+        try:
+            graph.install(["foo"])
+        finally:
+            ev.bus.unsubscribe(received.append)
+        assert graph.graph["foo"].status == "failed"
+        assert not target.exists()
+        rolled_back = [i for i in received if isinstance(i, ev.InstructionRolledBack)]
+        assert [i.rollback for i in rolled_back] == [f"rm {target}"]
+
+    @pytest.mark.parametrize("load_prog", [None, lambda: types.ModuleType("empty")])
+    def test_missing_hook(self, tmp_path, load_prog):
+        target = tmp_path / "installed"
+        graph = dg.DependencyGraph(
+            schema_object={
+                "modules": [
+                    {
+                        "name": "foo",
+                        "module_type": "app",
+                        "install_inst": [{"cmd": f"touch {target}"}],
+                    }
+                ]
+            },
+            platform_object=bp.BlockPlatform(),
+            after_each="hook",
+            load_prog=load_prog,
+        )
+        with pytest.raises(e.SpecificationError) as excinfo:
+            graph.install(["foo"])
+        assert excinfo.value.error_code == "S104"
+        assert graph.graph["foo"].status is None
+        assert not target.exists()
@@ -0,0 +1,58 @@
+import threading
+
+import pytest
+
+from devinstaller_core import daemon as d
+
+SPEC = "file: tests/data/test3.devfile.toml"
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    socket_path = str(tmp_path / "daemon.sock")
+    server = d.DaemonServer(socket_path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield socket_path
+    server.shutdown()
+    server.server_close()
+
+
+class TestDaemon:
+    def test_ping(self, socket_path):
+        assert d.request(socket_path, op="ping") == "pong"
+
+    def test_plan(self, socket_path):
+        plan = d.request(socket_path, op="plan", spec=SPEC, requirements=["m1"])
+        assert plan["order"] == ["m1"]
+        assert plan["modules"][0]["actions"][0]["cmd"] == "echo 'k1v1 k2v1 k3v1'"
+
+    def test_status(self, socket_path):
+        res = d.request(socket_path, op="status", spec=SPEC)
+        assert res["modules"] == {"m1": None, "m2": None, "m3": None, "m4": None}
+
+    def test_error(self, socket_path):
+        with pytest.raises(RuntimeError):
+            d.request(socket_path, op="foo", spec=SPEC)
+
+
+class TestCache:
+    def test_graph_reused(self):
+        obj = d.Daemon()
+        assert obj.get_graph(SPEC) is obj.get_graph(SPEC)
+
+    def test_exit(self, socket_path, mocker):
+        mocker.patch.object(d.Daemon, "handle", side_effect=SystemExit(1))
+        with pytest.raises(RuntimeError, match="status 1"):
+            d.request(socket_path, op="install", spec=SPEC)
+
+    def test_graph_replaced(self, tmp_path):
+        spec_path = tmp_path / "devfile.toml"
+        spec_path.write_text('version = "0.1"\n[[modules]]\nname = "foo"\n')
+        obj = d.Daemon()
+        first = obj.get_graph(f"file: {spec_path}")
+        spec_path.write_text('version = "0.1"\n[[modules]]\nname = "bar"\n')
+        second = obj.get_graph(f"file: {spec_path}")
+        assert first is not second
+        assert list(second.graph.keys()) == ["bar"]
+        assert len(obj.graphs) == 1
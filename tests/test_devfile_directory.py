@@ -0,0 +1,75 @@
+import pytest
+
+from devinstaller_core import devfile_directory as dd
+from devinstaller_core import exception as e
+from devinstaller_core import include as inc
+from devinstaller_core import lib
+
+
+@pytest.fixture
+def spec_dir(tmp_path):
+    directory = tmp_path / "devfile"
+    (directory / "modules").mkdir(parents=True)
+    (directory / "main.toml").write_text('version = "0.1"\n')
+    (directory / "modules" / "git.toml").write_text(
+        '[[modules]]\nname = "git"\nmodule_type = "app"\n'
+    )
+    (directory / "modules" / "vim.yml").write_text(
+        "modules:\n  - name: vim\n    requires: [git]\n"
+    )
+    (directory / "modules" / ".hidden.toml").write_text("not toml")
+    (directory / "README.md").write_text("not a spec")
+    return directory
+
+
+class TestDevfileDirectory:
+    def test_list_files(self, spec_dir):
+        assert dd.list_files(str(spec_dir)) == [
+            "main.toml",
+            "modules/git.toml",
+            "modules/vim.yml",
+        ]
+
+    def test_resolve(self, spec_dir):
+        resolved = inc.resolve_file(f"file: {spec_dir}")
+        assert resolved.validated
+        assert resolved.document["version"] == "0.1"
+        modules = resolved.document["modules"]
+        assert [i["name"] for i in modules] == ["git", "vim"]
+        assert modules[1]["module_type"] == "phony"
+        assert len(resolved.paths) == 3
+        document = lib.core(file_path=f"file: {spec_dir}")
+        assert [i["name"] for i in document["modules"]] == ["git", "vim"]
+
+    def test_incremental(self, spec_dir, mocker):
+        first = inc.resolve_file(f"file: {spec_dir}")
+        (spec_dir / "modules" / "git.toml").write_text(
+            '[[modules]]\nname = "git"\nmodule_type = "phony"\n'
+        )
+        validate = mocker.spy(dd.s, "get_validated_document")
+        second = inc.resolve_file(f"file: {spec_dir}")
+        assert validate.call_count == 1
+        assert second.digest != first.digest
+        assert second.document["modules"][0]["module_type"] == "phony"
+
+    def test_invalid(self, spec_dir):
+        (spec_dir / "modules" / "zsh.toml").write_text("[[modules]]\nmodule_type = 1\n")
+        with pytest.raises(e.SpecificationError) as excinfo:
+            inc.resolve_file(f"file: {spec_dir}")
+        assert excinfo.value.error.startswith("modules/zsh.toml: ")
+
+    def test_platform_modules(self, spec_dir):
+        (spec_dir / "macos").mkdir()
+        (spec_dir / "ubuntu").mkdir()
+        for platform in ["macos", "ubuntu"]:
+            (spec_dir / platform / "git.toml").write_text(
+                '[[modules]]\nname = "git"\nmodule_type = "app"\n'
+                f'supported_platforms = ["{platform}"]\n'
+            )
+        resolved = inc.resolve_file(f"file: {spec_dir}")
+        modules = [i for i in resolved.document["modules"] if i["name"] == "git"]
+        assert [i.get("supported_platforms") for i in modules] == [
+            ["macos"],
+            None,
+            ["ubuntu"],
+        ]
@@ -0,0 +1,66 @@
+from devinstaller_core import block_platform as bp
+from devinstaller_core import dependency_graph as dg
+from devinstaller_core import events as ev
+from devinstaller_core import settings as s
+from devinstaller_core import user_interaction as ui
+
+
+class TestEventBus:
+    def test_publish(self):
+        bus = ev.EventBus()
+        received = []
+        bus.subscribe(received.append)
+        bus.publish(ev.ModuleStarted(module="foo"))
+        bus.unsubscribe(received.append)
+        bus.publish(ev.ModuleStarted(module="bar"))
+        assert received == [ev.ModuleStarted(module="foo")]
+        assert received[0].name == "module_started"
+        assert received[0].fields() == {"module": "foo"}
+
+    def test_install_events(self):
+        received = []
+        ev.bus.subscribe(received.append)
+        schema_object = {
+            "modules": [
+                {
+                    "name": "foo",
+                    "module_type": "app",
+                    "install_inst": [{"cmd": "true"}],
+                },
+                {"name": "bar", "module_type": "group", "requires": ["foo"]},
+            ]
+        }
+        try:
+            graph = dg.DependencyGraph(
+                schema_object=schema_object, platform_object=bp.BlockPlatform()
+            )
+            graph.install(["bar"])
+        finally:
+            ev.bus.unsubscribe(received.append)
+        assert [i.name for i in received] == [
+            "module_started",
+            "install_started",
+            "instruction_started",
+            "instruction_finished",
+            "module_finished",
+            "module_started",
+            "module_finished",
+        ]
+
+
+class TestEventText:
+    def test_print(self, mocker):
+        obj = ui.ExtUserInteraction()
+        mocked_print = mocker.patch.object(obj, "print")
+        obj.event(ev.InstallStarted(module="foo", display="Foo"))
+        mocked_print.assert_called_once_with("Installing module: Foo...")
+
+    def test_skip_debug(self, mocker):
+        obj = ui.ExtUserInteraction()
+        mocked_print = mocker.patch.object(obj, "print")
+        event = ev.InstructionRolledBack(module="foo", cmd="a", rollback="b")
+        obj.event(event)
+        mocked_print.assert_not_called()
+        mocker.patch.object(s.settings, "DDOT_VERBOSE", True)
+        obj.event(event)
+        mocked_print.assert_called_once()
@@ -1,10 +1,15 @@
+import hashlib
+import mmap
 import os
 
 import pytest
 from hypothesis import given
 from hypothesis_fspaths import fspaths
 
+from devinstaller_core import digest as dg
+from devinstaller_core import exception as e
 from devinstaller_core import file_manager as f
+from devinstaller_core import settings as s
 
 HOME_DIR = "/foo/bar"
 CWD = "/foo/bar/baz"
@@ -76,6 +81,32 @@ class TestFileManager:
             == "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08"
         )
 
+    def test_hash_algorithm(self, mocker):
+        blake2b = hashlib.blake2b(b"test").hexdigest()
+        assert f.FileManager.hash_data("test", algorithm="blake2b") == blake2b
+        mocker.patch.object(s.settings, "DDOT_DIGEST_ALGORITHM", "blake2b")
+        assert f.FileManager.hash_data("test") == blake2b
+        with pytest.raises(e.DevinstallerError):
+            f.FileManager.hash_data("test", algorithm="md5")
+
+    def test_read_digest(self, tmp_path, mocker):
+        mocker.patch.object(dg, "CHUNK_SIZE", 3)
+        path = tmp_path / "test.toml"
+        path.write_text('name = "café"\n' * 10, encoding="utf-8")
+        contents, digest = f.FileManager.read_digest(str(path))
+        assert contents == path.read_text(encoding="utf-8")
+        assert digest == f.FileManager.hash_data(contents)
+
+    def test_read_digest_mapped(self, tmp_path, mocker):
+        path = tmp_path / "test.toml"
+        path.write_text('name = "café"\n' * 1000, encoding="utf-8")
+        expected = f.FileManager.read_digest(str(path))
+        mocker.patch.object(f, "MMAP_THRESHOLD", 1)
+        mocker.patch.object(dg, "CHUNK_SIZE", 3)
+        with f.FileManager.open_buffer(str(path)) as buffer:
+            assert isinstance(buffer, mmap.mmap)
+        assert f.FileManager.read_digest(str(path)) == expected
+
 
 @pytest.mark.xfail
 class TestDevfileManager:
@@ -0,0 +1,111 @@
+import os
+
+import pytest
+
+from devinstaller_core import block_platform as bp
+from devinstaller_core import dependency_graph as dg
+from devinstaller_core import exception as e
+from devinstaller_core import fleet as fl
+from devinstaller_core import planner as p
+
+
+@pytest.fixture
+def plan():
+    schema_object = {
+        "modules": [
+            {
+                "name": "foo",
+                "module_type": "file",
+                "file_path": "/etc/foo.conf",
+                "content": "hi",
+                "configs": [{"cmd": "sh: touch marker"}],
+            },
+            {
+                "name": "bar",
+                "module_type": "link",
+                "source": "/etc/foo.conf",
+                "dest": "/etc/bar.conf",
+                "requires": ["foo"],
+            },
+            {"name": "baz", "module_type": "app", "install_inst": [{"cmd": "false"}]},
+            {"name": "qux", "module_type": "group", "requires": ["baz"]},
+        ]
+    }
+    graph = dg.DependencyGraph(
+        schema_object=schema_object, platform_object=bp.BlockPlatform()
+    )
+    return p.create_plan(graph)
+
+
+class TestFleet:
+    def test_run(self, plan, tmp_path):
+        roots = [str(tmp_path / f"target{i}") for i in range(3)]
+        for root in roots:
+            os.makedirs(root)
+        transports = [fl.LocalTransport(root) for root in roots]
+        report = fl.Fleet(plan, transports, max_workers=2).run()
+        assert report["summary"] == {"failed": 3}
+        for root, target in zip(roots, report["targets"]):
+            assert target["root"] == root
+            assert target["modules"] == {
+                "foo": "success",
+                "bar": "success",
+                "baz": "failed",
+                "qux": "failed",
+            }
+            with open(os.path.join(root, "etc/foo.conf")) as _f:
+                assert _f.read() == "hi"
+            assert os.readlink(os.path.join(root, "etc/bar.conf")) == "/etc/foo.conf"
+            assert os.path.isfile(os.path.join(root, "marker"))
+
+    def test_target_path(self):
+        transport = fl.LocalTransport("/srv/target")
+        assert transport.target_path("/etc/foo") == "/srv/target/etc/foo"
+
+    def test_set_owner(self, tmp_path, mocker):
+        (tmp_path / "foo").write_text("")
+        get_uid = mocker.spy(fl.ident, "get_uid")
+        transport = fl.LocalTransport(str(tmp_path))
+        transport.set_owner("/foo", str(os.getuid()), str(os.getgid()))
+        get_uid.assert_called_once_with(str(os.getuid()))
+        assert os.stat(tmp_path / "foo").st_uid == os.getuid()
+
+    def test_shell(self, tmp_path):
+        transport = fl.LocalTransport(str(tmp_path))
+        transport.run("echo foo | tr a-z A-Z > out")
+        assert (tmp_path / "out").read_text() == "FOO\n"
+        with pytest.raises(e.DevinstallerError):
+            transport.run("py: print(1)")
+
+    @pytest.mark.parametrize(
+        "module, after_each",
+        [
+            ({"name": "foo"}, "done"),
+            (
+                {
+                    "name": "foo",
+                    "module_type": "app",
+                    "install_inst": [{"cmd": "py: 1"}],
+                },
+                None,
+            ),
+            (
+                {
+                    "name": "foo",
+                    "module_type": "app",
+                    "install_inst": [{"cmd": "true", "rollback": "py: 1"}],
+                },
+                None,
+            ),
+        ],
+    )
+    def test_check_plan(self, module, after_each, tmp_path):
+        graph = dg.DependencyGraph(
+            schema_object={"modules": [dict({"module_type": "group"}, **module)]},
+            platform_object=bp.BlockPlatform(),
+            after_each=after_each,
+        )
+        plan = p.create_plan(graph)
+        with pytest.raises(e.DevinstallerError) as excinfo:
+            fl.Fleet(plan, [fl.LocalTransport(str(tmp_path))])
+        assert excinfo.value.error_code == "D110"
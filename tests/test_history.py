@@ -0,0 +1,25 @@
+from devinstaller_core import events as ev
+from devinstaller_core import history as hi
+
+
+class TestDurationHistory:
+    def test_record(self, tmp_path):
+        path = tmp_path / "state" / "durations.json"
+        history = hi.DurationHistory(str(path))
+        with hi.record(history):
+            ev.publish(ev.ModuleFinished(module="foo", status="success", duration=4.0))
+            ev.publish(ev.ModuleFinished(module="bar", status="failed", duration=1.0))
+        ev.publish(ev.ModuleFinished(module="baz", status="success", duration=1.0))
+        history = hi.DurationHistory(str(path))
+        history.load()
+        assert history.durations == {"foo": 4.0}
+        history.record("foo", 2.0)
+        assert history.get("foo") == 3.0
+        assert history.get("bar") is None
+
+    def test_load_invalid(self, tmp_path):
+        path = tmp_path / "durations.json"
+        path.write_text("{")
+        history = hi.DurationHistory(str(path))
+        history.load()
+        assert history.durations == {}
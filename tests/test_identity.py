@@ -0,0 +1,58 @@
+import grp
+import os
+import pwd
+import stat
+
+from devinstaller_core import identity as ident
+from devinstaller_core import module_file as mf
+
+
+def get_names():
+    owner = pwd.getpwuid(os.getuid()).pw_name
+    group = grp.getgrgid(os.getgid()).gr_name
+    return owner, group
+
+
+class TestIdentity:
+    def test_cache(self, mocker):
+        owner, group = get_names()
+        mocker.patch.dict(ident.uids, clear=True)
+        mocker.patch.dict(ident.gids, clear=True)
+        getpwnam = mocker.spy(ident.pwd, "getpwnam")
+        getgrnam = mocker.spy(ident.grp, "getgrnam")
+        for _ in range(3):
+            assert ident.get_uid(owner) == os.getuid()
+            assert ident.get_gid(group) == os.getgid()
+        assert getpwnam.call_count == 1
+        assert getgrnam.call_count == 1
+        assert ident.get_uid("0") == 0
+
+    def test_mode(self):
+        assert ident.get_mode(0o100644, "600") == 0o600
+        assert ident.get_mode(0o100644, "u+x") == 0o744
+
+    def test_module_file(self, tmp_path):
+        owner, group = get_names()
+        path = tmp_path / "foo"
+        module = mf.ModuleFile(
+            name="foo",
+            file_path=str(path),
+            content="foo",
+            owner=owner,
+            group=group,
+            permission="640",
+        )
+        module.install()
+        assert path.read_text() == "foo"
+        assert stat.S_IMODE(path.stat().st_mode) == 0o640
+        module = mf.ModuleFile(
+            name="foo",
+            file_path=str(path),
+            content="bar",
+            create=False,
+            permission="u+x",
+        )
+        module.install()
+        assert path.read_text() == "foobar"
+        assert stat.S_IMODE(path.stat().st_mode) == 0o740
+        assert not list(tmp_path.glob("*.tmp"))
@@ -0,0 +1,150 @@
+import pytest
+
+from devinstaller_core import exception as e
+from devinstaller_core import include as inc
+from devinstaller_core import lib
+
+
+def write(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content)
+    return f"file: {path}"
+
+
+class TestInclude:
+    def test_resolve(self, tmp_path):
+        common = write(
+            tmp_path,
+            "common.toml",
+            '[[modules]]\nname = "git"\nmodule_type = "app"\n'
+            '[[constants]]\nname = "home"\nvalue = "/home"\n',
+        )
+        first = write(
+            tmp_path,
+            "first.toml",
+            f'[[include]]\nspec_file = "{common}"\n'
+            '[[modules]]\nname = "vim"\nmodule_type = "app"\n',
+        )
+        second = write(
+            tmp_path,
+            "second.toml",
+            f'[[include]]\nspec_file = "{common}"\n'
+            '[[modules]]\nname = "zsh"\nmodule_type = "app"\n',
+        )
+        main = write(
+            tmp_path,
+            "main.toml",
+            f'[[include]]\nspec_file = "{first}"\n'
+            f'[[include]]\nspec_file = "{second}"\n'
+            '[[modules]]\nname = "git"\nmodule_type = "phony"\n'
+            '[[constants]]\nname = "user"\nvalue = "root"\n',
+        )
+        resolved = inc.resolve_file(main)
+        assert "include" not in resolved.document
+        assert resolved.document["modules"] == [
+            {"name": "git", "module_type": "app"},
+            {"name": "vim", "module_type": "app"},
+            {"name": "zsh", "module_type": "app"},
+            {"name": "git", "module_type": "phony"},
+        ]
+        assert resolved.document["constants"] == [
+            {"name": "home", "value": "/home"},
+            {"name": "user", "value": "root"},
+        ]
+        assert len(resolved.digests) == 4
+        assert len(resolved.paths) == 3
+
+    def test_collision(self, tmp_path):
+        common = write(
+            tmp_path, "common.toml", '[[constants]]\nname = "home"\nvalue = "/home"\n'
+        )
+        main = write(
+            tmp_path,
+            "main.toml",
+            f'[[include]]\nspec_file = "{common}"\n'
+            '[[constants]]\nname = "home"\nvalue = "/root"\n',
+        )
+        with pytest.raises(e.SpecificationError) as excinfo:
+            inc.resolve_file(main)
+        assert excinfo.value.error_code == "S105"
+
+    def test_without_include(self, tmp_path):
+        main = write(
+            tmp_path,
+            "main.toml",
+            '[[constants]]\nname = "home"\nvalue = "/home"\n'
+            '[[constants]]\nname = "home"\nvalue = "/root"\n',
+        )
+        resolved = inc.resolve_file(main)
+        assert [i["value"] for i in resolved.document["constants"]] == [
+            "/home",
+            "/root",
+        ]
+
+    def test_prog_files(self, tmp_path):
+        (tmp_path / "common.py").write_text("def foo():\n    return 'foo'\n")
+        (tmp_path / "main.py").write_text("def bar():\n    return 'bar'\n")
+        (tmp_path / "extra.py").write_text("def baz():\n    return 'baz'\n")
+        common = write(
+            tmp_path, "common.toml", f'prog_file = "file: {tmp_path / "common.py"}"\n'
+        )
+        extra = write(tmp_path, "extra.toml", 'version = "0.1"\n')
+        main = write(
+            tmp_path,
+            "main.toml",
+            f'prog_file = "file: {tmp_path / "main.py"}"\n'
+            '[[modules]]\nname = "git"\nmodule_type = "app"\n'
+            f'[[include]]\nspec_file = "{common}"\n'
+            f'[[include]]\nspec_file = "{extra}"\n'
+            f'prog_file = "file: {tmp_path / "extra.py"}"\n',
+        )
+        assert len(inc.resolve_file(main).prog_files) == 3
+        schema_object = lib.core(file_path=main)
+        module = lib.get_prog_loader(schema_object)()
+        assert (module.foo(), module.bar(), module.baz()) == ("foo", "bar", "baz")
+
+    def test_cycle(self, tmp_path):
+        first = str(tmp_path / "first.toml")
+        second = write(
+            tmp_path, "second.toml", f'[[include]]\nspec_file = "file: {first}"\n'
+        )
+        write(tmp_path, "first.toml", f'[[include]]\nspec_file = "{second}"\n')
+        with pytest.raises(e.SpecificationError):
+            inc.resolve_file(f"file: {first}")
+
+    def test_core(self, tmp_path):
+        common = write(
+            tmp_path, "common.toml", '[[modules]]\nname = "git"\nmodule_type = "app"\n'
+        )
+        main = write(tmp_path, "main.toml", f'[[include]]\nspec_file = "{common}"\n')
+        schema_object = lib.core(file_path=main)
+        assert [i["name"] for i in schema_object["modules"]] == ["git"]
+
+    def test_platform_modules(self, tmp_path):
+        platforms = (
+            '[[platforms]]\nname = "macos"\n'
+            '[platforms.platform_info]\nsystem = "Darwin"\n'
+            '[[platforms]]\nname = "ubuntu"\n'
+            '[platforms.platform_info]\nsystem = "Linux"\n'
+        )
+        macos = (
+            '[[modules]]\nname = "foo"\nmodule_type = "app"\n'
+            'supported_platforms = ["macos"]\n'
+        )
+        ubuntu = (
+            '[[modules]]\nname = "foo"\nmodule_type = "app"\n'
+            'supported_platforms = ["ubuntu"]\n'
+        )
+        single = write(tmp_path, "single.toml", platforms + macos + ubuntu)
+        common = write(tmp_path, "common.toml", macos)
+        main = write(
+            tmp_path,
+            "main.toml",
+            f'[[include]]\nspec_file = "{common}"\n' + platforms + ubuntu,
+        )
+        for spec in [single, main]:
+            schema_object = lib.core(file_path=spec)
+            assert [i["supported_platforms"] for i in schema_object["modules"]] == [
+                ["macos"],
+                ["ubuntu"],
+            ]
@@ -0,0 +1,64 @@
+import pytest
+
+from devinstaller_core import block_platform as bp
+from devinstaller_core import dependency_graph as dg
+from devinstaller_core import exception as e
+from devinstaller_core import lib
+from devinstaller_core import lockfile as lf
+from devinstaller_core import planner as p
+
+
+@pytest.fixture
+def schema_object(tmp_path):
+    return {
+        "constants": [{"name": "c1", "data": [{"key": "k1", "value": "v1"}]}],
+        "modules": [
+            {
+                "name": "foo",
+                "module_type": "file",
+                "file_path": str(tmp_path / "foo"),
+                "content": "hi",
+                "inits": [{"cmd": "sh: echo '{{literal}} {k1}'"}],
+                "binds": ["c1"],
+            },
+            {
+                "name": "bar",
+                "module_type": "app",
+                "install_inst": [{"cmd": "echo {k1}", "rollback": "echo {k1}"}],
+                "uninstall_inst": ["echo remove"],
+                "requires": ["foo"],
+                "binds": ["c1"],
+            },
+            {"name": "baz", "module_type": "phony", "commands": [{"cmd": "py: 1"}]},
+        ],
+    }
+
+
+@pytest.fixture
+def dependency_graph(schema_object):
+    return dg.DependencyGraph(
+        schema_object=schema_object, platform_object=bp.BlockPlatform()
+    )
+
+
+class TestLockfile:
+    def test_round_trip(self, dependency_graph, tmp_path):
+        lock = lf.create_lock(dependency_graph, ["bar"], digest="abc")
+        assert lock["order"] == ["foo", "bar"]
+        lock_file_path = str(tmp_path / "devfile.lock")
+        lf.save(lock, lock_file_path)
+        new_graph = lib.create_dependency_graph(lock_file_path=lock_file_path)
+        assert p.create_plan(new_graph) == p.create_plan(dependency_graph)
+        assert new_graph.graph["foo"].inits[0].cmd == "sh: echo '{literal} v1'"
+        assert new_graph.graph["bar"].constants == {"k1": "v1"}
+
+    def test_platform_mismatch(self, dependency_graph):
+        lock = lf.create_lock(dependency_graph)
+        with pytest.raises(e.DevinstallerError):
+            lf.load_dependency_graph(lock, platform_codename="macos")
+
+    def test_version_mismatch(self, dependency_graph):
+        lock = lf.create_lock(dependency_graph)
+        lock["lockfile_version"] = 0
+        with pytest.raises(e.DevinstallerError):
+            lf.load_dependency_graph(lock)
@@ -0,0 +1,79 @@
+from devinstaller_core import block_platform as bp
+from devinstaller_core import dependency_graph as dg
+from devinstaller_core import events as ev
+from devinstaller_core import metrics as mt
+from devinstaller_core import settings as s
+
+
+class TestMetrics:
+    def test_install(self, mocker, tmp_path):
+        path = tmp_path / "devinstaller.prom"
+        mocker.patch.object(s.settings, "DDOT_METRICS_FILE", str(path))
+        schema_object = {
+            "modules": [
+                {
+                    "name": "foo",
+                    "module_type": "app",
+                    "install_inst": [{"cmd": "true"}],
+                },
+                {
+                    "name": "bar",
+                    "module_type": "app",
+                    "install_inst": [
+                        {"cmd": "true", "rollback": "true"},
+                        {"cmd": "devinstaller-missing"},
+                    ],
+                },
+                {"name": "baz", "module_type": "group"},
+            ]
+        }
+        graph = dg.DependencyGraph(
+            schema_object=schema_object, platform_object=bp.BlockPlatform()
+        )
+        graph.install(["foo", "bar"])
+        lines = path.read_text().splitlines()
+        assert 'devinstaller_modules{status="success"} 1' in lines
+        assert 'devinstaller_modules{status="failed"} 1' in lines
+        assert 'devinstaller_modules{status="none"} 1' in lines
+        assert 'devinstaller_instructions_total{result="success"} 2' in lines
+        assert 'devinstaller_instructions_total{result="failed"} 1' in lines
+        assert "devinstaller_rollbacks_total 1" in lines
+        assert "devinstaller_rolled_back_instructions_total 1" in lines
+        assert 'devinstaller_module_duration_seconds_count{module="foo"} 1' in lines
+        assert (
+            'devinstaller_module_duration_seconds_bucket{le="+Inf",module="bar"} 1'
+            in lines
+        )
+        assert "# TYPE devinstaller_run_duration_seconds gauge" in lines
+        assert not list(tmp_path.glob(".metrics-*"))
+
+    def test_disabled(self, mocker):
+        mocker.patch.object(s.settings, "DDOT_METRICS_FILE", None)
+        with mt.collect(None) as run:
+            assert run is None
+
+    def test_cache(self, mocker):
+        mocker.patch.dict(mt.cache_stats, clear=True)
+        mt.record_cache("spec_parse", False)
+        mt.record_cache("spec_parse", True)
+        mt.record_cache("spec_parse", True)
+        text = mt.RunMetrics().render({})
+        assert (
+            'devinstaller_cache_requests_total{cache="spec_parse",result="hit"} 2'
+            in text
+        )
+        assert (
+            'devinstaller_cache_hit_ratio{cache="spec_parse"} 0.6666666666666666'
+            in text
+        )
+
+    def test_labels(self):
+        assert mt.format_labels({"module": 'a"b'}) == '{module="a\\"b"}'
+
+    def test_hooks(self):
+        run = mt.RunMetrics()
+        run(ev.HookFinished(module="foo", hook="before", function="hook", duration=0.5))
+        text = run.render({})
+        assert (
+            'devinstaller_hook_duration_seconds{hook="before",module="foo"} 0.5' in text
+        )
@@ -0,0 +1,60 @@
+from devinstaller_core import block_platform as bp
+from devinstaller_core import dependency_graph as dg
+from devinstaller_core import lib
+from devinstaller_core import module_index as mi
+
+DOCUMENT = {
+    "platforms": [
+        {"name": "macos", "platform_info": {"system": "Darwin"}},
+        {"name": "linux", "platform_info": {"system": "Linux"}},
+    ],
+    "modules": [
+        {"name": "foo", "module_type": "group"},
+        {"name": "bar", "module_type": "group", "supported_platforms": ["macos"]},
+        {
+            "name": "bar-linux",
+            "alias": "bar",
+            "module_type": "group",
+            "supported_platforms": ["linux"],
+        },
+        {"name": "baz", "module_type": "group", "supported_platforms": ["linux"]},
+        {
+            "name": "baz-apt",
+            "alias": "baz",
+            "module_type": "group",
+            "supported_platforms": ["linux"],
+        },
+    ],
+}
+
+
+class TestModuleIndex:
+    def test_build(self):
+        index = mi.build(DOCUMENT)
+        assert index.modules == {"macos": [0, 1], "linux": [0, 2, 3, 4]}
+        assert index.get_modules(DOCUMENT, "MOCK") is None
+
+    def test_graph(self):
+        index = mi.build(DOCUMENT)
+        platform_object = bp.BlockPlatform(
+            platform_list=DOCUMENT["platforms"], platform_codename="macos"
+        )
+        graph = dg.DependencyGraph(
+            schema_object=DOCUMENT, platform_object=platform_object, module_index=index
+        )
+        expected = dg.DependencyGraph(
+            schema_object=DOCUMENT, platform_object=platform_object
+        )
+        assert graph.graph == expected.graph
+        assert graph.graph["bar"].name == "bar"
+
+    def test_evicted(self, tmp_path, mocker):
+        cache = lib.u.LRUCache(1, on_evict=lib.validated_documents.on_evict)
+        mocker.patch.object(lib, "validated_documents", cache)
+        documents = []
+        for name in ["foo", "bar"]:
+            spec_path = tmp_path / f"{name}.toml"
+            spec_path.write_text(f'version = "0.1"\n[[modules]]\nname = "{name}"\n')
+            documents.append(lib.core(file_path=f"file: {spec_path}"))
+        assert id(documents[0]) not in lib.module_indexes
+        assert id(documents[1]) in lib.module_indexes
@@ -0,0 +1,57 @@
+import json
+import os
+
+import pytest
+
+from devinstaller_core import block_platform as bp
+from devinstaller_core import dependency_graph as dg
+from devinstaller_core import planner as p
+
+
+@pytest.fixture
+def dependency_graph(tmp_path):
+    schema_object = {
+        "constants": [{"name": "c1", "data": [{"key": "k1", "value": "v1"}]}],
+        "modules": [
+            {
+                "name": "foo",
+                "module_type": "file",
+                "file_path": str(tmp_path / "foo"),
+                "content": "hi",
+                "configs": [{"cmd": "sh: cat {k1}"}],
+                "binds": ["c1"],
+            },
+            {
+                "name": "bar",
+                "module_type": "app",
+                "install_inst": [{"cmd": "echo {k1}", "rollback": "echo undo"}],
+                "binds": ["c1"],
+            },
+            {"name": "baz", "module_type": "app", "requires": ["foo", "bar"]},
+            {"name": "qux", "module_type": "group", "requires": ["baz", "foo"]},
+        ],
+    }
+    return dg.DependencyGraph(
+        schema_object=schema_object, platform_object=bp.BlockPlatform()
+    )
+
+
+class TestPlanner:
+    def test_order(self, dependency_graph):
+        plan = p.create_plan(dependency_graph, ["qux"])
+        assert plan["order"] == ["foo", "bar", "baz", "qux"]
+        assert plan["levels"] == [["foo", "bar"], ["baz"], ["qux"]]
+
+    def test_actions(self, dependency_graph, tmp_path):
+        plan = p.create_plan(dependency_graph, ["foo", "bar"])
+        foo, bar = plan["modules"]
+        assert [i["action"] for i in foo["actions"]] == ["write_file", "run"]
+        assert foo["actions"][1]["cmd"] == "sh: cat v1"
+        assert bar["actions"] == [
+            {"action": "run", "cmd": "echo v1", "rollback": "echo undo"}
+        ]
+        assert not os.path.exists(tmp_path / "foo")
+
+    def test_dump(self, dependency_graph):
+        plan = p.create_plan(dependency_graph)
+        assert json.loads(p.dump(plan)) == plan
@@ -0,0 +1,83 @@
+import pytest
+
+from devinstaller_core import block_platform as bp
+from devinstaller_core import dependency_graph as dg
+from devinstaller_core import exception as e
+from devinstaller_core import policy as p
+
+
+@pytest.fixture
+def policy():
+    def set_policy(rules, interactive=False):
+        p.set_policy(p.SelectionPolicy(rules=rules, interactive=interactive))
+
+    yield set_policy
+    p.set_policy(None)
+
+
+@pytest.fixture
+def mocked_user_input(mocker):
+    """Mocking user input"""
+    return mocker.patch("devinstaller_core.utilities.ui.select")
+
+
+class TestSelectionPolicy:
+    @pytest.mark.parametrize(
+        "rule, expected_response",
+        [("first", 0), ("last", 2), ("prefer:d,c,a", 2), ("prefer: b", 1)],
+    )
+    def test_select(self, rule, expected_response):
+        obj = p.SelectionPolicy(rules={"module": rule})
+        assert obj.select("module", ["a", "b", "c"]) == expected_response
+
+    def test_platform_override(self):
+        obj = p.SelectionPolicy(
+            rules={"module": "first", "platforms": {"macos": {"module": "last"}}}
+        )
+        assert obj.select("module", ["a", "b"], platform_codename="macos") == 1
+        assert obj.select("module", ["a", "b"], platform_codename="linux") == 0
+
+    def test_interactive(self):
+        obj = p.SelectionPolicy(rules={"module": "prefer:z"})
+        assert obj.select("module", ["a", "b"]) is None
+
+    def test_non_interactive(self):
+        obj = p.SelectionPolicy(rules={"module": "prefer:z"}, interactive=False)
+        with pytest.raises(e.DevinstallerError):
+            obj.select("module", ["a", "b"])
+        with pytest.raises(e.DevinstallerError):
+            obj.confirm()
+
+    def test_confirm(self):
+        assert p.SelectionPolicy(rules={"confirm": "yes"}).confirm() is True
+        assert p.SelectionPolicy(rules={"confirm": "no"}).confirm() is False
+
+    def test_unknown_kind(self):
+        with pytest.raises(e.DevinstallerError):
+            p.SelectionPolicy(rules={"foo": "first"})
+
+
+class TestPolicyUsage:
+    def test_duplicate_modules(self, policy, mocked_user_input):
+        policy({"module": "prefer:foo2"})
+        schema_object = {
+            "modules": [
+                {"name": "foo1", "alias": "foo", "module_type": "app"},
+                {"name": "foo2", "alias": "foo", "module_type": "app"},
+            ]
+        }
+        graph = dg.DependencyGraph(
+            schema_object=schema_object, platform_object=bp.BlockPlatform()
+        )
+        assert graph.graph["foo"].name == "foo2"
+        mocked_user_input.assert_not_called()
+
+    def test_platform(self, policy, mocked_user_input):
+        policy({"platform": "last"})
+        platform_list = [
+            {"name": "linux", "platform_info": {"system": "foo"}},
+            {"name": "macos", "platform_info": {"system": "foo"}},
+        ]
+        obj = bp.BlockPlatform(platform_list=platform_list)
+        assert obj.codename == "macos"
+        mocked_user_input.assert_not_called()
@@ -0,0 +1,38 @@
+import os
+import pstats
+
+from devinstaller_core import file_manager as f
+from devinstaller_core import profiling as pr
+from devinstaller_core import settings as s
+
+
+class TestProfiling:
+    def test_phase(self, tmp_path):
+        profiler = pr.Profiler(str(tmp_path))
+        with profiler.phase("outer"):
+            with profiler.phase("install-foo bar"):
+                sum(range(1000))
+        files = sorted(os.listdir(tmp_path))
+        assert files == [
+            "0001-outer.alloc.txt",
+            "0001-outer.prof",
+            "0002-install-foo_bar.alloc.txt",
+            "0002-install-foo_bar.prof",
+        ]
+        pstats.Stats(str(tmp_path / "0002-install-foo_bar.prof"))
+
+    def test_disabled(self, mocker):
+        mocker.patch.object(s.settings, "DDOT_PROFILE_DIR", None)
+        assert pr.get_profiler() is None
+        with pr.phase("parse"):
+            pass
+
+    def test_settings(self, mocker, tmp_path):
+        mocker.patch.object(s.settings, "DDOT_PROFILE_DIR", str(tmp_path))
+        try:
+            f.DevFileManager.parse('name = "foo"')
+            run_dir = pr.get_profiler().run_dir
+            assert os.path.dirname(run_dir) == str(tmp_path)
+            assert "0001-parse.prof" in os.listdir(run_dir)
+        finally:
+            pr.set_profiler(None)
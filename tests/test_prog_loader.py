@@ -0,0 +1,50 @@
+import traceback
+
+import pytest
+
+from devinstaller_core import lib
+from devinstaller_core import prog_loader as pg
+
+PROG_FILE = """
+def hello(name):
+    return f"hello {name}"
+"""
+
+
+class TestProgLoader:
+    def test_load_data(self):
+        module = lib.load_devfile({}, "data: hello = lambda name: f'hello {name}'")
+        assert module.hello("foo") == "hello foo"
+        assert module.__name__.startswith(pg.MODULE_PREFIX)
+
+    def test_load_file(self, tmp_path, mocker):
+        mocked_mkstemp = mocker.patch("tempfile.mkstemp")
+        path = tmp_path / "devfile.py"
+        path.write_text(PROG_FILE)
+        module = lib.load_devfile({"prog_file": f"file: {path}"})
+        assert module.hello("bar") == "hello bar"
+        mocked_mkstemp.assert_not_called()
+
+    def test_compiled_once(self):
+        source = "VALUE = 1\n"
+        first = pg.load(source, "a" * 64, "<first>")
+        second = pg.load(source, "a" * 64, "<second>")
+        assert first is not second
+        assert pg.code_objects["a" * 64] is first.__loader__.get_code(first.__name__)
+
+    def test_no_collision(self):
+        first = pg.load("VALUE = 1\n", "b" * 64, "<first>")
+        second = pg.load("VALUE = 2\n", "c" * 64, "<second>")
+        assert first.__name__ != second.__name__
+        assert (first.VALUE, second.VALUE) == (1, 2)
+
+    def test_traceback(self):
+        module = pg.load("def fail():\n    raise ValueError()\n", "d" * 64, "<fail>")
+        with pytest.raises(ValueError) as err:
+            module.fail()
+        assert "raise ValueError()" in "".join(traceback.format_tb(err.tb))
+
+    def test_prog_loader(self):
+        assert lib.get_prog_loader({}) is None
+        load = lib.get_prog_loader({"prog_file": "data: def hook(): return 1"})
+        assert load().hook() == 1
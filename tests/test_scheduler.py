@@ -0,0 +1,197 @@
+import threading
+import time
+
+from devinstaller_core import block_platform as bp
+from devinstaller_core import dependency_graph as dg
+from devinstaller_core import history as hi
+from devinstaller_core import scheduler as sc
+from devinstaller_core import settings as s
+
+
+def get_graph(modules):
+    modules = [dict({"module_type": "group"}, **i) for i in modules]
+    return dg.DependencyGraph(
+        schema_object={"modules": modules}, platform_object=bp.BlockPlatform()
+    )
+
+
+def track_running(mocker, graph):
+    """Replace the installation with a sleep and record which modules run at
+    the same time
+    """
+    lock = threading.Lock()
+    running = set()
+    overlaps = []
+
+    def install(module_name):
+        with lock:
+            running.add(module_name)
+            overlaps.append(set(running))
+        time.sleep(0.05)
+        with lock:
+            running.discard(module_name)
+        graph.graph[module_name].status = "success"
+
+    mocker.patch.object(graph, "traverse_install", side_effect=install)
+    return overlaps
+
+
+class TestResources:
+    def test_locks(self):
+        resources = sc.Resources()
+        foo = get_graph([{"name": "foo", "locks": ["apt"]}]).graph["foo"]
+        assert resources.available(foo)
+        resources.acquire(foo)
+        assert not resources.available(foo)
+        resources.release(foo)
+        assert resources.available(foo)
+
+    def test_slots(self):
+        resources = sc.Resources({"network": 2})
+        graph = get_graph(
+            [
+                {"name": "foo", "slots": {"network": 1}},
+                {"name": "bar", "slots": {"network": 5}},
+            ]
+        )
+        resources.acquire(graph.graph["foo"])
+        assert not resources.available(graph.graph["bar"])
+        resources.release(graph.graph["foo"])
+        assert resources.available(graph.graph["bar"])
+
+
+class TestScheduler:
+    def test_parallel(self, mocker):
+        graph = get_graph(
+            [
+                {"name": "foo", "requires": ["bar", "baz"]},
+                {"name": "bar"},
+                {"name": "baz"},
+            ]
+        )
+        overlaps = track_running(mocker, graph)
+        sc.Scheduler(graph, max_workers=4).run(["foo"])
+        assert {"bar", "baz"} in overlaps
+        assert all("foo" not in i or len(i) == 1 for i in overlaps)
+        assert graph.graph["foo"].status == "success"
+
+    def test_locks(self, mocker):
+        graph = get_graph(
+            [
+                {"name": "foo", "locks": ["apt"]},
+                {"name": "bar", "locks": ["apt"]},
+                {"name": "baz"},
+            ]
+        )
+        overlaps = track_running(mocker, graph)
+        sc.Scheduler(graph, max_workers=4).run(["foo", "bar", "baz"])
+        assert not any({"foo", "bar"} <= i for i in overlaps)
+        assert {"foo", "baz"} in overlaps
+
+    def test_slots(self, mocker):
+        graph = get_graph(
+            [{"name": f"foo{i}", "slots": {"network": 1}} for i in range(4)]
+        )
+        overlaps = track_running(mocker, graph)
+        scheduler = sc.Scheduler(graph, max_workers=4, capacities={"network": 2})
+        scheduler.run([f"foo{i}" for i in range(4)])
+        assert max(len(i) for i in overlaps) == 2
+
+    def test_critical_path(self, tmp_path):
+        graph = get_graph(
+            [
+                {"name": "foo", "requires": ["bar"]},
+                {"name": "bar"},
+                {"name": "baz"},
+                {
+                    "name": "qux",
+                    "module_type": "app",
+                    "install_inst": [{"cmd": "true"}],
+                },
+            ]
+        )
+        history = hi.DurationHistory(str(tmp_path / "durations.json"))
+        history.durations = {"foo": 10.0, "bar": 1.0, "baz": 5.0}
+        scheduler = sc.Scheduler(graph, max_workers=1, history=history)
+        scheduler.prioritize(graph.install_order(["baz", "qux", "foo"]))
+        assert scheduler.paths == {"foo": 10.0, "bar": 11.0, "baz": 5.0, "qux": 1.0}
+        ready = sorted(["baz", "qux", "bar"], key=scheduler.priority)
+        assert ready == ["bar", "baz", "qux"]
+
+    def test_failed_requires(self, mocker, tmp_path):
+        mocker.patch.object(s.settings, "DDOT_STATE_DIR", str(tmp_path))
+        graph = get_graph(
+            [
+                {
+                    "name": "foo",
+                    "module_type": "app",
+                    "requires": ["bar"],
+                    "install_inst": [{"cmd": "true"}],
+                },
+                {
+                    "name": "bar",
+                    "module_type": "app",
+                    "install_inst": [{"cmd": "devinstaller-missing"}],
+                },
+                {
+                    "name": "baz",
+                    "module_type": "app",
+                    "install_inst": [{"cmd": "true"}],
+                },
+            ]
+        )
+        graph.install(["foo", "baz"], max_workers=2)
+        assert graph.graph["foo"].status == "failed"
+        assert graph.graph["bar"].status == "failed"
+        assert graph.graph["baz"].status == "success"
+        history = hi.get_history()
+        assert set(history.durations) == {"baz"}
+
+    def test_same_as_sequential(self, mocker, tmp_path):
+        mocker.patch.object(s.settings, "DDOT_STATE_DIR", str(tmp_path))
+        modules = [
+            {"name": "foo", "requires": ["qux"]},
+            {
+                "name": "bar",
+                "module_type": "app",
+                "requires": ["baz", "qux"],
+                "install_inst": [{"cmd": "devinstaller-missing"}],
+            },
+            {"name": "baz", "module_type": "app", "install_inst": [{"cmd": "true"}]},
+            {"name": "qux", "module_type": "app", "install_inst": [{"cmd": "true"}]},
+        ]
+        sequential = get_graph(modules)
+        sequential.install(["foo", "bar"], max_workers=1)
+        parallel = get_graph(modules)
+        parallel.install(["foo", "bar"], max_workers=2)
+        statuses = {i: m.status for i, m in sequential.graph.items()}
+        assert statuses == {i: m.status for i, m in parallel.graph.items()}
+        assert statuses["bar"] == "failed"
+        assert sequential.orphan_modules == parallel.orphan_modules == {"baz"}
+
+    def test_uninstall(self, mocker):
+        graph = get_graph(
+            [
+                {"name": "foo", "requires": ["bar", "baz"]},
+                {"name": "bar", "requires": ["qux"]},
+                {"name": "baz", "locks": ["apt"]},
+                {"name": "qux", "locks": ["apt"]},
+            ]
+        )
+        graph.orphan_modules = {"foo", "bar", "baz", "qux"}
+        assert graph.uninstall_levels(["qux", "bar", "baz", "foo"]) == [
+            ["foo"],
+            ["baz", "bar"],
+            ["qux"],
+        ]
+        uninstalled = []
+        for module in graph.graph.values():
+            mocker.patch.object(
+                module,
+                "uninstall",
+                side_effect=lambda i=module.alias: uninstalled.append(i),
+            )
+        graph.uninstall_orphan_modules(max_workers=4)
+        assert uninstalled[0] == "foo"
+        assert set(uninstalled[1:3]) == {"bar", "baz"}
+        assert uninstalled[3] == "qux"
@@ -0,0 +1,58 @@
+import pytest
+
+from devinstaller_core import block_platform as bp
+from devinstaller_core import dependency_graph as dg
+from devinstaller_core import exception as e
+from devinstaller_core import module_app as ma
+from devinstaller_core import template as tp
+
+
+class TestTemplate:
+    @pytest.mark.parametrize(
+        "source",
+        [
+            "mkdir {home}/bin",
+            "echo {{home}} {home!r}",
+            "echo {user:>{width}}",
+            "true",
+            "awk '{{print $1}}' f",
+        ],
+    )
+    def test_render(self, source):
+        constants = {"home": "/root", "user": "foo", "width": "6"}
+        assert tp.render(source, constants) == source.format(**constants)
+
+    def test_compiled_once(self):
+        assert tp.get_template("echo {home}") is tp.get_template("echo {home}")
+        assert tp.get_template("echo {home} {user.name}").keys == {"home", "user"}
+
+    def test_uninstall_inst(self):
+        module = ma.ModuleApp(
+            name="foo",
+            constants=[{"key": "home", "value": "/root"}],
+            uninstall_inst=["rm -rf {home}/foo"],
+        )
+        assert module.uninstall_inst == ["rm -rf /root/foo"]
+
+    def test_missing_constants(self):
+        schema_object = {
+            "modules": [
+                {
+                    "name": "foo",
+                    "module_type": "app",
+                    "install_inst": [{"cmd": "echo {home}", "rollback": "echo {user}"}],
+                },
+                {
+                    "name": "bar",
+                    "module_type": "phony",
+                    "commands": [{"cmd": "{editor}"}],
+                },
+                {"name": "baz", "module_type": "app", "uninstall_inst": ["{{ok}}"]},
+            ]
+        }
+        with pytest.raises(e.SpecificationError) as excinfo:
+            dg.DependencyGraph(
+                schema_object=schema_object, platform_object=bp.BlockPlatform()
+            )
+        assert excinfo.value.error_code == "S103"
+        assert excinfo.value.error == "foo: home, user; bar: editor"
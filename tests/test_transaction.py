@@ -0,0 +1,237 @@
+import os
+
+import pytest
+
+from devinstaller_core import block_platform as bp
+from devinstaller_core import dependency_graph as dg
+from devinstaller_core import events as ev
+from devinstaller_core import module_file as mf
+from devinstaller_core import module_folder as mfo
+from devinstaller_core import module_link as ml
+from devinstaller_core import transaction as t
+
+
+@pytest.fixture
+def transaction(tmp_path):
+    return t.FileTransaction(str(tmp_path / "journal"))
+
+
+def read(path):
+    with open(path, "r") as _f:
+        return _f.read()
+
+
+class TestFileTransaction:
+    def test_overwritten_file(self, tmp_path, transaction):
+        target = str(tmp_path / "foo")
+        t.replace_file(target, "old")
+        transaction.snapshot("foo", target)
+        t.replace_file(target, "new")
+        assert read(target) == "new"
+        assert transaction.rollback("foo")
+        assert read(target) == "old"
+
+    def test_created_file(self, tmp_path, transaction):
+        target = str(tmp_path / "foo")
+        transaction.snapshot("foo", target)
+        t.replace_file(target, "new")
+        transaction.rollback("foo")
+        assert not os.path.lexists(target)
+
+    def test_cloned_file(self, tmp_path, transaction):
+        target = str(tmp_path / "foo")
+        t.replace_file(target, "old")
+        transaction.snapshot("foo", target, "clone")
+        with open(target, "a") as _f:
+            _f.write(" new")
+        transaction.rollback("foo")
+        assert read(target) == "old"
+
+    def test_first_snapshot_wins(self, tmp_path, transaction):
+        target = str(tmp_path / "foo")
+        t.replace_file(target, "old")
+        transaction.snapshot("foo", target)
+        t.replace_file(target, "new")
+        transaction.snapshot("foo", target)
+        transaction.rollback("foo")
+        assert read(target) == "old"
+
+    def test_rollback_in_later_run(self, tmp_path, transaction):
+        target = str(tmp_path / "foo")
+        t.replace_file(target, "old")
+        transaction.snapshot("foo", target)
+        t.replace_file(target, "new")
+        transaction.close()
+        new_transaction = t.FileTransaction(transaction.journal_dir)
+        new_transaction.load()
+        assert new_transaction.rollback("foo")
+        assert read(target) == "old"
+        assert not new_transaction.rollback("foo")
+
+    def test_compact(self, tmp_path, transaction):
+        for name in ["foo", "bar"]:
+            target = str(tmp_path / name)
+            t.replace_file(target, "old")
+            transaction.snapshot(name, target)
+        transaction.release("foo")
+        transaction.close()
+        new_transaction = t.FileTransaction(transaction.journal_dir)
+        new_transaction.load()
+        assert list(new_transaction.entries) == ["bar"]
+        with open(transaction.manifest_path) as _f:
+            assert len(_f.readlines()) == 1
+
+
+class TestModules:
+    def test_file_module(self, tmp_path, transaction):
+        target = str(tmp_path / "foo")
+        t.replace_file(target, "old")
+        module = mf.ModuleFile(name="foo", file_path=target, content="new")
+        module.attach_transaction(transaction)
+        module.install()
+        assert read(target) == "new"
+        module.uninstall()
+        assert read(target) == "old"
+
+    def test_folder_module(self, tmp_path, transaction):
+        target = str(tmp_path / "foo")
+        module = mfo.ModuleFolder(name="foo", folder_path=target)
+        module.attach_transaction(transaction)
+        module.install()
+        assert os.path.isdir(target)
+        module.uninstall()
+        assert not os.path.exists(target)
+
+    def test_link_module(self, tmp_path, transaction):
+        source = str(tmp_path / "source")
+        dest = str(tmp_path / "dest")
+        t.replace_file(source, "source")
+        t.replace_file(dest, "old")
+        module = ml.ModuleLink(name="foo", source=source, dest=dest)
+        module.attach_transaction(transaction)
+        module.install()
+        assert os.readlink(dest) == source
+        module.uninstall()
+        assert not os.path.islink(dest)
+        assert read(dest) == "old"
+        assert read(source) == "source"
+
+    @pytest.mark.skipif(os.getuid() != 0, reason="changing the owner needs root")
+    def test_file_owner(self, tmp_path, transaction):
+        target = str(tmp_path / "foo")
+        t.replace_file(target, "old")
+        os.chown(target, 1000, 1000)
+        module = mf.ModuleFile(name="foo", file_path=target, content="new")
+        module.attach_transaction(transaction)
+        module.install()
+        assert read(target) == "new"
+        assert (os.stat(target).st_uid, os.stat(target).st_gid) == (1000, 1000)
+
+    def test_existing_folder(self, tmp_path, transaction):
+        target = tmp_path / "foo"
+        target.mkdir(mode=0o755)
+        (target / "bar").write_text("bar")
+        module = mfo.ModuleFolder(name="foo", folder_path=str(target), permission="700")
+        module.attach_transaction(transaction)
+        module.install()
+        assert os.stat(target).st_mode & 0o777 == 0o700
+        module.uninstall()
+        assert os.stat(target).st_mode & 0o777 == 0o755
+        assert (target / "bar").read_text() == "bar"
+
+    def test_link_failed(self, tmp_path, transaction, mocker):
+        source = str(tmp_path / "source")
+        dest = str(tmp_path / "dest")
+        marker = str(tmp_path / "marker")
+        t.replace_file(source, "source")
+        t.replace_file(dest, "old")
+        replace = os.replace
+
+        def fail_link(src, dst):
+            if src.endswith(".tmp"):
+                raise OSError("boom")
+            replace(src, dst)
+
+        mocker.patch.object(ml.os, "replace", side_effect=fail_link)
+        graph = dg.DependencyGraph(
+            schema_object={
+                "modules": [
+                    {
+                        "name": "foo",
+                        "module_type": "link",
+                        "source": source,
+                        "dest": dest,
+                        "inits": [
+                            {"cmd": f"touch {marker}", "rollback": f"rm {marker}"}
+                        ],
+                    }
+                ]
+            },
+            platform_object=bp.BlockPlatform(),
+        )
+        graph.install(["foo"], transaction=transaction)
+        assert graph.graph["foo"].status == "failed"
+        assert sorted(os.listdir(tmp_path)) == ["dest", "journal", "source"]
+        assert read(dest) == "old"
+
+    def test_folder_not_empty(self, tmp_path, transaction):
+        target = str(tmp_path / "foo")
+        graph = dg.DependencyGraph(
+            schema_object={
+                "modules": [
+                    {
+                        "name": "foo",
+                        "module_type": "folder",
+                        "folder_path": target,
+                        "configs": [
+                            {"cmd": f"touch {target}/bar"},
+                            {"cmd": "devinstaller-missing"},
+                        ],
+                    }
+                ]
+            },
+            platform_object=bp.BlockPlatform(),
+        )
+        received = []
+        ev.bus.subscribe(received.append)
+        try:
+            graph.install(["foo"], transaction=transaction)
+        finally:
+            ev.bus.unsubscribe(received.append)
+        assert graph.graph["foo"].status == "failed"
+        assert os.path.isfile(os.path.join(target, "bar"))
+        failed = [i for i in received if isinstance(i, ev.RestoreFailed)]
+        assert [i.target for i in failed] == [target]
+        assert "foo" not in transaction.entries
+
+    def test_release_after_install(self, tmp_path, transaction):
+        existing = str(tmp_path / "existing")
+        t.replace_file(existing, "old")
+        transaction.snapshot("existing", existing)
+        transaction.close()
+        transaction = t.FileTransaction(transaction.journal_dir)
+        transaction.load()
+        target = str(tmp_path / "foo")
+        t.replace_file(target, "old")
+        graph = dg.DependencyGraph(
+            schema_object={
+                "modules": [
+                    {
+                        "name": "foo",
+                        "module_type": "file",
+                        "file_path": target,
+                        "content": "new",
+                    }
+                ]
+            },
+            platform_object=bp.BlockPlatform(),
+        )
+        graph.install(["foo"], transaction=transaction)
+        assert read(target) == "new"
+        assert list(transaction.entries) == ["existing"]
+        assert os.listdir(transaction.backup_dir) == [
+            os.path.basename(transaction.entries["existing"][0]["backup"])
+        ]
+        graph.rollback()
+        assert read(target) == "new"
+        assert "existing" in transaction.entries
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from devinstaller_core import block_platform as bp
+from devinstaller_core import dependency_graph as dg
+from devinstaller_core import exception as e
+from devinstaller_core import policy as p
+from devinstaller_core import user_interaction_json as uj
+from devinstaller_core import utilities as u
+
+
+@pytest.fixture
+def headless(mocker):
+    ext = uj.ExtUserInteraction()
+    mocker.patch.object(u.ui, "return_object", ext)
+    for name in ["print", "status", "track"]:
+        mocker.patch.object(u.ui, name, getattr(ext, name))
+    yield ext
+    p.set_policy(None)
+
+
+def read_events(capsys):
+    return [json.loads(i) for i in capsys.readouterr().out.splitlines()]
+
+
+class TestHeadless:
+    def test_print(self, capsys):
+        uj.ExtUserInteraction().print("[red]failed[/red]", 1)
+        (event,) = read_events(capsys)
+        assert event["event"] == "message"
+        assert event["text"] == "failed 1"
+
+    def test_prompts(self, capsys):
+        obj = uj.ExtUserInteraction()
+        p.set_policy(p.SelectionPolicy(rules={"prompt": "prefer:b,c", "confirm": "no"}))
+        try:
+            assert obj.select("Pick", ["a", "b", "c"]) == "b"
+            assert obj.checkbox("Pick", ["a", "b", "c"]) == ["b", "c"]
+            assert obj.confirm("Sure?") is False
+        finally:
+            p.set_policy(None)
+        assert [i["response"] for i in read_events(capsys)] == ["b", ["b", "c"], False]
+
+    def test_prompt_without_rule(self):
+        with pytest.raises(e.DevinstallerError):
+            uj.ExtUserInteraction().select("Pick", ["a", "b"])
+
+    def test_install_events(self, headless, capsys):
+        schema_object = {
+            "modules": [
+                {
+                    "name": "foo",
+                    "module_type": "app",
+                    "install_inst": [{"cmd": "true"}],
+                },
+                {
+                    "name": "bar",
+                    "module_type": "app",
+                    "install_inst": [{"cmd": "true"}, {"cmd": "devinstaller-missing"}],
+                },
+            ]
+        }
+        graph = dg.DependencyGraph(
+            schema_object=schema_object, platform_object=bp.BlockPlatform()
+        )
+        graph.install(["foo", "bar"])
+        events = read_events(capsys)
+        names = [i["event"] for i in events if not i["event"].startswith("task_")]
+        assert names.count("module_started") == 2
+        assert names.count("instruction_finished") == 2
+        assert names.count("instruction_failed") == 1
+        finished = {
+            i["module"]: i["status"] for i in events if i["event"] == "module_finished"
+        }
+        assert finished == {"foo": "success", "bar": "failed"}
@@ -20,3 +20,16 @@ class TestCompare:
 
     def test_negative_arg(self, compare):
         assert compare("foo", "bar") is False
+
+
+class TestLRUCache:
+    def test_evict(self):
+        evicted = []
+        cache = u.LRUCache(2, on_evict=lambda key, value: evicted.append(key))
+        cache["a"] = 1
+        cache["b"] = 2
+        assert cache.get("a") == 1
+        cache["c"] = 3
+        assert list(cache.keys()) == ["a", "c"]
+        assert evicted == ["b"]
+        assert cache.get("b") is None
@@ -0,0 +1,152 @@
+import os
+
+import pytest
+
+from devinstaller_core import block_platform as bp
+from devinstaller_core import dependency_graph as dg
+from devinstaller_core import events as ev
+from devinstaller_core import watch as w
+
+
+def create_graph(app_cmd):
+    schema_object = {
+        "modules": [
+            {"name": "foo", "module_type": "app", "install_inst": [{"cmd": app_cmd}]},
+            {"name": "bar", "module_type": "group", "requires": ["foo"]},
+            {"name": "baz", "module_type": "group", "requires": ["bar"]},
+            {"name": "qux", "module_type": "app"},
+        ]
+    }
+    return dg.DependencyGraph(
+        schema_object=schema_object, platform_object=bp.BlockPlatform()
+    )
+
+
+class TestWatch:
+    def test_changed_modules(self):
+        old_graph = create_graph("true")
+        assert w.changed_modules(old_graph, create_graph("true")) == set()
+        assert w.changed_modules(old_graph, create_graph("false")) == {"foo"}
+
+    def test_dependents(self):
+        graph = create_graph("true")
+        assert w.dependents(graph, {"foo"}) == {"foo", "bar", "baz"}
+        assert w.dependents(graph, {"qux"}) == {"qux"}
+
+    def test_reinstall_changed(self):
+        requirements = ["baz", "qux"]
+        old_graph = create_graph("true")
+        old_graph.install(requirements)
+        new_graph = create_graph("echo changed")
+        affected = w.reinstall_changed(old_graph, new_graph, requirements)
+        assert affected == {"foo", "bar", "baz"}
+        assert all(m.status == "success" for m in new_graph.graph.values())
+
+    def test_polling_watcher(self, tmp_path):
+        path = str(tmp_path / "devfile.toml")
+        with open(path, "w") as _f:
+            _f.write("")
+        watcher = w.PollingWatcher([path])
+        assert watcher.wait(timeout=0.1) == set()
+        os.utime(path, (0, 0))
+        assert watcher.wait(timeout=1) == {path}
+
+    def test_inotify_watcher(self, tmp_path):
+        path = str(tmp_path / "devfile.toml")
+        watcher = w.get_watcher([path])
+        try:
+            with open(path, "w") as _f:
+                _f.write("")
+            assert watcher.wait(timeout=2) == {path}
+        finally:
+            watcher.close()
+
+    def test_inotify_events(self, tmp_path, mocker):
+        path = str(tmp_path / "devfile.toml")
+        watcher = w.InotifyWatcher([path])
+        try:
+            (wd,) = watcher.dirs
+            name = b"devfile.toml\0\0\0\0"
+            data = (
+                w.EVENT_HEADER.pack(wd + 1, w.IN_MODIFY, 0, len(name))
+                + name
+                + w.EVENT_HEADER.pack(wd, w.IN_MODIFY, 0, len(name))
+                + name
+            )
+            mocker.patch.object(w.select, "select", return_value=([watcher.fd], [], []))
+            read = mocker.patch.object(w.os, "read", return_value=data)
+            assert watcher.read_events(0) == {path}
+            assert not watcher.overflowed
+            read.return_value = w.EVENT_HEADER.pack(-1, w.IN_Q_OVERFLOW, 0, 0)
+            assert watcher.read_events(0) == {path}
+            assert watcher.overflowed
+            read.return_value = w.EVENT_HEADER.pack(wd, w.IN_IGNORED, 0, 0)
+            assert watcher.read_events(0) == set()
+            assert watcher.dirs == {}
+        finally:
+            watcher.close()
+
+    def test_set_paths(self, tmp_path):
+        path = str(tmp_path / "devfile.toml")
+        other = str(tmp_path / "other" / "prog.py")
+        os.mkdir(tmp_path / "other")
+        watcher = w.get_watcher([path])
+        try:
+            watcher.set_paths([path, other])
+            with open(other, "w") as _f:
+                _f.write("")
+            assert watcher.wait(timeout=2) == {other}
+        finally:
+            watcher.close()
+
+    def test_watch_overflow(self, mocker):
+        watcher = mocker.Mock(overflowed=True)
+        watcher.wait.side_effect = [set(), KeyboardInterrupt]
+        mocker.patch.object(w, "get_watcher", return_value=watcher)
+        mocker.patch.object(w, "watch_paths", return_value=[])
+        mocker.patch.object(w.lib, "core", return_value={})
+        mocker.patch.object(
+            w.lib,
+            "create_dependency_graph",
+            side_effect=[create_graph("true"), create_graph("true")],
+        )
+        received = []
+        ev.bus.subscribe(received.append)
+        try:
+            with pytest.raises(KeyboardInterrupt):
+                w.watch("file: devfile.toml")
+        finally:
+            ev.bus.unsubscribe(received.append)
+        applied = [i for i in received if isinstance(i, ev.WatchApplied)]
+        assert [i.modules for i in applied] == [["bar", "baz", "foo", "qux"]]
+        assert not watcher.overflowed
+
+    def test_watch_events(self, mocker):
+        watcher = mocker.Mock(overflowed=False)
+        watcher.wait.side_effect = [set(), set(), KeyboardInterrupt]
+        mocker.patch.object(w, "get_watcher", return_value=watcher)
+        mocker.patch.object(w, "watch_paths", return_value=[])
+        mocker.patch.object(w.lib, "core", return_value={})
+        mocker.patch.object(
+            w.lib,
+            "create_dependency_graph",
+            side_effect=[
+                create_graph("true"),
+                ValueError("bad spec"),
+                create_graph("echo changed"),
+            ],
+        )
+        received = []
+        ev.bus.subscribe(received.append)
+        try:
+            with pytest.raises(KeyboardInterrupt):
+                w.watch("file: devfile.toml")
+        finally:
+            ev.bus.unsubscribe(received.append)
+        failed = [i for i in received if isinstance(i, ev.WatchFailed)]
+        applied = [i for i in received if isinstance(i, ev.WatchApplied)]
+        assert [i.error for i in failed] == ["bad spec"]
+        assert [i.modules for i in applied] == [["bar", "baz", "foo"]]
+        w.get_watcher.assert_called_once_with([])
+        watcher.set_paths.assert_called_once_with([])
+        watcher.close.assert_called_once_with()